@@ -0,0 +1,320 @@
+"""Long-lived pool of warm Chrome instances leased to scrapers over DEBUG_ADDRESS.
+
+Every scraper run used to start its own Chrome on chrome_automation_profile:
+process start, profile load and the first render cost many seconds per run.
+The service keeps BROWSER_POOL_SIZE Chromes running, each on its own cloned
+profile (driver_pool.clone_profile, so the logged-in cookies come along) and
+remote-debugging port, optionally pre-loading WARM_URLS. A scraper leases one
+and attaches to it through the existing ATTACH_EXISTING=1 / DEBUG_ADDRESS
+path; main.py does this when "Use Browser Service" is ticked.
+
+Leases are handed out by a small JSON HTTP API on 127.0.0.1:
+  POST /lease?owner=NAME&pid=PID   -> {"lease", "debug_address", "instance"} (503 when none free)
+  POST /usage?lease=ID&pages=N     pages loaded by the holder (scrapers report this at exit)
+  POST /release?lease=ID           instance goes back to the pool
+  GET  /status                     instances, leases, pages, RSS
+
+A monitor thread health-checks every instance (DevTools /json/version answers,
+process alive), reclaims leases whose holder pid has died, and recycles
+(kills and relaunches on the same port and profile) any instance that is
+unhealthy, has served BROWSER_MAX_PAGES pages or whose process tree exceeds
+BROWSER_MEM_CEILING_MB. Leased instances are only recycled once released.
+
+Usage:
+  python browser_service.py serve --size 2
+  python browser_service.py status
+
+Env Vars:
+  BROWSER_SERVICE_URL=http://127.0.0.1:9400   Where clients find the service
+  BROWSER_POOL_SIZE=2         Warm instances
+  BROWSER_BASE_PORT=9300      First remote-debugging port (instance i uses base + i)
+  BROWSER_MAX_PAGES=200       Recycle after this many pages
+  BROWSER_MEM_CEILING_MB=1500 Recycle when the instance's process tree is larger
+  BROWSER_HEALTH_EVERY=15     Seconds between health checks
+  SERVICE_PROFILE_DIR=.service_profiles   Where instance profiles are cloned
+  WARM_URLS=                  Comma separated URLs opened in each fresh instance
+  BROWSER_LEASE=              Set by the launcher for the scraper process (see note_pages)
+"""
+from __future__ import annotations
+import os, sys, json, time, uuid, threading, subprocess
+import urllib.request, urllib.parse, urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+SERVICE_URL = os.getenv("BROWSER_SERVICE_URL", "http://127.0.0.1:9400")
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BASE_PORT = int(os.getenv("BROWSER_BASE_PORT", "9300"))
+MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "200"))
+MEM_CEILING_MB = float(os.getenv("BROWSER_MEM_CEILING_MB", "1500"))
+HEALTH_EVERY = float(os.getenv("BROWSER_HEALTH_EVERY", "15"))
+PROFILE_ROOT = os.getenv("SERVICE_PROFILE_DIR", ".service_profiles")
+WARM_URLS = [u.strip() for u in os.getenv("WARM_URLS", "").split(",") if u.strip()]
+HEADLESS = os.getenv("HEADLESS", "").lower() in {"1","true","yes"}
+
+
+def _devtools_ok(address: str, timeout: float = 3.0) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=timeout) as r:
+            return r.status == 200
+    except Exception:
+        return False
+
+
+class Instance:
+    def __init__(self, index: int):
+        self.index = index
+        self.port = BASE_PORT + index
+        self.address = f"127.0.0.1:{self.port}"
+        self.proc: Optional[subprocess.Popen] = None
+        self.lease: Optional[str] = None
+        self.owner = ""
+        self.holder_pid = 0
+        self.leased_at = 0.0
+        self.pages = 0
+        self.leases = 0
+        self.started_at = 0.0
+        self.recycles = 0
+
+    def launch(self):
+        from cdp_engine import chrome_binary, LAUNCH_ARGS
+        from driver_pool import clone_profile
+        profile = clone_profile(f"b{self.index}", root=PROFILE_ROOT)
+        args = [chrome_binary(), f"--remote-debugging-port={self.port}", f"--user-data-dir={profile}", *LAUNCH_ARGS]
+        if HEADLESS:
+            args.append("--headless=new")
+        args.extend(WARM_URLS or ["about:blank"])
+        started = time.time()
+        self.proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while time.time() - started < 30 and not _devtools_ok(self.address, 1.0):
+            time.sleep(0.2)
+        self.started_at = time.time()
+        self.pages = 0
+        self.leases = 0
+        print(f"[SERVICE] b{self.index} up on {self.address} in {self.started_at - started:.1f}s (pid {self.proc.pid})")
+
+    def stop(self):
+        if not self.proc:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.proc = None
+
+    def recycle(self, why: str):
+        print(f"[SERVICE] Recycling b{self.index}: {why}")
+        self.stop()
+        self.recycles += 1
+        self.launch()
+
+    def rss_mb(self) -> float:
+        from cdp_engine import tree_rss
+        return tree_rss([self.proc.pid]) / 1e6 if self.proc else 0.0
+
+    def healthy(self) -> bool:
+        return bool(self.proc) and self.proc.poll() is None and _devtools_ok(self.address)
+
+    def info(self) -> Dict[str, Any]:
+        return {"instance": f"b{self.index}", "debug_address": self.address, "leased": bool(self.lease),
+                "owner": self.owner, "pages": self.pages, "leases": self.leases, "recycles": self.recycles,
+                "uptime_s": round(time.time() - self.started_at), "rss_mb": round(self.rss_mb())}
+
+
+class BrowserService:
+    def __init__(self, size: int = POOL_SIZE):
+        self.instances = [Instance(i) for i in range(size)]
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        for inst in self.instances:
+            inst.launch()
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def shutdown(self):
+        self._stop.set()
+        for inst in self.instances:
+            inst.stop()
+
+    def _by_lease(self, lease: str) -> Optional[Instance]:
+        return next((i for i in self.instances if lease and i.lease == lease), None)
+
+    def lease(self, owner: str, pid: int) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            free = [i for i in self.instances if not i.lease and i.proc]
+            if not free:
+                return None
+            inst = min(free, key=lambda i: i.pages)  # spread wear over the pool
+            inst.lease, inst.owner, inst.holder_pid = uuid.uuid4().hex, owner, pid
+            inst.leased_at = time.time()
+            inst.leases += 1
+            print(f"[SERVICE] b{inst.index} leased to {owner or '?'} (pid {pid})")
+            return {"lease": inst.lease, "debug_address": inst.address, "instance": f"b{inst.index}"}
+
+    def usage(self, lease: str, pages: int) -> bool:
+        with self.lock:
+            inst = self._by_lease(lease)
+            if inst:
+                inst.pages += max(0, pages)
+            return inst is not None
+
+    def release(self, lease: str) -> bool:
+        with self.lock:
+            inst = self._by_lease(lease)
+            if not inst:
+                return False
+            held = time.time() - inst.leased_at
+            # not leasable again until checked
+            inst.lease, inst.owner, inst.holder_pid = "recycling", "", 0
+            print(f"[SERVICE] b{inst.index} released after {held:.0f}s (pages={inst.pages})")
+        # A recycle waits up to 30s for the new Chrome; the client's release call must not
+        threading.Thread(target=self._check, args=(inst, True), daemon=True).start()
+        return True
+
+    def _check(self, inst: Instance, claimed: bool = False):
+        """Recycle an unleased instance that is unhealthy, worn out or too large
+        (`claimed`: the caller already set its lease to "recycling")."""
+        if not claimed:
+            with self.lock:
+                if inst.lease:
+                    return
+                inst.lease = "recycling"
+        try:
+            if not inst.healthy():
+                inst.recycle("health check failed")
+            elif inst.pages >= MAX_PAGES:
+                inst.recycle(f"{inst.pages} pages served")
+            elif MEM_CEILING_MB and inst.rss_mb() > MEM_CEILING_MB:
+                inst.recycle(f"RSS {inst.rss_mb():.0f}MB over {MEM_CEILING_MB:.0f}MB")
+        except Exception as e:
+            print(f"[SERVICE] b{inst.index} recycle failed: {e}")
+        finally:
+            with self.lock:
+                inst.lease = None
+
+    def _monitor(self):
+        from driver_pool import _pid_alive
+        while not self._stop.wait(HEALTH_EVERY):
+            for inst in self.instances:
+                if inst.lease and inst.holder_pid and not _pid_alive(inst.holder_pid):
+                    print(f"[SERVICE] b{inst.index}: holder pid {inst.holder_pid} gone; reclaiming lease")
+                    self.release(inst.lease)
+                elif not inst.lease:
+                    self._check(inst)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [i.info() for i in self.instances]
+
+
+def _handler(service: BrowserService):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, code: int, body: Any):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _params(self) -> Dict[str, str]:
+            q = urllib.parse.urlparse(self.path).query
+            return {k: v[0] for k, v in urllib.parse.parse_qs(q).items()}
+
+        def do_GET(self):
+            if urllib.parse.urlparse(self.path).path == "/status":
+                return self._reply(200, service.status())
+            self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            path, p = urllib.parse.urlparse(self.path).path, self._params()
+            if path == "/lease":
+                got = service.lease(p.get("owner", ""), int(p.get("pid", "0") or 0))
+                return self._reply(200, got) if got else self._reply(503, {"error": "no free instance"})
+            if path == "/usage":
+                return self._reply(200 if service.usage(p.get("lease", ""), int(p.get("pages", "0") or 0)) else 404, {})
+            if path == "/release":
+                return self._reply(200 if service.release(p.get("lease", "")) else 404, {})
+            self._reply(404, {"error": "not found"})
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+def serve(size: int = POOL_SIZE):
+    port = urllib.parse.urlparse(SERVICE_URL).port or 9400
+    service = BrowserService(size)
+    service.start()
+    server = ThreadingHTTPServer(("127.0.0.1", port), _handler(service))
+    print(f"[SERVICE] {size} warm instance(s); leases on http://127.0.0.1:{port} "
+          f"(recycle after {MAX_PAGES} pages / {MEM_CEILING_MB:.0f}MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+# ---------------------------------------------------------------- client side
+
+def _call(method: str, path: str, params: Optional[Dict[str, Any]] = None, timeout: float = 5.0):
+    url = f"{SERVICE_URL}{path}"
+    if params:
+        url += "?" + urllib.parse.urlencode(params)
+    req = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return json.loads(r.read().decode("utf-8") or "null")
+
+
+def lease(owner: str = "", pid: Optional[int] = None, wait: float = 0.0) -> Optional[Dict[str, Any]]:
+    """Lease a warm instance; retries for up to `wait` seconds while all are busy. None if unavailable."""
+    deadline = time.time() + wait
+    while True:
+        try:
+            return _call("POST", "/lease", {"owner": owner, "pid": pid or os.getpid()})
+        except urllib.error.HTTPError as e:
+            if e.code != 503 or time.time() >= deadline:
+                return None
+        except (urllib.error.URLError, OSError):
+            return None
+        time.sleep(1.0)
+
+
+def release(lease_id: str) -> None:
+    try:
+        _call("POST", "/release", {"lease": lease_id})
+    except Exception:
+        pass
+
+
+def note_pages(pages: int) -> None:
+    """Report pages loaded on a leased instance (no-op unless BROWSER_LEASE is set)."""
+    lease_id = os.getenv("BROWSER_LEASE", "")
+    if not lease_id or pages <= 0:
+        return
+    try:
+        _call("POST", "/usage", {"lease": lease_id, "pages": pages})
+    except Exception:
+        pass
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Warm Chrome pool leased over DEBUG_ADDRESS")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("serve", help="Run the service in the foreground")
+    sp.add_argument("--size", type=int, default=POOL_SIZE)
+    sub.add_parser("status", help="Print the instances of a running service")
+    args = ap.parse_args()
+    if args.cmd == "serve":
+        serve(args.size)
+    else:
+        try:
+            for row in _call("GET", "/status"):
+                print(json.dumps(row))
+        except Exception as e:
+            print(f"Service not reachable at {SERVICE_URL}: {e}")
+            sys.exit(1)
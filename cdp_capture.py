@@ -0,0 +1,117 @@
+"""Capture JSON API responses from Chrome via DevTools network events.
+
+Chrome's performance log (goog:loggingPrefs) carries the raw CDP Network.*
+events. We watch Network.responseReceived for URLs we care about, wait for
+Network.loadingFinished, then pull the body with Network.getResponseBody
+through execute_cdp_cmd. Scrapers get parsed JSON payloads as soon as each
+page of results arrives, without waiting for React / Polymer to render them.
+
+Usage:
+  opts = Options(); enable_network_logging(opts)
+  driver = webdriver.Chrome(options=opts)
+  cap = NetworkCapture(driver, ["/SearchTimeline", "/HomeTimeline"])
+  for url, payload in cap.poll():
+      ...
+
+Note: get_log('performance') drains the buffer, so use one NetworkCapture
+per driver.
+"""
+from __future__ import annotations
+import os, json, base64, time
+from typing import Dict, Any, List, Iterator, Tuple, Optional
+
+_DEBUG = os.getenv("DEBUG_DETECT", "0").lower() in {"1","true","yes"}
+
+
+def enable_network_logging(options) -> None:
+    """Turn on the performance log with Network domain events for a ChromeOptions."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    try:
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    except Exception:
+        pass
+
+
+class NetworkCapture:
+    def __init__(self, driver, url_patterns: List[str], max_body_bytes: int = 8 * 1024 * 1024):
+        self.driver = driver
+        self.patterns = list(url_patterns)
+        self.max_body_bytes = max_body_bytes
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self.responses = 0
+        self.bytes = 0
+        self.status_counts: Dict[int, int] = {}
+        try:
+            driver.execute_cdp_cmd("Network.enable", {"maxResourceBufferSize": max_body_bytes,
+                                                      "maxTotalBufferSize": max_body_bytes * 8})
+        except Exception:
+            pass
+
+    def _matches(self, url: str) -> bool:
+        return any(p in url for p in self.patterns)
+
+    def _events(self) -> Iterator[Dict[str, Any]]:
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            yield msg
+
+    def body(self, request_id: str) -> Optional[str]:
+        try:
+            res = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except Exception as e:
+            if _DEBUG:
+                print(f"[CDP] getResponseBody failed for {request_id}: {e}")
+            return None
+        raw = res.get("body", "")
+        if res.get("base64Encoded"):
+            raw = base64.b64decode(raw).decode("utf-8", "replace")
+        return raw
+
+    def poll(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (url, parsed_json) for every matching response finished since the last poll."""
+        for msg in self._events():
+            method = msg.get("method", "")
+            params = msg.get("params", {})
+            if method == "Network.responseReceived":
+                resp = params.get("response", {})
+                url = resp.get("url", "")
+                status = int(resp.get("status", 0) or 0)
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+                if self._matches(url):
+                    self._pending[params.get("requestId", "")] = {"url": url, "status": status}
+            elif method == "Network.loadingFinished":
+                rid = params.get("requestId", "")
+                info = self._pending.pop(rid, None)
+                if not info:
+                    continue
+                if info["status"] >= 400:
+                    continue
+                raw = self.body(rid)
+                if not raw:
+                    continue
+                self.responses += 1
+                self.bytes += len(raw)
+                try:
+                    yield info["url"], json.loads(raw)
+                except ValueError:
+                    continue
+            elif method == "Network.loadingFailed":
+                self._pending.pop(params.get("requestId", ""), None)
+
+    def wait(self, timeout: float, min_wait: float = 0.0, interval: float = 0.25) -> List[Tuple[str, Any]]:
+        """Poll until at least one matching response arrived (or timeout); never returns before min_wait."""
+        start = time.time()
+        got: List[Tuple[str, Any]] = []
+        while True:
+            got.extend(self.poll())
+            elapsed = time.time() - start
+            if (got and elapsed >= min_wait) or elapsed >= timeout:
+                return got
+            time.sleep(interval)
@@ -0,0 +1,616 @@
+"""Asyncio Chrome DevTools engine: several tabs of one browser from one event loop.
+
+With Selenium every command blocks the Python thread until chromedriver has
+answered, so one process drives one tab, and parallel terms (driver_pool.py)
+cost a whole Chrome each. This engine talks to Chrome's DevTools websocket
+directly: one browser-level connection, one flattened CDP session per tab,
+commands and events multiplexed by id. Each tab runs as a coroutine, so while
+one tab waits for new cards (WAIT_NEW_JS) or a screenshot encode, the others
+keep extracting.
+
+The page-side logic is the existing one: scripts written for execute_script /
+execute_async_script (CARD_EXTRACT_JS, WAIT_NEW_JS, ...) run unchanged through
+Tab.run / Tab.run_async, and detection (detect_content) runs in the default
+thread pool. The round itself (skip rules, since boundary, storing, counters)
+is twitter_scrape's search_round_cards / store_search_round, so both engines
+keep the same records, seen index, checkpoint state (RESUME=1) and pacing.
+
+Usage:
+  python cdp_engine.py search --terms "a,b,c" --tabs 3       Twitter SEARCH, one tab per term
+  python cdp_engine.py bench --workers 3 --cards 60          fixture benchmark vs Selenium
+
+The bench subcommand serves fixtures/feed/index.html locally and collects
+cards (extraction + one screenshot per card, no detection) with N Selenium
+drivers and with N tabs of one CDP browser, then prints cards/s, peak RSS of
+the browser process trees and cards/s per GB for both.
+
+Requires the `websockets` package. The search subcommand uses the automation
+profile's logged-in session, so it must not run while a Selenium scraper holds
+the same profile.
+
+Env Vars:
+  CHROME_BIN=               Chrome / Chromium executable (default: first found on PATH)
+  CDP_TABS=3                Concurrent tabs for the search subcommand
+  CDP_TIMEOUT=30            Seconds to wait for a CDP command reply
+  CHROME_AUTOMATION_DIR     Profile for the search subcommand (default ./chrome_automation_profile)
+  ATTACH_EXISTING=1 / DEBUG_ADDRESS=127.0.0.1:9222   Drive an already running Chrome instead
+  HEADLESS=1                Launch headless
+"""
+from __future__ import annotations
+import os, sys, json, time, base64, shutil, socket, asyncio, tempfile, threading, subprocess
+import urllib.request
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+try:
+    import websockets  # type: ignore
+except Exception:  # pragma: no cover
+    websockets = None  # type: ignore
+
+from dom_utils import WAIT_NEW_JS, NET_IDLE_MS
+from resource_policy import blocked_patterns, resolve_policy
+
+CDP_TABS = int(os.getenv("CDP_TABS", "3"))
+CDP_TIMEOUT = float(os.getenv("CDP_TIMEOUT", "30"))
+HEADLESS = os.getenv("HEADLESS", "").lower() in {"1","true","yes"}
+ATTACH = os.getenv("ATTACH_EXISTING", "").lower() in {"1","true","yes"}
+_CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+# Tabs are separate windows and never throttled, so background tabs keep scrolling at full speed
+LAUNCH_ARGS = [
+    "--no-first-run", "--no-default-browser-check", "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding", "--disable-backgrounding-occluded-windows",
+    "--disable-blink-features=AutomationControlled", "--no-sandbox", "--disable-dev-shm-usage",
+]
+
+
+class CDPError(RuntimeError):
+    pass
+
+
+def chrome_binary() -> str:
+    path = os.getenv("CHROME_BIN", "")
+    if path:
+        return path
+    for name in _CHROME_NAMES:
+        found = shutil.which(name)
+        if found:
+            return found
+    raise CDPError("No Chrome executable found (set CHROME_BIN)")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _browser_ws_url(address: str, timeout: float = 20.0) -> str:
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://{address}/json/version", timeout=2) as r:
+                return json.loads(r.read().decode("utf-8"))["webSocketDebuggerUrl"]
+        except Exception:
+            if time.time() > deadline:
+                raise CDPError(f"DevTools endpoint at {address} did not come up")
+            time.sleep(0.2)
+
+
+def _wrap(script: str, args: List[Any], is_async: bool) -> str:
+    """Turn an execute_script / execute_async_script body into a Runtime.evaluate expression."""
+    a = json.dumps(args)
+    if is_async:
+        return f"new Promise(__done => (function() {{\n{script}\n}}).apply(null, {a}.concat([__done])))"
+    return f"(function() {{\n{script}\n}}).apply(null, {a})"
+
+
+class CDPBrowser:
+    """One websocket to the browser target; tabs are flattened sessions on it."""
+
+    def __init__(self, ws, proc: Optional[subprocess.Popen] = None, profile: Optional[str] = None,
+                 temp_profile: bool = False):
+        self.ws = ws
+        self.proc = proc
+        self.profile = profile
+        self._temp_profile = temp_profile
+        self._next_id = 0
+        self._replies: Dict[int, asyncio.Future] = {}
+        self._waiters: Dict[tuple, List[asyncio.Future]] = {}
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def start(cls, profile: Optional[str] = None, headless: bool = HEADLESS,
+                    address: Optional[str] = None) -> "CDPBrowser":
+        """Attach to `address` (host:port) or launch Chrome on a free debugging port.
+        Without a profile a throwaway one is created and removed on close()."""
+        if websockets is None:
+            raise CDPError("cdp_engine needs the websockets package (pip install websockets)")
+        proc, temp = None, False
+        if not address:
+            if not profile:
+                profile, temp = tempfile.mkdtemp(prefix="cdp_profile_"), True
+            port = _free_port()
+            args = [chrome_binary(), f"--remote-debugging-port={port}", f"--user-data-dir={profile}",
+                    *LAUNCH_ARGS, "about:blank"]
+            if headless:
+                args.insert(1, "--headless=new")
+            proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            address = f"127.0.0.1:{port}"
+        url = await asyncio.get_running_loop().run_in_executor(None, _browser_ws_url, address)
+        ws = await websockets.connect(url, max_size=None, ping_interval=None)
+        return cls(ws, proc, profile, temp)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.proc.pid if self.proc else None
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                msg = json.loads(raw)
+                if "id" in msg:
+                    fut = self._replies.pop(msg["id"], None)
+                    if fut and not fut.done():
+                        if "error" in msg:
+                            fut.set_exception(CDPError(f"{msg['error'].get('message')} ({msg['error'].get('code')})"))
+                        else:
+                            fut.set_result(msg.get("result", {}))
+                    continue
+                for fut in self._waiters.pop((msg.get("sessionId"), msg.get("method")), []):
+                    if not fut.done():
+                        fut.set_result(msg.get("params", {}))
+        except Exception:
+            pass
+        for fut in list(self._replies.values()):
+            if not fut.done():
+                fut.set_exception(CDPError("DevTools connection closed"))
+        self._replies.clear()
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None, timeout: float = CDP_TIMEOUT) -> Dict[str, Any]:
+        self._next_id += 1
+        msg: Dict[str, Any] = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            msg["sessionId"] = session_id
+        fut = asyncio.get_running_loop().create_future()
+        self._replies[self._next_id] = fut
+        await self.ws.send(json.dumps(msg))
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._replies.pop(msg["id"], None)
+
+    def expect(self, session_id: Optional[str], method: str) -> asyncio.Future:
+        """Future for the next `method` event of a session; create it before triggering the event."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(fut)
+        return fut
+
+    async def new_tab(self, url: str = "about:blank", block: Optional[List[str]] = None) -> "Tab":
+        target = (await self.send("Target.createTarget", {"url": "about:blank", "newWindow": True}))["targetId"]
+        session = (await self.send("Target.attachToTarget", {"targetId": target, "flatten": True}))["sessionId"]
+        tab = Tab(self, target, session)
+        await tab.send("Page.enable")
+        await tab.send("Runtime.enable")
+        await tab.send("Emulation.setFocusEmulationEnabled", {"enabled": True})
+        if block:
+            await tab.send("Network.enable")
+            await tab.send("Network.setBlockedURLs", {"urls": block})
+        if url != "about:blank":
+            await tab.goto(url)
+        return tab
+
+    async def close(self):
+        if self.proc:
+            try:
+                await asyncio.wait_for(self.send("Browser.close"), 5)
+            except Exception:
+                pass
+        try:
+            await self.ws.close()
+        except Exception:
+            pass
+        self._reader.cancel()
+        if self.proc:
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        if self._temp_profile and self.profile:
+            shutil.rmtree(self.profile, ignore_errors=True)
+
+
+class Tab:
+    """One page target; script helpers mirror execute_script / execute_async_script."""
+
+    def __init__(self, browser: CDPBrowser, target_id: str, session_id: str):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   timeout: float = CDP_TIMEOUT) -> Dict[str, Any]:
+        return await self.browser.send(method, params, self.session_id, timeout)
+
+    async def goto(self, url: str, timeout: float = CDP_TIMEOUT):
+        loaded = self.browser.expect(self.session_id, "Page.loadEventFired")
+        res = await self.send("Page.navigate", {"url": url})
+        if res.get("errorText"):
+            loaded.cancel()
+            raise CDPError(f"Navigation to {url} failed: {res['errorText']}")
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            pass  # long-polling pages may never fire load; the feed is usable anyway
+
+    async def _evaluate(self, expression: str, timeout: float) -> Any:
+        res = await self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True,
+                                                   "awaitPromise": True}, timeout=timeout)
+        if res.get("exceptionDetails"):
+            d = res["exceptionDetails"]
+            raise CDPError((d.get("exception") or {}).get("description") or d.get("text", "script error"))
+        return (res.get("result") or {}).get("value")
+
+    async def run(self, script: str, *args: Any) -> Any:
+        """execute_script equivalent (JSON-serialisable arguments and results only)."""
+        return await self._evaluate(_wrap(script, list(args), False), CDP_TIMEOUT)
+
+    async def run_async(self, script: str, *args: Any, timeout: float = CDP_TIMEOUT) -> Any:
+        """execute_async_script equivalent: the script gets a completion callback as last argument."""
+        return await self._evaluate(_wrap(script, list(args), True), timeout)
+
+    async def screenshot(self, path: str, clip: Optional[Dict[str, float]] = None,
+                         fmt: str = "jpeg", quality: int = 80) -> int:
+        params: Dict[str, Any] = {"format": fmt, "optimizeForSpeed": True}
+        if fmt != "png":
+            params["quality"] = quality
+        if clip:
+            params["clip"] = dict(clip, scale=1)
+            params["captureBeyondViewport"] = True
+        data = base64.b64decode((await self.send("Page.captureScreenshot", params))["data"])
+        await asyncio.get_running_loop().run_in_executor(None, _write, path, data)
+        return len(data)
+
+    async def close(self):
+        try:
+            await self.browser.send("Target.closeTarget", {"targetId": self.target_id})
+        except Exception:
+            pass
+
+
+def _write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def scroll_and_wait(tab: Tab, selector: str, floor: float, timeout: float) -> str:
+    """Scroll to the bottom and wait for new `selector` matches (WAIT_NEW_JS, same as FeedWaiter)."""
+    await tab.run("window.scrollTo(0, document.body.scrollHeight);")
+    try:
+        res = await tab.run_async(WAIT_NEW_JS, selector, int(floor * 1000), int(timeout * 1000), NET_IDLE_MS,
+                                  timeout=timeout + 5)
+        return (res or {}).get("reason", "timeout")
+    except (CDPError, asyncio.TimeoutError):
+        return "error"
+
+
+async def card_shots(tab: Tab, cards: List[Dict[str, Any]], paths: List[str], fmt: str, quality: int) -> List[Optional[str]]:
+    """Clip screenshots of extracted cards (CARD_EXTRACT_JS rects are viewport relative)."""
+    if not cards:
+        return []
+    sx, sy = await tab.run("return [window.scrollX, window.scrollY];")
+    out: List[Optional[str]] = []
+    for card, path in zip(cards, paths):
+        r = card.get("rect") or {}
+        if not r.get("width") or not r.get("height"):
+            out.append(None)
+            continue
+        try:
+            await tab.screenshot(path, {"x": r["x"] + sx, "y": r["y"] + sy, "width": r["width"],
+                                        "height": r["height"]}, fmt, quality)
+            out.append(path)
+        except (CDPError, asyncio.TimeoutError):
+            out.append(None)
+    return out
+
+
+async def twitter_search_term(browser: CDPBrowser, term: str, target: int, block: List[str]) -> int:
+    """collect_search_results as a coroutine on its own tab: the same round helpers
+    (search_round_cards / store_search_round), pacing, checkpoint state and since boundary."""
+    import twitter_scrape as tw
+    from pacer import PACE_SIGNALS_JS
+    from screen_capture import shot_format, with_ext
+    fmt, quality = shot_format("TW")
+    loop = asyncio.get_running_loop()
+    label = f"CDP:{term}"
+    st = tw.search_state(tw.CKPT.states.setdefault(f"SEARCH:{term}", SimpleNamespace()))
+    if getattr(st, 'done', False):
+        print(f"[{label}] Finished before the interruption ({st.collected} collected); skipping")
+        return st.collected
+    st.reached_known = st.exhausted = st.at_target = False
+    started = time.time()
+    # Pacer.pace sleeps, so it runs off the event loop; the pace is shared with the other tabs
+    await loop.run_in_executor(None, lambda: tw.PACER.pace(navigation=True))
+    tab = await browser.new_tab(tw._direct_search_url(term), block)
+    only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
+    groups = tw.card_filter()
+    filter_stats = tw.FilterStats(label)
+    base_term = term.lower().lstrip('#')
+    scroll_limit = tw.search_scroll_limit(term)
+    since = 0  # this tab's resource timeline position for PACE_SIGNALS_JS
+    try:
+        while tw.search_active(st, target, scroll_limit):
+            try:
+                res = json.loads(await tab.run(tw.CARD_EXTRACT_JS, groups, '' if st.relaxed else base_term) or '{}')
+            except (CDPError, ValueError) as e:
+                print(f"[{label}] Card script failed: {e}")
+                res = {}
+            pending, infos = tw.search_round_cards(term, res, st, target, filter_stats, only_flagged)
+            shots: List[Optional[str]] = [None] * len(pending)
+            if tw.SCREENSHOTS:
+                paths = [with_ext(tw.post_shot_path(m['index'], m['id']), fmt) for m in pending]
+                shots = await card_shots(tab, infos, paths, fmt, quality)
+            # Detection is CPU / network bound Python; run it off the event loop
+            verdicts = await asyncio.gather(*(loop.run_in_executor(None, tw.detect_content, m.get('text', ''), s)
+                                              for m, s in zip(pending, shots)))
+            by_id = {m['id']: v for m, v in zip(pending, verdicts)}
+            new_round = tw.store_search_round(label, pending, shots, lambda meta, _shot: by_id[meta['id']],
+                                              st, target)
+            tw.end_search_round(label, st, new_round)
+            if st.collected >= target: break
+            if st.reached_known:
+                print(f"[{label}] Reached posts from the previous run; stopping")
+                break
+            try:
+                sig = await tab.run(PACE_SIGNALS_JS, since) or {}
+            except CDPError:
+                sig = {}
+            since = int(sig.get("next", since) or 0)
+            await loop.run_in_executor(None, tw.PACER.feedback, None, new_round, sig)
+            await loop.run_in_executor(None, tw.PACER.pace)
+            await scroll_and_wait(tab, tw.NEW_CARD_SELECTOR, tw.WAIT_FLOOR, 4.0)
+    finally:
+        await tab.close()
+    tw.search_outcome(st, target, scroll_limit)
+    tw.SINCE.finish(term, st)
+    tw.CKPT.done(st)
+    filter_stats.report()
+    elapsed = max(time.time() - started, 1e-6)
+    print(f"[{label}] Done collected={st.collected} parsed={len(st.seen)} elapsed={elapsed:.1f}s "
+          f"stored/s={st.collected / elapsed:.2f}")
+    return st.collected
+
+
+async def run_twitter_search(terms: List[str], tabs: int = CDP_TABS) -> int:
+    import twitter_scrape as tw
+    os.makedirs(tw.OUT_DIR, exist_ok=True)
+    os.makedirs(tw.FLAGGED_DIR, exist_ok=True)
+    terms = tw.CKPT.setting('terms', list(terms))
+    policy = resolve_policy("lean" if tw.SCREENSHOTS else "text", "TW")
+    block = blocked_patterns(policy)
+    profile = os.getenv("CHROME_AUTOMATION_DIR", os.path.join(os.getcwd(), "chrome_automation_profile"))
+    address = os.getenv("DEBUG_ADDRESS", "127.0.0.1:9222") if ATTACH else None
+    browser = await CDPBrowser.start(profile=None if address else profile, address=address)
+    gate = asyncio.Semaphore(max(1, tabs))
+    started = time.time()
+    failed: List[str] = []
+
+    async def one(term: str) -> int:
+        async with gate:
+            try:
+                return await twitter_search_term(browser, term, tw.TARGET_COUNT, block)
+            except Exception as e:
+                print(f"[CDP] Term '{term}' failed: {e}")
+                failed.append(term)
+                return 0
+
+    finished = False
+    try:
+        total = sum(await asyncio.gather(*(one(t) for t in terms)))
+        finished = not failed
+    finally:
+        await browser.close()
+        if finished:
+            tw.CKPT.complete()
+        else:
+            tw.CKPT.save()  # failed or interrupted terms continue with --resume
+        tw.PACER.report()
+        tw.SEEN_INDEX.save()
+    print(f"[CDP] {len(terms)} term(s) on {tabs} tab(s): stored={total} in {time.time() - started:.0f}s "
+          f"(policy={policy})")
+    return total
+
+
+# ---------------------------------------------------------------- benchmark
+
+def tree_rss(roots: List[int]) -> int:
+    """Resident bytes of the given processes and all their descendants."""
+    try:
+        import psutil  # type: ignore
+        total = 0
+        for pid in roots:
+            try:
+                p = psutil.Process(pid)
+                for q in [p] + p.children(recursive=True):
+                    try: total += q.memory_info().rss
+                    except psutil.Error: pass
+            except psutil.Error:
+                pass
+        return total
+    except ImportError:
+        pass
+    children: Dict[int, List[int]] = {}
+    rss: Dict[int, int] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{d}/statm") as f:
+                rss[int(d)] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            children.setdefault(ppid, []).append(int(d))
+        except (OSError, ValueError, IndexError):
+            continue
+    total, stack = 0, list(roots)
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class _PeakRSS(threading.Thread):
+    def __init__(self, roots_fn, every: float = 0.25):
+        super().__init__(daemon=True)
+        self.roots_fn = roots_fn
+        self.every = every
+        self.peak = 0
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.is_set():
+            self.peak = max(self.peak, tree_rss(self.roots_fn()))
+            self._stop_evt.wait(self.every)
+
+    def stop(self) -> int:
+        self._stop_evt.set()
+        self.join()
+        return self.peak
+
+
+def _serve_fixtures() -> tuple:
+    import http.server, functools
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=root)
+    handler.log_message = lambda *a, **k: None  # type: ignore[attr-defined]
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/feed/index.html"
+
+
+def _bench_selenium(url: str, workers: int, cards: int, out: str) -> Dict[str, Any]:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from dom_utils import FeedWaiter
+    from screen_capture import BatchCapture
+    import twitter_scrape as tw
+    drivers = []
+    for _ in range(workers):
+        opts = Options()
+        opts.add_argument("--headless=new")
+        for a in LAUNCH_ARGS:
+            opts.add_argument(a)
+        drivers.append(webdriver.Chrome(options=opts))
+    monitor = _PeakRSS(lambda: [d.service.process.pid for d in drivers])
+    monitor.start()
+    counts = [0] * workers
+
+    def work(i: int):
+        d = drivers[i]
+        shots = BatchCapture(f"BENCH:w{i}")
+        waiter = FeedWaiter(f"BENCH:w{i}", 'article[data-testid="tweet"]:not([data-seen])', 0.2, 4.0)
+        d.get(f"{url}?seed={i + 1}")
+        while counts[i] < cards:
+            infos, _, _ = tw.visible_cards(d, [], '')
+            infos = infos[:cards - counts[i]]
+            pairs = [(el, os.path.join(out, f"sel_w{i}_{counts[i] + n}.jpg"))
+                     for n, el in enumerate(tw.card_elements(d, infos))]
+            shots.capture(d, pairs)
+            counts[i] += len(infos)
+            if counts[i] < cards:
+                d.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+                waiter.wait_new(d, 0.2)
+
+    started = time.time()
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.time() - started
+    peak = monitor.stop()
+    for d in drivers:
+        try: d.quit()
+        except Exception: pass
+    return {"path": "selenium", "browsers": workers, "cards": sum(counts), "seconds": elapsed, "peak_rss": peak}
+
+
+async def _bench_cdp(url: str, workers: int, cards: int, out: str) -> Dict[str, Any]:
+    import twitter_scrape as tw
+    browser = await CDPBrowser.start(headless=True)
+    monitor = _PeakRSS(lambda: [browser.pid] if browser.pid else [])
+    monitor.start()
+
+    async def work(i: int) -> int:
+        tab = await browser.new_tab(f"{url}?seed={i + 1}")
+        n = 0
+        while n < cards:
+            res = json.loads(await tab.run(tw.CARD_EXTRACT_JS, [], '') or '{}')
+            infos = res.get('cards', [])[:cards - n]
+            await card_shots(tab, infos, [os.path.join(out, f"cdp_t{i}_{n + k}.jpg") for k in range(len(infos))],
+                             "jpeg", 80)
+            n += len(infos)
+            if n < cards:
+                await scroll_and_wait(tab, 'article[data-testid="tweet"]:not([data-seen])', 0.2, 4.0)
+        await tab.close()
+        return n
+
+    started = time.time()
+    try:
+        done = await asyncio.gather(*(work(i) for i in range(workers)))
+        elapsed = time.time() - started
+    finally:
+        peak = monitor.stop()
+        await browser.close()
+    return {"path": "cdp", "browsers": 1, "cards": sum(done), "seconds": elapsed, "peak_rss": peak}
+
+
+def run_bench(workers: int, cards: int, paths: List[str]) -> List[Dict[str, Any]]:
+    server, url = _serve_fixtures()
+    out = tempfile.mkdtemp(prefix="cdp_bench_")
+    results = []
+    try:
+        for path in paths:
+            try:
+                if path == "selenium":
+                    results.append(_bench_selenium(url, workers, cards, out))
+                else:
+                    results.append(asyncio.run(_bench_cdp(url, workers, cards, out)))
+            except Exception as e:
+                print(f"[BENCH] {path} failed: {e}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(out, ignore_errors=True)
+    for r in results:
+        gb = r["peak_rss"] / 1e9
+        rate = r["cards"] / max(r["seconds"], 1e-6)
+        r.update({"cards_per_s": round(rate, 2), "peak_rss_gb": round(gb, 3),
+                  "cards_per_s_per_gb": round(rate / gb, 2) if gb else None})
+        print(f"[BENCH] {r['path']:8s} browsers={r['browsers']} cards={r['cards']} time={r['seconds']:.1f}s "
+              f"cards/s={rate:.2f} peak_rss={gb:.2f}GB cards/s/GB={r['cards_per_s_per_gb']}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Asyncio CDP multi-tab engine")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("search", help="Twitter SEARCH with one tab per term")
+    sp.add_argument("--terms", default=os.getenv("TW_SEARCH_TERMS", ""))
+    sp.add_argument("--tabs", type=int, default=CDP_TABS)
+    bp = sub.add_parser("bench", help="Fixture benchmark: N Selenium browsers vs N tabs of one CDP browser")
+    bp.add_argument("--workers", type=int, default=3)
+    bp.add_argument("--cards", type=int, default=60, help="Cards per worker / tab")
+    bp.add_argument("--only", choices=["selenium", "cdp"], help="Run a single path")
+    bp.add_argument("--json", default="", help="Also write results to this file")
+    args = ap.parse_args()
+    if args.cmd == "search":
+        term_list = [t.strip() for t in args.terms.split(",") if t.strip()]
+        if not term_list:
+            print("[CDP] No terms provided (--terms / TW_SEARCH_TERMS)")
+            sys.exit(1)
+        asyncio.run(run_twitter_search(term_list, args.tabs))
+    else:
+        rows = run_bench(args.workers, args.cards, [args.only] if args.only else ["selenium", "cdp"])
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(rows, f, indent=2)
@@ -0,0 +1,213 @@
+"""Atomic progress checkpoints so an interrupted scrape continues with --resume.
+
+Progress used to live only in local variables (term index, collected counts,
+seen sets), so a 30-term run stopped at term 18 started again at term 1. Each
+scraper now keeps its per-step state in DriverSupervisor.state() namespaces
+(see supervisor.py) and a Checkpoint writes them to
+CHECKPOINT_DIR/<platform>.json every CHECKPOINT_EVERY stored items and at
+every term boundary:
+
+  settings   mode / terms / target of the run, reused as-is on resume
+  states     per term / mode: counters, seen id sets, done flag and the last
+             scroll position (window.scrollY) as the feed cursor
+  outputs    byte size of each metadata JSONL file at checkpoint time
+
+The file is written to a temp name and os.replace()d, so a crash never
+leaves a half-written checkpoint. With --resume (or RESUME=1) the states are
+loaded back, finished terms are skipped and the feed is scrolled back to the
+saved position. Records appended after the last checkpoint are read from the
+output files past the saved offsets: their ids count as already written, so
+they are neither captured nor written twice, and a torn last line (process
+killed mid-write) is cut off. A run that finishes removes its checkpoint;
+without --resume an old checkpoint is replaced by the new run's.
+
+Env Vars:
+  CHECKPOINT=1              Set to 0 to disable checkpoints
+  CHECKPOINT_DIR=.checkpoints
+  CHECKPOINT_EVERY=25       Stored items between checkpoint writes
+  RESUME=0                  Same as passing --resume to the scraper
+"""
+from __future__ import annotations
+import os, sys, json, time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+ENABLED = os.getenv("CHECKPOINT", "1").lower() in {"1","true","yes"}
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+EVERY = max(1, int(os.getenv("CHECKPOINT_EVERY", "25")))
+RESUME = "--resume" in sys.argv[1:] or os.getenv("RESUME", "0").lower() in {"1","true","yes"}
+
+
+def _encode(ns: SimpleNamespace) -> Dict[str, Any]:
+    out = {}
+    for k, v in vars(ns).items():
+        if isinstance(v, (set, frozenset)):
+            out[k] = {"__set__": sorted(v, key=str)}
+        elif v is None or isinstance(v, (bool, int, float, str, list, dict)):
+            out[k] = v
+    return out
+
+
+def _decode(d: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(**{k: set(v["__set__"]) if isinstance(v, dict) and "__set__" in v else v
+                              for k, v in d.items()})
+
+
+class Checkpoint:
+    """Periodic, atomic snapshot of one scraper's progress (no-op when CHECKPOINT=0)."""
+
+    def __init__(self, platform: str, outputs: List[str], id_field: str = "id",
+                 every: int = EVERY, resume: bool = RESUME, enabled: bool = ENABLED):
+        self.platform = platform
+        self.outputs = outputs
+        self.id_field = id_field
+        self.every = every
+        self.enabled = enabled
+        self.path = os.path.join(CHECKPOINT_DIR, f"{platform}.json")
+        self.states: Dict[str, SimpleNamespace] = {}
+        self.settings: Dict[str, Any] = {}
+        self.recovered: Set[str] = set()
+        self.resumed = False
+        self._pending = 0
+        if not enabled:
+            return
+        if resume:
+            self._load()
+        elif os.path.exists(self.path):
+            print(f"[CHECKPOINT] {platform}: earlier run left {self.path}; starting over (pass --resume to continue it)")
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            print(f"[CHECKPOINT] {self.platform}: nothing to resume ({self.path} missing); starting fresh")
+            return
+        except (OSError, ValueError) as e:
+            print(f"[CHECKPOINT] Could not read {self.path} ({e}); starting fresh")
+            return
+        self.states = {k: _decode(v) for k, v in data.get("states", {}).items()}
+        self.settings = data.get("settings", {})
+        for path, offset in data.get("outputs", {}).items():
+            self.recovered |= self._reconcile(path, int(offset))
+        self.resumed = True
+        done = sum(1 for st in self.states.values() if getattr(st, "done", False))
+        print(f"[CHECKPOINT] {self.platform}: resuming run checkpointed {time.ctime(data.get('saved_at', 0))} "
+              f"({done}/{len(self.states)} step(s) done, {len(self.recovered)} record(s) written after it)")
+
+    def _reconcile(self, path: str, offset: int) -> Set[str]:
+        """Ids of records appended to `path` after `offset`; drops a torn final line."""
+        ids: Set[str] = set()
+        try:
+            with open(path, "rb+") as f:
+                f.seek(offset)
+                tail = f.read()
+                good = tail.rfind(b"\n") + 1
+                if good < len(tail):
+                    f.truncate(offset + good)
+                for line in tail[:good].splitlines():
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get(self.id_field):
+                        ids.add(str(rec[self.id_field]))
+        except OSError:
+            pass
+        return ids
+
+    def setting(self, name: str, current: Any) -> Any:
+        """A run setting: the checkpointed value when resuming, else `current` (recorded for later)."""
+        if self.resumed and name in self.settings:
+            if current and current != self.settings[name]:
+                print(f"[CHECKPOINT] {name}: using the resumed run's {self.settings[name]!r} instead of {current!r}")
+            return self.settings[name]
+        self.settings[name] = current
+        return current
+
+    def written(self, item_id: str) -> bool:
+        """Was this item stored by the interrupted run after its last checkpoint?"""
+        return item_id in self.recovered
+
+    def tick(self, driver=None, st: Optional[SimpleNamespace] = None):
+        """Count one stored item; writes a checkpoint every `every` items."""
+        self._pending += 1
+        if self._pending >= self.every:
+            self.save(driver, st)
+
+    def done(self, st: SimpleNamespace, driver=None):
+        """Mark a term / mode finished and checkpoint it."""
+        st.done = True
+        self.save(driver, st)
+
+    def save(self, driver=None, st: Optional[SimpleNamespace] = None):
+        if not self.enabled:
+            return
+        self._pending = 0
+        if driver is not None and st is not None:
+            try:
+                st.scroll_y = int(driver.execute_script("return window.scrollY") or 0)
+            except Exception:
+                pass
+        data = {"platform": self.platform, "saved_at": time.time(), "settings": self.settings,
+                "states": {k: _encode(v) for k, v in self.states.items()},
+                "outputs": {p: os.path.getsize(p) for p in self.outputs if os.path.exists(p)}}
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[CHECKPOINT] Could not write {self.path}: {e}")
+
+    def complete(self):
+        """The run finished: nothing left to resume."""
+        if not self.enabled:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def resume_scroll(driver, st: SimpleNamespace, rounds: int = 30, pause: float = 0.8) -> bool:
+    """Scroll an infinite feed back down to the checkpointed position (best effort)."""
+    target = int(getattr(st, "scroll_y", 0) or 0)
+    if target <= 0:
+        return False
+    y = 0
+    for _ in range(rounds):
+        y = int(driver.execute_script("window.scrollTo(0, arguments[0]); return window.scrollY;", target) or 0)
+        if y >= target - 50:
+            break
+        time.sleep(pause)
+    print(f"[CHECKPOINT] Scrolled back to y={y} (checkpoint y={target})")
+    return y >= target - 50
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Inspect or clear a scraper checkpoint")
+    ap.add_argument("platform", choices=["twitter", "youtube", "instagram"])
+    ap.add_argument("--clear", action="store_true", help="Delete the checkpoint")
+    args = ap.parse_args()
+    path = os.path.join(CHECKPOINT_DIR, f"{args.platform}.json")
+    if args.clear:
+        try:
+            os.remove(path)
+            print(f"Removed {path}")
+        except OSError:
+            print(f"No checkpoint at {path}")
+    elif not os.path.exists(path):
+        print(f"No checkpoint at {path}")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        print(f"saved {time.ctime(data['saved_at'])}, settings={data.get('settings')}")
+        for key, st in data.get("states", {}).items():
+            seen = sum(len(v["__set__"]) for v in st.values() if isinstance(v, dict) and "__set__" in v)
+            print(f"  {key}: collected={st.get('collected', st.get('saved', 0))} seen={seen} "
+                  f"done={st.get('done', False)} scroll_y={st.get('scroll_y', 0)}")
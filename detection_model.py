@@ -165,13 +165,24 @@ def detect_content(text: str, image_path: Optional[str] = None) -> Tuple[bool, s
             return True, mreason, mscore
     return False, "clean", 0.0
 
+def detect_videos(paths, workers: Optional[int] = None, use_vision: Optional[bool] = None):
+    """Scene-change keyframe analysis of local video files (see video_analysis.py).
+    Keyframes go through detect_hate_meme and, if enabled, Gemini Vision.
+    """
+    from video_analysis import analyze_videos, USE_GEM_VISION
+    return analyze_videos(list(paths), workers=workers, use_vision=USE_GEM_VISION if use_vision is None else use_vision)
+
 if __name__ == "__main__":  # quick manual test / CLI
     import argparse
     ap = argparse.ArgumentParser(description="Test hate / anti-India (and meme) detection")
     ap.add_argument("--text", help="Text to classify", default="")
     ap.add_argument("--image", help="Optional image path (meme)", default="")
+    ap.add_argument("--video", action="append", default=[], help="Local video file or directory (repeatable)")
+    ap.add_argument("--workers", type=int, default=0, help="Process pool size for --video")
     args = ap.parse_args()
-    if not args.text and not args.image:
+    if args.video:
+        detect_videos(args.video, workers=args.workers or None)
+    elif not args.text and not args.image:
         samples = [
             "I absolutely hate India and want to destroy everything.",
             "Indian food is amazing!",
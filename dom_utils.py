@@ -0,0 +1,302 @@
+"""In-page bookkeeping for incremental scraping of infinite feeds.
+
+Processed cards are marked with a `data-seen` attribute so every scroll round
+only queries `:not([data-seen])` instead of re-reading the whole feed, and
+processed nodes well above the viewport are pruned (removed) or collapsed
+(media released, fixed height kept so the scroll position does not jump).
+Per-round cost and browser memory then stay flat over long runs.
+
+Waiting is event driven: FeedWaiter returns as soon as a MutationObserver sees
+new cards (or the network has gone idle with nothing new and no fetch / XHR
+in flight), but never before a politeness floor and never after a timeout. The fixed sleep each wait replaces
+is tracked so runs can report the idle time saved.
+
+Env Vars:
+  PRUNE_DOM=1               Set to 0 to keep processed nodes untouched
+  PRUNE_KEEP_SCREENS=2      Viewport heights of processed content kept above the fold
+  DOM_STATS_EVERY=10        Print node count / JS heap every N rounds (0 = never)
+  EVENT_WAIT=1              Set to 0 to fall back to the fixed sleeps
+  NET_IDLE_MS=800           Quiet network period that ends a wait with no new cards
+"""
+from __future__ import annotations
+import os, time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+PRUNE_ENABLED = os.getenv("PRUNE_DOM", "1").lower() in {"1","true","yes"}
+EVENT_WAIT = os.getenv("EVENT_WAIT", "1").lower() in {"1","true","yes"}
+NET_IDLE_MS = int(os.getenv("NET_IDLE_MS", "800"))
+KEEP_SCREENS = float(os.getenv("PRUNE_KEEP_SCREENS", "2"))
+STATS_EVERY = int(os.getenv("DOM_STATS_EVERY", "10"))
+
+# In-page text predicate; prepend to an extraction script. `groups` comes from
+# compile_text_filter: every group must have at least one term in the text.
+TEXT_MATCH_JS = r"""
+const __textMatch = (text, groups) => {
+  const low = (text || '').toLowerCase();
+  return groups.every(g => g.some(t => low.includes(t)));
+};
+"""
+
+
+def compile_text_filter(*term_groups) -> List[List[str]]:
+    """Lower-cased, de-duplicated term groups (AND across groups, OR within); empty groups are dropped."""
+    out = []
+    for group in term_groups:
+        terms = sorted({t.strip().lower() for t in (group or []) if t and t.strip()})
+        if terms:
+            out.append(terms)
+    return out
+
+
+def text_matches(text: str, groups: List[List[str]]) -> bool:
+    """Python twin of TEXT_MATCH_JS for data that is already on this side (API payloads)."""
+    low = (text or "").lower()
+    return all(any(t in low for t in g) for g in groups)
+
+
+class FilterStats:
+    """Per-round counts of cards rejected in the page by the text predicate."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.rounds = 0
+        self.rejected = 0
+        self.passed = 0
+
+    def round(self, rejected: int, passed: int):
+        self.rounds += 1
+        self.rejected += rejected
+        self.passed += passed
+        if rejected:
+            print(f"[FILTER] {self.label} round={self.rounds} rejected_in_page={rejected} passed={passed}")
+
+    def report(self):
+        if self.rejected:
+            print(f"[FILTER] {self.label} total rejected_in_page={self.rejected} passed={self.passed}")
+
+
+MARK_SEEN_JS = r"""
+for (const el of arguments[0]) { if (el && el.dataset) el.dataset.seen = '1'; }
+"""
+
+# arguments: selector of processed cards, viewport heights to keep, 'remove' | 'collapse'
+PRUNE_JS = r"""
+const sel = arguments[0], keep = arguments[1] * window.innerHeight, mode = arguments[2];
+let pruned = 0, removedHeight = 0;
+for (const el of document.querySelectorAll(sel)) {
+  if (el.dataset.pruned) continue;
+  const r = el.getBoundingClientRect();
+  if (r.bottom > -keep) continue;
+  for (const m of el.querySelectorAll('video')) {
+    try { m.pause(); m.removeAttribute('src'); m.load(); } catch (e) {}
+  }
+  for (const m of el.querySelectorAll('img, source')) {
+    m.removeAttribute('srcset'); m.removeAttribute('src');
+  }
+  if (mode === 'remove') {
+    removedHeight += r.height;
+    el.remove();
+  } else {
+    el.style.height = r.height + 'px';
+    el.style.contentVisibility = 'hidden';
+    el.dataset.pruned = '1';
+  }
+  pruned++;
+}
+if (removedHeight) window.scrollBy(0, -removedHeight);
+const mem = performance.memory ? performance.memory.usedJSHeapSize : 0;
+return {pruned: pruned, nodes: document.getElementsByTagName('*').length, heap: mem};
+"""
+
+
+def mark_seen(driver, elements: List[Any]) -> None:
+    """Mark WebElements as processed in one round trip."""
+    if not elements:
+        return
+    try:
+        driver.execute_script(MARK_SEEN_JS, elements)
+    except Exception:
+        pass
+
+
+class DomPruner:
+    """Collapses / removes processed nodes each round and reports DOM size."""
+
+    def __init__(self, label: str, selector: str, mode: str = "collapse"):
+        self.label = label
+        self.selector = selector
+        self.mode = mode
+        self.rounds = 0
+        self.total_pruned = 0
+
+    def __call__(self, driver) -> Dict[str, Any]:
+        self.rounds += 1
+        if not PRUNE_ENABLED:
+            return {}
+        try:
+            stats = driver.execute_script(PRUNE_JS, self.selector, KEEP_SCREENS, self.mode) or {}
+        except Exception:
+            return {}
+        self.total_pruned += int(stats.get("pruned", 0))
+        if STATS_EVERY and self.rounds % STATS_EVERY == 0:
+            heap_mb = (stats.get("heap") or 0) / 1e6
+            print(f"[DOM] {self.label} round={self.rounds} nodes={stats.get('nodes')} "
+                  f"heap={heap_mb:.0f}MB pruned_total={self.total_pruned}")
+        return stats
+
+
+# execute_async_script; arguments: selector, floor_ms, timeout_ms, net_idle_ms, callback.
+# Resolves with the reason once more elements match `selector` than at the start
+# (or the network is idle with nothing new), after at least floor_ms.
+# "Idle" needs zero fetch / XHR requests in flight: both are wrapped once per document
+# (window.__scrapeNet) so a slow feed request is not mistaken for the end of the feed.
+# The wait that installs the wrappers cannot see requests started before it and
+# never ends as idle.
+WAIT_NEW_JS = r"""
+const [sel, floor, timeout, idleMs, done] = arguments;
+const t0 = performance.now();
+const base = document.querySelectorAll(sel).length;
+const tracked = !!window.__scrapeNet;
+if (!tracked) {
+  const net = window.__scrapeNet = {inflight: 0, last: t0};
+  const end = () => { net.inflight = Math.max(0, net.inflight - 1); net.last = performance.now(); };
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function (...a) {
+    net.inflight++;
+    this.addEventListener('loadend', end, {once: true});
+    try { return send.apply(this, a); } catch (e) { end(); throw e; }
+  };
+  if (window.fetch) {
+    const fetch0 = window.fetch;
+    window.fetch = function (...a) {
+      net.inflight++;
+      let p;
+      try { p = fetch0.apply(this, a); } catch (e) { end(); throw e; }
+      return p.finally(end);
+    };
+  }
+}
+const net = window.__scrapeNet;
+let lastNet = t0, finished = false, grown = false;
+let po = null;
+try {
+  po = new PerformanceObserver(list => { if (list.getEntries().length) lastNet = performance.now(); });
+  po.observe({type: 'resource', buffered: false});
+} catch (e) {}
+const mo = new MutationObserver(() => {
+  if (!grown && document.querySelectorAll(sel).length > base) grown = true;
+});
+mo.observe(document.body, {childList: true, subtree: true});
+const finish = reason => {
+  if (finished) return;
+  finished = true;
+  mo.disconnect(); if (po) po.disconnect();
+  clearInterval(tick);
+  done({reason: reason, ms: performance.now() - t0, added: document.querySelectorAll(sel).length - base});
+};
+const tick = setInterval(() => {
+  const now = performance.now(), el = now - t0;
+  if (el < floor) return;
+  if (grown) return finish('new');
+  if (idleMs > 0 && tracked && net.inflight === 0 && now - Math.max(lastNet, net.last) >= idleMs) return finish('idle');
+  if (el >= timeout) return finish('timeout');
+}, 50);
+"""
+
+# execute_async_script; arguments: element (or list of elements), timeout_ms, callback.
+# Resolves once every <img> inside them has loaded and two animation frames have painted.
+WAIT_ELEMENT_READY_JS = r"""
+const [el, timeout, done] = arguments;
+const t0 = performance.now();
+const els = (Array.isArray(el) ? el : [el]).filter(e => e && e.isConnected);
+const ready = () => els.every(e => Array.from(e.querySelectorAll('img')).every(i => i.complete));
+const check = () => {
+  if (ready() || performance.now() - t0 >= timeout) {
+    requestAnimationFrame(() => requestAnimationFrame(() => done(performance.now() - t0)));
+  } else {
+    setTimeout(check, 40);
+  }
+};
+check();
+"""
+
+
+@contextmanager
+def script_timeout(driver, seconds: float):
+    """Set the async-script timeout for one execute_async_script call and restore the
+    driver's previous value afterwards (other callers keep their own setting)."""
+    try:
+        previous = driver.timeouts.script
+    except Exception:
+        previous = None
+    driver.set_script_timeout(seconds)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            try:
+                driver.set_script_timeout(previous)
+            except Exception:
+                pass
+
+
+class FeedWaiter:
+    """Event-driven replacement for fixed scroll / screenshot sleeps with savings accounting."""
+
+    def __init__(self, label: str, selector: str, floor: float, timeout: float):
+        self.label = label
+        self.selector = selector
+        self.floor = floor
+        self.timeout = timeout
+        self.waits = 0
+        self.waited = 0.0
+        self.baseline = 0.0
+        self.reasons: Dict[str, int] = {}
+
+    def _account(self, started: float, baseline: float, reason: str):
+        self.waits += 1
+        self.waited += time.time() - started
+        self.baseline += baseline
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def wait_new(self, driver, baseline: float) -> str:
+        """Wait for new feed content after a scroll. `baseline` is the fixed sleep this replaces."""
+        started = time.time()
+        if not EVENT_WAIT:
+            time.sleep(baseline)
+            self._account(started, baseline, "fixed")
+            return "fixed"
+        reason = "error"
+        try:
+            with script_timeout(driver, self.timeout + 5):
+                res = driver.execute_async_script(WAIT_NEW_JS, self.selector, int(self.floor * 1000),
+                                                  int(self.timeout * 1000), NET_IDLE_MS) or {}
+            reason = res.get("reason", "timeout")
+        except Exception:
+            remaining = self.floor - (time.time() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+        self._account(started, baseline, reason)
+        return reason
+
+    def wait_ready(self, driver, element, baseline: float, timeout: Optional[float] = None):
+        """Wait until element(s) scrolled into view have painted their images (before a screenshot)."""
+        started = time.time()
+        if not EVENT_WAIT:
+            time.sleep(baseline)
+            self._account(started, baseline, "fixed")
+            return
+        try:
+            with script_timeout(driver, (timeout or baseline) + 5):
+                driver.execute_async_script(WAIT_ELEMENT_READY_JS, element, int((timeout or baseline) * 1000))
+        except Exception:
+            pass
+        self._account(started, baseline, "ready")
+
+    def report(self):
+        if not self.waits:
+            return
+        saved = self.baseline - self.waited
+        print(f"[WAIT] {self.label} waits={self.waits} waited={self.waited:.1f}s fixed_equivalent={self.baseline:.1f}s "
+              f"idle_saved={saved:.1f}s reasons={self.reasons}")
@@ -0,0 +1,295 @@
+"""Run multi-term Twitter / YouTube searches on a pool of browser workers.
+
+run_search_mode (twitter_scrape.py) and the YouTube term loop handle terms one
+after another in a single Chrome. This launcher spreads the terms round-robin
+over N worker processes, each running the normal scraper script with:
+
+  - its own profile directory, cloned from the base automation profile (so the
+    logged-in session is reused and Chrome profile locks never collide),
+  - its own output shard (<out>/shards/wN, including the flagged dir),
+  - the same .seen_index files (seen_index.SeenIndex merges concurrent saves).
+
+A global cap on concurrent browser sessions is enforced with slot files in
+BROWSER_SLOTS_DIR, shared by every pool invocation on the machine; workers
+wait for a free slot before starting. When every worker has exited 0, shard
+screenshots are moved into the usual output / flagged dirs and shard
+metadata.jsonl / flagged_metadata.jsonl lines are appended (screenshot paths
+rewritten) to the usual files. After a crash or interruption the shards are
+left in place for the workers' --resume checkpoints (or --merge-only).
+
+Usage:
+  python driver_pool.py twitter --terms "a,b,c,d" --workers 3
+  python driver_pool.py youtube --workers 2          (terms from YT_SEARCH_TERMS)
+  python driver_pool.py twitter --resume             (same terms/workers: continue an interrupted run)
+
+Env Vars:
+  POOL_WORKERS=2            Default worker count
+  MAX_BROWSER_SESSIONS=4    Global cap on concurrently running pool browsers
+  BROWSER_SLOTS_DIR=.browser_slots
+  POOL_PROFILE_DIR=.pool_profiles   Where worker profiles are cloned
+  CHROME_AUTOMATION_DIR     Base profile to clone (default ./chrome_automation_profile)
+  CHECKPOINT_DIR=.checkpoints   Worker checkpoints go to <dir>/<platform>_wN
+"""
+from __future__ import annotations
+import os, sys, json, time, shutil, argparse, subprocess, threading
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKERS = int(os.getenv("POOL_WORKERS", "2"))
+MAX_SESSIONS = int(os.getenv("MAX_BROWSER_SESSIONS", "4"))
+SLOTS_DIR = os.getenv("BROWSER_SLOTS_DIR", ".browser_slots")
+PROFILE_ROOT = os.getenv("POOL_PROFILE_DIR", ".pool_profiles")
+CHECKPOINT_ROOT = os.getenv("CHECKPOINT_DIR", ".checkpoints")
+BASE_PROFILE = os.getenv("CHROME_AUTOMATION_DIR", os.path.join(os.getcwd(), "chrome_automation_profile"))
+
+# Per platform: script, env var carrying terms, output dir env + default, extra env
+PLATFORMS: Dict[str, Dict[str, object]] = {
+    "twitter": {
+        "script": "twitter_scrape.py", "terms_env": "TW_SEARCH_TERMS",
+        "out_env": "TW_OUT_DIR", "out_default": "twitter_posts",
+        "extra": {"TW_MODE": "SEARCH", "TW_INTERACTIVE": "0"},
+    },
+    "youtube": {
+        "script": "youtube_scrape.py", "terms_env": "YT_SEARCH_TERMS",
+        "out_env": "YT_OUT_DIR", "out_default": "youtube_videos",
+        "extra": {},
+    },
+}
+
+# Caches and lock files are not worth cloning (and the Singleton* locks would block startup)
+_PROFILE_IGNORE = shutil.ignore_patterns(
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "Service Worker",
+    "Crashpad", "BrowserMetrics*", "Singleton*", "*.tmp", "lockfile",
+)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class SessionSlots:
+    """Machine-wide counting semaphore over slot files (slot_N holds the owner's pid)."""
+
+    def __init__(self, cap: int = MAX_SESSIONS, directory: str = SLOTS_DIR):
+        self.cap = max(1, cap)
+        self.dir = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _try(self) -> Optional[str]:
+        for n in range(self.cap):
+            path = os.path.join(self.dir, f"slot_{n}")
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        owner = int(f.read().strip() or 0)
+                except (OSError, ValueError):
+                    owner = 0
+                if owner and not _pid_alive(owner):
+                    try: os.remove(path)
+                    except OSError: pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(str(os.getpid()))
+            return path
+        return None
+
+    def acquire(self, label: str = "") -> str:
+        announced = False
+        while True:
+            slot = self._try()
+            if slot:
+                return slot
+            if not announced:
+                print(f"[POOL] {label} waiting for a browser slot (cap {self.cap})")
+                announced = True
+            time.sleep(1.0)
+
+    def release(self, slot: str) -> None:
+        try: os.remove(slot)
+        except OSError: pass
+
+
+def clone_profile(name: str, fresh: bool = False, root: str = PROFILE_ROOT) -> str:
+    """Copy of the base automation profile at <root>/<name> (made once unless `fresh`)."""
+    dest = os.path.abspath(os.path.join(root, name))
+    if fresh and os.path.isdir(dest):
+        shutil.rmtree(dest, ignore_errors=True)
+    if not os.path.isdir(dest):
+        if os.path.isdir(BASE_PROFILE):
+            shutil.copytree(BASE_PROFILE, dest, ignore=_PROFILE_IGNORE, dirs_exist_ok=True)
+        else:
+            os.makedirs(dest, exist_ok=True)
+    return dest
+
+
+def split_terms(terms: List[str], workers: int) -> List[List[str]]:
+    shards = [terms[i::workers] for i in range(max(1, min(workers, len(terms))))]
+    return [s for s in shards if s]
+
+
+def _pump(proc: subprocess.Popen, tag: str) -> None:
+    for line in iter(proc.stdout.readline, ""):
+        sys.stdout.write(f"[{tag}] {line}")
+        sys.stdout.flush()
+
+
+def _run_worker(platform: str, idx: int, terms: List[str], out_dir: str, slots: SessionSlots,
+                fresh: bool, results: Dict[int, int]) -> None:
+    cfg = PLATFORMS[platform]
+    tag = f"w{idx}"
+    shard = os.path.join(out_dir, "shards", tag)
+    env = os.environ.copy()
+    env.update(cfg["extra"])  # type: ignore[arg-type]
+    env.update({
+        cfg["terms_env"]: ",".join(terms),  # type: ignore[dict-item]
+        cfg["out_env"]: shard,  # type: ignore[dict-item]
+        "FLAGGED_DIR": os.path.join(shard, "flagged"),
+        "FLAGGED_META_PATH": os.path.join(shard, "flagged", "flagged_metadata.jsonl"),
+        "CHROME_AUTOMATION_DIR": clone_profile(tag, fresh),
+        # outside the shard, which is merged away at the end (see checkpoint.py)
+        "CHECKPOINT_DIR": os.path.join(CHECKPOINT_ROOT, f"{platform}_{tag}"),
+        "ATTACH_EXISTING": "0",
+        "PYTHONUNBUFFERED": "1",
+    })
+    slot = slots.acquire(tag)
+    started = time.time()
+    print(f"[POOL] {tag} start terms={terms} shard={shard}")
+    try:
+        proc = subprocess.Popen([sys.executable, os.path.join(BASE_DIR, str(cfg["script"]))], env=env,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, encoding="utf-8", errors="replace")
+        _pump(proc, tag)
+        results[idx] = proc.wait()
+    finally:
+        slots.release(slot)
+    print(f"[POOL] {tag} exit={results.get(idx)} elapsed={time.time() - started:.0f}s")
+
+
+def _move(src: str, dest_dir: str, tag: str) -> str:
+    os.makedirs(dest_dir, exist_ok=True)
+    dest = os.path.join(dest_dir, os.path.basename(src))
+    if os.path.exists(dest):
+        dest = os.path.join(dest_dir, f"{tag}_{os.path.basename(src)}")
+    shutil.move(src, dest)
+    return dest
+
+
+def _merge_meta(src: str, dest: str, moved: Dict[str, str]) -> int:
+    if not os.path.exists(src):
+        return 0
+    n = 0
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    with open(src, "r", encoding="utf-8") as fin, open(dest, "a", encoding="utf-8") as fout:
+        for line in fin:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            shot = rec.get("screenshot")
+            if shot and os.path.abspath(shot) in moved:
+                rec["screenshot"] = moved[os.path.abspath(shot)]
+            fout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+
+def merge_shards(out_dir: str, flagged_dir: str, flagged_meta: str) -> Dict[str, int]:
+    """Fold every shard under <out_dir>/shards into the usual output files, then remove it."""
+    totals = {"records": 0, "flagged": 0, "files": 0}
+    shards_root = os.path.join(out_dir, "shards")
+    if not os.path.isdir(shards_root):
+        return totals
+    for tag in sorted(os.listdir(shards_root)):
+        shard = os.path.join(shards_root, tag)
+        moved: Dict[str, str] = {}
+        for sub, dest_dir in ((shard, out_dir), (os.path.join(shard, "flagged"), flagged_dir)):
+            if not os.path.isdir(sub):
+                continue
+            for name in os.listdir(sub):
+                path = os.path.join(sub, name)
+                if os.path.isfile(path) and not name.endswith(".jsonl"):
+                    moved[os.path.abspath(path)] = _move(path, dest_dir, tag)
+                    totals["files"] += 1
+        totals["records"] += _merge_meta(os.path.join(shard, "metadata.jsonl"),
+                                         os.path.join(out_dir, "metadata.jsonl"), moved)
+        totals["flagged"] += _merge_meta(os.path.join(shard, "flagged", "flagged_metadata.jsonl"),
+                                         flagged_meta, moved)
+        shutil.rmtree(shard, ignore_errors=True)
+    try: os.rmdir(shards_root)
+    except OSError: pass
+    return totals
+
+
+def run_pool(platform: str, terms: List[str], workers: int = WORKERS, max_sessions: int = MAX_SESSIONS,
+             fresh_profiles: bool = False) -> Dict[str, int]:
+    cfg = PLATFORMS[platform]
+    out_dir = os.environ.get(str(cfg["out_env"]), str(cfg["out_default"]))
+    flagged_dir = os.environ.get("FLAGGED_DIR", os.path.join(out_dir, "flagged"))
+    flagged_meta = os.environ.get("FLAGGED_META_PATH", os.path.join(flagged_dir, "flagged_metadata.jsonl"))
+    shards = split_terms(terms, workers)
+    if not shards:
+        print("[POOL] No search terms")
+        return {}
+    slots = SessionSlots(max_sessions)
+    results: Dict[int, int] = {}
+    started = time.time()
+    print(f"[POOL] {platform}: {len(terms)} term(s) on {len(shards)} worker(s), session cap {slots.cap}")
+    threads = [threading.Thread(target=_run_worker, args=(platform, i, s, out_dir, slots, fresh_profiles, results),
+                                daemon=True) for i, s in enumerate(shards)]
+    for t in threads:
+        t.start()
+    finished = False
+    try:
+        for t in threads:
+            t.join()
+        finished = True
+    finally:
+        # A worker that crashed or was interrupted continues from its checkpoint with --resume,
+        # and that checkpoint's output offsets point into its shard: merging would pull the shard away
+        failed = [i for i in range(len(shards)) if results.get(i) != 0]
+        if not finished or failed:
+            print(f"[POOL] {'Interrupted' if not finished else f'Worker(s) {failed} failed'}; shards left in "
+                  f"{os.path.join(out_dir, 'shards')}. Continue with: python driver_pool.py {platform} "
+                  f"--terms \"{','.join(terms)}\" --workers {len(shards)} --resume "
+                  f"(or keep the partial results with --merge-only)")
+    if failed:
+        return {}
+    totals = merge_shards(out_dir, flagged_dir, flagged_meta)
+    print(f"[POOL] Done in {time.time() - started:.0f}s: merged {totals['records']} record(s), "
+          f"{totals['flagged']} flagged, {totals['files']} file(s)")
+    return totals
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Spread search terms over a pool of browser workers")
+    ap.add_argument("platform", choices=sorted(PLATFORMS))
+    ap.add_argument("--terms", default="", help="Comma separated (default: TW_SEARCH_TERMS / YT_SEARCH_TERMS)")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--max-sessions", type=int, default=MAX_SESSIONS, help="Global cap on concurrent browsers")
+    ap.add_argument("--fresh-profiles", action="store_true", help="Re-clone worker profiles from the base profile")
+    ap.add_argument("--merge-only", action="store_true", help="Only merge shards left by an interrupted run")
+    ap.add_argument("--resume", action="store_true", help="Workers continue from their checkpoints")
+    args = ap.parse_args()
+    if args.resume:
+        os.environ["RESUME"] = "1"
+    cfg = PLATFORMS[args.platform]
+    if args.merge_only:
+        out = os.environ.get(str(cfg["out_env"]), str(cfg["out_default"]))
+        fdir = os.environ.get("FLAGGED_DIR", os.path.join(out, "flagged"))
+        print(merge_shards(out, fdir, os.environ.get("FLAGGED_META_PATH", os.path.join(fdir, "flagged_metadata.jsonl"))))
+        sys.exit(0)
+    raw = args.terms or os.environ.get(str(cfg["terms_env"]), "")
+    term_list = [t.strip() for t in raw.split(",") if t.strip()]
+    run_pool(args.platform, term_list, args.workers, args.max_sessions, args.fresh_profiles)
@@ -0,0 +1,433 @@
+"""Embedding index over every stored capture for coordinated-campaign lookup.
+
+Each captured text (tweet text, YouTube titles, trend topics, reel context,
+optionally OCR text of screenshots) is embedded into a fixed-width float32
+vector and appended to a NumPy memory-mapped matrix. "Which earlier captures
+across Twitter / YouTube / Instagram say the same thing?" then becomes a
+chunked matrix product instead of grepping JSONL files.
+
+Layout (inside EMBED_INDEX_DIR):
+  vectors.f32    - raw float32 matrix, capacity rows x dim (L2-normalised rows)
+  records.jsonl  - one line per row: key, platform, id, text snippet, source, captured_at
+  keys.u64       - per row: 64-bit fingerprint of the record key (id lookup without parsing records)
+  offsets.u64    - per row: byte offset of the row's line in records.jsonl
+  state.json     - {"count", "capacity", "dim", "encoder", "rec_bytes"}; written last by
+                   every append, so anything past count / rec_bytes is cut off on open
+
+Env Vars:
+  EMBED_INDEX_DIR=.embed_index  Index directory
+  EMBED_DIM=256                 Vector width for the default hashed encoder
+  EMBED_MODEL                   Optional sentence-transformers model id. When unset
+                                (default) a hashed word/bigram encoder is used, which
+                                needs only NumPy and is stable across processes.
+  EMBED_CHUNK=131072            Rows scored per matmul chunk during search
+
+CLI:
+  python embedding_index.py build [--ocr]
+  python embedding_index.py query --id <record id> [-k 10] [--earlier]
+  python embedding_index.py query --text "free text" [-k 10]
+  python embedding_index.py query --flagged [-k 5] [--earlier]
+"""
+from __future__ import annotations
+import os, re, json, time, zlib, hashlib
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+INDEX_DIR = os.getenv("EMBED_INDEX_DIR", ".embed_index")
+EMBED_DIM = int(os.getenv("EMBED_DIM", "256"))
+EMBED_MODEL = os.getenv("EMBED_MODEL", "").strip()
+SEARCH_CHUNK = int(os.getenv("EMBED_CHUNK", "131072"))
+_DEBUG = os.getenv("DEBUG_DETECT", "0").lower() in {"1","true","yes"}
+
+# (platform, metadata path) pairs scanned by `build`; paths follow each scraper's defaults.
+SOURCES = [
+    ("twitter", os.path.join(os.getenv("TW_OUT_DIR", "twitter_posts"), "metadata.jsonl")),
+    ("twitter", os.path.join(os.getenv("TW_OUT_DIR", "twitter_posts"), "flagged", "flagged_metadata.jsonl")),
+    ("youtube", os.path.join(os.getenv("YT_OUT_DIR", "youtube_videos"), "metadata.jsonl")),
+    ("youtube", os.path.join(os.getenv("YT_OUT_DIR", "youtube_videos"), "flagged", "flagged_metadata.jsonl")),
+    ("instagram", os.path.join("reels_screenshots", "metadata.jsonl")),
+    ("instagram", os.path.join("reels_screenshots", "flagged", "flagged_metadata.jsonl")),
+]
+# Record fields that carry text worth embedding, in priority order.
+TEXT_FIELDS = ("text", "title", "topic", "caption", "ocr_text", "thumb_alt", "context")
+
+_TOKEN_RE = re.compile(r"[#@]?\w+", re.UNICODE)
+
+
+# ================= Encoders =================
+
+def _hashed_encode(texts: List[str], dim: int):
+    """Signed feature hashing of word unigrams + bigrams (log-tf), L2-normalised.
+    crc32 is used instead of hash() so vectors are identical across processes.
+    """
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        toks = _TOKEN_RE.findall((text or "").lower())
+        feats: Dict[int, float] = {}
+        grams = toks + [a + " " + b for a, b in zip(toks, toks[1:])]
+        for g in grams:
+            h = zlib.crc32(g.encode("utf-8"))
+            idx = h % dim
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            feats[idx] = feats.get(idx, 0.0) + sign
+        for idx, v in feats.items():
+            out[row, idx] = np.sign(v) * np.log1p(abs(v))
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return out / norms
+
+
+_st_model = None
+
+def _model_encode(texts: List[str]):
+    global _st_model
+    if _st_model is None:
+        from sentence_transformers import SentenceTransformer  # type: ignore
+        _st_model = SentenceTransformer(EMBED_MODEL)
+    vecs = _st_model.encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+    return np.asarray(vecs, dtype=np.float32)
+
+
+def encoder_name() -> str:
+    return f"st:{EMBED_MODEL}" if EMBED_MODEL else f"hash:{EMBED_DIM}"
+
+
+def encode(texts: List[str]):
+    if EMBED_MODEL:
+        try:
+            return _model_encode(texts)
+        except Exception as e:
+            raise RuntimeError(f"EMBED_MODEL={EMBED_MODEL} could not be loaded: {e}")
+    return _hashed_encode(texts, EMBED_DIM)
+
+
+# ================= Index =================
+
+def key_hash(key: str) -> int:
+    """64-bit key fingerprint stored in keys.u64 (verified against the record on lookup)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _truncate(path: str, size: int):
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, "r+b") as f:
+            f.truncate(size)
+
+
+class EmbeddingIndex:
+    """Append-only memory-mapped vector matrix with a parallel records.jsonl.
+
+    Records are not parsed on open: keys.u64 / offsets.u64 map rows to key
+    fingerprints and byte offsets, so a query reads only the rows it prints.
+    Every file is cut back to the committed state on open, which drops rows
+    appended by an add() that did not reach _save_state().
+    """
+
+    def __init__(self, path: str = INDEX_DIR):
+        if np is None:
+            raise RuntimeError("numpy is required for the embedding index (pip install numpy)")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.vec_path = os.path.join(path, "vectors.f32")
+        self.rec_path = os.path.join(path, "records.jsonl")
+        self.key_path = os.path.join(path, "keys.u64")
+        self.off_path = os.path.join(path, "offsets.u64")
+        self.state_path = os.path.join(path, "state.json")
+        self.state = {"count": 0, "capacity": 0, "dim": 0, "encoder": encoder_name(), "rec_bytes": 0}
+        legacy = False
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            legacy = "rec_bytes" not in saved
+            self.state.update(saved)
+            if self.state["encoder"] != encoder_name():
+                raise RuntimeError(f"Index at {path} was built with {self.state['encoder']}, "
+                                   f"current encoder is {encoder_name()}; use a different EMBED_INDEX_DIR")
+        rows = self.state["count"] * 8
+        if legacy or any(not os.path.exists(p) or os.path.getsize(p) < rows for p in (self.key_path, self.off_path)):
+            self._rebuild_maps()
+        # Cut everything back to the last committed add() (orphans of an interrupted append)
+        _truncate(self.rec_path, self.state["rec_bytes"])
+        _truncate(self.key_path, self.state["count"] * 8)
+        _truncate(self.off_path, self.state["count"] * 8)
+        self._mm = None
+        self._keys = None
+        self._offsets = None
+
+    def _rebuild_maps(self):
+        """keys.u64 / offsets.u64 (and rec_bytes) from the first `count` lines of records.jsonl."""
+        keys, offsets = [], []
+        pos = 0
+        if os.path.exists(self.rec_path):
+            with open(self.rec_path, "rb") as f:
+                for line in f:
+                    if len(keys) >= self.state["count"] or not line.endswith(b"\n"):
+                        break
+                    keys.append(key_hash(json.loads(line)["key"]))
+                    offsets.append(pos)
+                    pos += len(line)
+        self.state["count"] = len(keys)
+        self.state["rec_bytes"] = pos
+        np.asarray(keys, dtype=np.uint64).tofile(self.key_path)
+        np.asarray(offsets, dtype=np.uint64).tofile(self.off_path)
+        self._save_state()
+
+    @property
+    def count(self) -> int:
+        return self.state["count"]
+
+    def _matrix(self):
+        if self._mm is None and self.state["capacity"]:
+            self._mm = np.memmap(self.vec_path, dtype=np.float32, mode="r+",
+                                 shape=(self.state["capacity"], self.state["dim"]))
+        return self._mm
+
+    def _row_map(self, path: str):
+        if not self.count:
+            return np.zeros(0, dtype=np.uint64)
+        return np.memmap(path, dtype=np.uint64, mode="r", shape=(self.count,))
+
+    def key_rows(self):
+        if self._keys is None:
+            self._keys = self._row_map(self.key_path)
+        return self._keys
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        if not self.state["dim"]:
+            self.state["dim"] = dim
+        need = self.count + rows
+        if need <= self.state["capacity"]:
+            return
+        new_cap = max(need, self.state["capacity"] * 2, 1024)
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm = None
+        # Grow the backing file in place; existing rows keep their offsets.
+        with open(self.vec_path, "ab") as f:
+            f.truncate(new_cap * self.state["dim"] * 4)
+        self.state["capacity"] = new_cap
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.state_path)
+
+    def add(self, items: List[Dict[str, Any]], batch: int = 512) -> int:
+        """Append records that are not yet indexed. Each item needs key + text."""
+        known = set(self.key_rows().tolist())
+        fresh = []
+        for it in items:
+            h = key_hash(it["key"])
+            # 64-bit fingerprints: a collision among a few million keys is negligible
+            if h in known or not (it.get("text") or "").strip():
+                continue
+            known.add(h)
+            fresh.append((h, it))
+        added = 0
+        for start in range(0, len(fresh), batch):
+            chunk = fresh[start:start + batch]
+            vecs = encode([c["text"] for _, c in chunk])
+            self._ensure_capacity(len(chunk), vecs.shape[1])
+            mm = self._matrix()
+            mm[self.count:self.count + len(chunk)] = vecs
+            mm.flush()
+            offsets, pos = [], self.state["rec_bytes"]
+            with open(self.rec_path, "ab") as f:
+                for _, c in chunk:
+                    rec = dict(c)
+                    rec["text"] = rec["text"][:300]
+                    line = (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+                    f.write(line)
+                    offsets.append(pos)
+                    pos += len(line)
+            with open(self.key_path, "ab") as f:
+                np.asarray([h for h, _ in chunk], dtype=np.uint64).tofile(f)
+            with open(self.off_path, "ab") as f:
+                np.asarray(offsets, dtype=np.uint64).tofile(f)
+            # Commit point: rows past count / rec_bytes are dropped on the next open
+            self.state["count"] += len(chunk)
+            self.state["rec_bytes"] = pos
+            self._save_state()
+            self._keys = self._offsets = None
+            added += len(chunk)
+        return added
+
+    def record(self, row: int) -> Dict[str, Any]:
+        if self._offsets is None:
+            self._offsets = self._row_map(self.off_path)
+        with open(self.rec_path, "rb") as f:
+            f.seek(int(self._offsets[row]))
+            return json.loads(f.readline())
+
+    def iter_records(self) -> Iterable[Tuple[int, Dict[str, Any]]]:
+        """(row, record) for every committed row, in order."""
+        with open(self.rec_path, "rb") as f:
+            for row in range(self.count):
+                yield row, json.loads(f.readline())
+
+    def vector(self, row: int):
+        return np.array(self._matrix()[row])
+
+    def find(self, rid: str) -> Optional[int]:
+        """Row of a record key (platform:id) or bare id."""
+        keys = [rid] if ":" in rid else [f"{p}:{rid}" for p in ("twitter", "youtube", "instagram")]
+        rows = self.key_rows()
+        for key in keys:
+            for row in np.flatnonzero(rows == np.uint64(key_hash(key))):
+                if self.record(int(row)).get("key") == key:
+                    return int(row)
+        return None
+
+    def search(self, queries, k: int = 10) -> List[List[Tuple[int, float]]]:
+        """Batched top-k cosine search. `queries` is (b, dim), rows L2-normalised."""
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n = self.count
+        if not n:
+            return [[] for _ in range(len(q))]
+        k = min(k, n)
+        mm = self._matrix()
+        best_s = np.full((len(q), 0), -np.inf, dtype=np.float32)
+        best_i = np.zeros((len(q), 0), dtype=np.int64)
+        for start in range(0, n, SEARCH_CHUNK):
+            block = mm[start:min(n, start + SEARCH_CHUNK)]
+            sims = q @ block.T
+            kk = min(k, sims.shape[1])
+            part = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+            cand_s = np.take_along_axis(sims, part, axis=1)
+            best_s = np.concatenate([best_s, cand_s], axis=1)
+            best_i = np.concatenate([best_i, part + start], axis=1)
+            if best_s.shape[1] > k:
+                keep = np.argpartition(-best_s, k - 1, axis=1)[:, :k]
+                best_s = np.take_along_axis(best_s, keep, axis=1)
+                best_i = np.take_along_axis(best_i, keep, axis=1)
+        order = np.argsort(-best_s, axis=1)
+        best_s = np.take_along_axis(best_s, order, axis=1)
+        best_i = np.take_along_axis(best_i, order, axis=1)
+        return [[(int(i), float(s)) for i, s in zip(ri, rs)] for ri, rs in zip(best_i, best_s)]
+
+
+# ================= Ingest =================
+
+def record_text(rec: Dict[str, Any]) -> str:
+    parts = [str(rec[f]).strip() for f in TEXT_FIELDS if rec.get(f) and isinstance(rec.get(f), str)]
+    return " \n".join(p for p in parts if p)
+
+
+def record_id(rec: Dict[str, Any]) -> str:
+    return str(rec.get("video_id") or rec.get("shortcode") or rec.get("id") or "")
+
+
+def iter_source_records(ocr: bool = False) -> Iterable[Dict[str, Any]]:
+    _ocr = None
+    if ocr:
+        try:
+            from meme_detection import _ocr  # type: ignore
+        except Exception:
+            _ocr = None
+    for platform, path in SOURCES:
+        if not os.path.exists(path):
+            continue
+        flagged = "flagged" in os.path.basename(path)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                rid = record_id(rec)
+                if not rid:
+                    continue
+                text = record_text(rec)
+                shot = rec.get("screenshot") or ""
+                if _ocr and shot:
+                    shot = shot.replace("\\", os.sep)
+                    if os.path.exists(shot):
+                        ocr_txt = _ocr(shot)
+                        if ocr_txt:
+                            text = (text + " \n" + ocr_txt).strip()
+                yield {
+                    "key": f"{platform}:{rid}",
+                    "platform": platform,
+                    "id": rid,
+                    "text": text,
+                    "source": path,
+                    "flagged": flagged,
+                    "flag_reason": rec.get("flag_reason", ""),
+                    "captured_at": rec.get("captured_at", ""),
+                }
+
+
+def build(index: EmbeddingIndex, ocr: bool = False) -> int:
+    t0 = time.time()
+    added = index.add(list(iter_source_records(ocr=ocr)))
+    print(f"[INDEX] Added {added} record(s); total={index.count} dim={index.state['dim']} in {time.time()-t0:.2f}s")
+    return added
+
+
+def _print_hits(index: EmbeddingIndex, hits: List[Tuple[int, float]], exclude: Optional[int] = None,
+                before: str = "", k: int = 10):
+    shown = 0
+    for row, score in hits:
+        if row == exclude:
+            continue
+        rec = index.record(row)
+        if before and rec.get("captured_at") and rec["captured_at"] >= before:
+            continue
+        print(f"  {score:.3f}  {rec['key']:<40} {rec.get('captured_at','')[:19]}  {rec['text'][:90]!r}")
+        shown += 1
+        if shown >= k:
+            break
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Embedding index over scraped captures")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Append new records from all metadata files")
+    b.add_argument("--ocr", action="store_true", help="Also OCR screenshots (slow; needs pytesseract)")
+    q = sub.add_parser("query", help="Top-k similar captures")
+    q.add_argument("--id", help="Record id (status/video id or platform:id)")
+    q.add_argument("--text", help="Free text query")
+    q.add_argument("--flagged", action="store_true", help="Neighbours for every flagged record")
+    q.add_argument("-k", type=int, default=10)
+    q.add_argument("--earlier", action="store_true", help="Only show captures older than the query record")
+    args = ap.parse_args()
+
+    t_open = time.perf_counter()
+    idx = EmbeddingIndex()
+    open_ms = (time.perf_counter() - t_open) * 1000
+    if args.cmd == "build":
+        build(idx, ocr=args.ocr)
+    else:
+        t0 = time.perf_counter()
+        # Timings include opening the index (state + maps), i.e. the CLI's end-to-end latency
+        took = lambda: f"{open_ms + (time.perf_counter() - t0) * 1000:.1f} ms incl. {open_ms:.1f} ms open"
+        if args.text:
+            hits = idx.search(encode([args.text]), k=args.k)[0]
+            print(f"[QUERY] text={args.text[:60]!r} ({took()} over {idx.count})")
+            _print_hits(idx, hits, k=args.k)
+        elif args.id:
+            row = idx.find(args.id)
+            if row is None:
+                print(f"[QUERY] Unknown record id {args.id}; run `build` first?")
+            else:
+                hits = idx.search(idx.vector(row), k=args.k * 2 + 1)[0]
+                rec = idx.record(row)
+                print(f"[QUERY] {rec['key']} ({took()} over {idx.count}) {rec['text'][:80]!r}")
+                _print_hits(idx, hits, exclude=row, before=rec.get("captured_at", "") if args.earlier else "", k=args.k)
+        elif args.flagged:
+            flagged = [(r, rec) for r, rec in idx.iter_records() if rec.get("flagged")]
+            for start in range(0, len(flagged), 256):
+                batch = flagged[start:start + 256]
+                results = idx.search(np.stack([idx.vector(r) for r, _ in batch]), k=args.k * 2 + 1)
+                for (row, rec), hits in zip(batch, results):
+                    print(f"[FLAGGED] {rec['key']} {rec.get('flag_reason','')[:40]} {rec['text'][:60]!r}")
+                    _print_hits(idx, hits, exclude=row, before=rec.get("captured_at", "") if args.earlier else "", k=args.k)
+            print(f"[QUERY] {len(flagged)} flagged record(s) in {took()} over {idx.count}")
+        else:
+            ap.error("query needs --id, --text or --flagged")
@@ -50,6 +50,14 @@ def _cache_path(image_bytes: bytes, context: str) -> str:
     return os.path.join(_CACHE_DIR, f"vision_{h}.json")
 
 
+def _mime_type(image_bytes: bytes) -> str:
+    if image_bytes[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
 def classify_image(image_path: str, context_text: str = "") -> Optional[Dict[str, Any]]:
     if not _API_KEY or not requests:
         return None
@@ -75,7 +83,7 @@ def classify_image(image_path: str, context_text: str = "") -> Optional[Dict[str
         "contents": [
             {"parts": [
                 {"text": PROMPT},
-                {"inline_data": {"mime_type": "image/png", "data": b64}},
+                {"inline_data": {"mime_type": _mime_type(img_bytes), "data": b64}},
                 {"text": (context_text[:800] or "(no additional text context)")}
             ]}
         ],
@@ -0,0 +1,96 @@
+"""Map Instagram reels to caption / author / hashtags from captured API responses.
+
+The reels feed, hashtag pages and clips endpoints all return media objects of
+the same shape (`code`, `caption.text`, `user.username`, `video_versions`),
+nested at varying depths in GraphQL (`xdt_api__v1__clips__home__connection_v2`)
+and REST (`/api/v1/clips/...`) payloads. We walk each payload generically and
+index media by shortcode and by video URL so a `<video>` element can be
+resolved either through its `/reel/<code>/` link, the `/reels/<code>/` page
+path, or its (non-blob) src.
+"""
+from __future__ import annotations
+import re
+from typing import Dict, Any, Iterator, Optional
+
+API_PATTERNS = ["/graphql/query", "/api/graphql", "/api/v1/clips/", "/api/v1/feed/", "/api/v1/media/"]
+_HASHTAG_RE = re.compile(r"#(\w+)", re.UNICODE)
+_CODE_RE = re.compile(r"/(?:reels?|p)/([A-Za-z0-9_-]{5,})")
+
+
+def shortcode_from_url(url: str) -> str:
+    m = _CODE_RE.search(url or "")
+    return m.group(1) if m else ""
+
+
+def _strip_query(url: str) -> str:
+    return (url or "").split("?", 1)[0]
+
+
+def _media(obj: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    code = obj.get("code")
+    if not isinstance(code, str) or not code:
+        return None
+    if not any(k in obj for k in ("caption", "video_versions", "user", "owner")):
+        return None
+    cap = obj.get("caption")
+    if isinstance(cap, dict):
+        caption = cap.get("text") or ""
+    elif isinstance(cap, str):
+        caption = cap
+    else:
+        caption = ""
+    user = obj.get("user") or obj.get("owner") or {}
+    return {
+        "shortcode": code,
+        "media_id": str(obj.get("pk") or obj.get("id") or ""),
+        "caption": caption,
+        "author": user.get("username", "") if isinstance(user, dict) else "",
+        "hashtags": sorted(set(h.lower() for h in _HASHTAG_RE.findall(caption))),
+        "taken_at": obj.get("taken_at") or "",
+        "video_urls": [v.get("url", "") for v in (obj.get("video_versions") or []) if isinstance(v, dict)],
+    }
+
+
+def iter_reel_media(payload: Any, depth: int = 0) -> Iterator[Dict[str, Any]]:
+    if depth > 40:
+        return
+    if isinstance(payload, dict):
+        m = _media(payload)
+        if m:
+            yield m
+        for v in payload.values():
+            if isinstance(v, (dict, list)):
+                yield from iter_reel_media(v, depth + 1)
+    elif isinstance(payload, list):
+        for v in payload:
+            if isinstance(v, (dict, list)):
+                yield from iter_reel_media(v, depth + 1)
+
+
+class ReelIndex:
+    """Shortcode / video-URL -> media metadata, filled from API payloads as they arrive."""
+
+    def __init__(self):
+        self.by_code: Dict[str, Dict[str, Any]] = {}
+        self.by_src: Dict[str, str] = {}
+
+    def add_payload(self, payload: Any) -> int:
+        n = 0
+        for m in iter_reel_media(payload):
+            prev = self.by_code.get(m["shortcode"])
+            if prev and prev.get("caption") and not m["caption"]:
+                continue
+            self.by_code[m["shortcode"]] = m
+            for u in m["video_urls"]:
+                self.by_src[_strip_query(u)] = m["shortcode"]
+            n += 1
+        return n
+
+    def lookup(self, code: str = "", src: str = "") -> Optional[Dict[str, Any]]:
+        if code and code in self.by_code:
+            return self.by_code[code]
+        if src and not src.startswith("blob:"):
+            c = self.by_src.get(_strip_query(src))
+            if c:
+                return self.by_code.get(c)
+        return None
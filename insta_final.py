@@ -2,30 +2,52 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 import time, os, sys, hashlib, json
+from types import SimpleNamespace
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
+from cdp_capture import NetworkCapture, enable_network_logging
+from insta_api import API_PATTERNS, ReelIndex, shortcode_from_url
+from seen_index import SeenIndex
+from dom_utils import DomPruner, FeedWaiter, TEXT_MATCH_JS, FilterStats, compile_text_filter, text_matches, script_timeout
+from screen_capture import BatchCapture
+from session_store import SessionStore
+from profile_manager import automation_profile, keep_profiles
+from supervisor import DriverSupervisor, is_session_failure, loop_state
+from checkpoint import Checkpoint, resume_scroll
+from pacer import Pacer
 
 chrome_profile_path = r"C:\Users\Asus\AppData\Local\Google\Chrome\User Data"
 
 options = webdriver.ChromeOptions()
 
-automation_dir = os.environ.get(
-    "CHROME_AUTOMATION_DIR",
-    os.path.join(os.getcwd(), "chrome_automation_profile")
-)
-os.makedirs(automation_dir, exist_ok=True)
+automation_dir = automation_profile("instagram")  # LEAN_PROFILE=1: disposable copy (profile_manager.py)
 options.add_argument(f"--user-data-dir={automation_dir}")
 profile_dir = os.environ.get("CHROME_PROFILE_DIR", "Default")
 options.add_argument(f"--profile-directory={profile_dir}")
 options.add_argument("--disable-blink-features=AutomationControlled")
+# Capture reels feed API responses (captions, authors, hashtags) through CDP
+CAPTURE_API = os.environ.get("INSTA_CAPTURE_API", "1").lower() in {"1","true","yes"}
+if CAPTURE_API:
+    enable_network_logging(options)
 
-print("[INFO] Launching Chrome...")
-driver = webdriver.Chrome(options=options)
-try:
-    driver.maximize_window()
-except Exception:
-    pass
+def launch_driver():
+    print("[INFO] Launching Chrome...")
+    d = webdriver.Chrome(options=options)
+    try:
+        d.maximize_window()
+    except Exception:
+        pass
+    return d
+
+# Rebuilds Chrome and resumes the capture loop after a crash (see supervisor.py);
+# reattach() rebinds the module-level driver the helpers below use
+SUP = DriverSupervisor("INSTA", launch_driver)
+# Shared AIMD pace of scrolls / navigations across concurrent Instagram runs (see pacer.py)
+PACER = Pacer("instagram", 3.5)
+driver = SUP.driver
+api_capture = NetworkCapture(driver, API_PATTERNS) if CAPTURE_API else None
+reel_index = ReelIndex()
 
 INTERACTIVE = os.environ.get("INSTA_INTERACTIVE", "1").lower() in {"1","true","yes"}
 RAW_FILTER = os.environ.get("INSTA_FILTER_TERMS", "").strip()
@@ -49,7 +71,25 @@ def prompt_filter_terms():
         except EOFError:
             pass
 
-prompt_filter_terms()
+target = int(os.environ.get("REEL_TARGET", "50"))
+out_dir = "reels_screenshots"
+os.makedirs(out_dir, exist_ok=True)
+FLAGGED_DIR = os.environ.get("INSTA_FLAGGED_DIR", os.path.join(out_dir, "flagged"))
+os.makedirs(FLAGGED_DIR, exist_ok=True)
+META_PATH = os.path.join(out_dir, "metadata.jsonl")
+FLAGGED_META_PATH = os.path.join(FLAGGED_DIR, "flagged_metadata.jsonl")
+
+# Progress of this run, for --resume after an interruption (see checkpoint.py)
+CKPT = Checkpoint("instagram", [META_PATH, FLAGGED_META_PATH])
+if not CKPT.resumed:
+    prompt_filter_terms()
+FILTER_TERMS = CKPT.setting('filter_terms', FILTER_TERMS)
+HASHTAG = CKPT.setting('hashtag', HASHTAG)
+target = CKPT.setting('target', target)
+
+# Saved cookies / localStorage from an earlier login (see session_store.py)
+SESSION = SessionStore("instagram")
+session_ok = SESSION.restore(driver)
 
 start_url = f"https://www.instagram.com/explore/tags/{HASHTAG}/" if HASHTAG else "https://www.instagram.com/reels/"
 print(f"[STEP] Opening Instagram {'hashtag #' + HASHTAG if HASHTAG else 'Reels'} page...")
@@ -158,19 +198,32 @@ def ensure_logged_in():
         if on_login_page():
             ensure_logged_in()
 
-ensure_logged_in()
+if session_ok and not on_login_page():
+    print("[INFO] Stored session valid; skipping login.")
+else:
+    ensure_logged_in()
+    if has_session_cookie() and not on_login_page():
+        SESSION.save(driver)
+
+def reattach(new_driver):
+    """SUP.prepare: point the module at a rebuilt driver and bring its session back."""
+    global driver, api_capture, WAIT, last_new_time
+    driver = new_driver
+    last_new_time = time.time()  # the rebuild itself is not feed stagnation
+    WAIT = WebDriverWait(driver, 25)
+    api_capture = NetworkCapture(driver, API_PATTERNS) if CAPTURE_API else None
+    if not SESSION.restore(driver):
+        driver.get(start_url)
+        time.sleep(3)
+        ensure_logged_in()
+
+SUP.prepare = reattach
 
 if os.environ.get("CAPTURE", "1").lower() not in {"1","true","yes"}:
     print("[INFO] CAPTURE disabled; leaving browser on Reels.")
+    keep_profiles()
     sys.exit(0)
 
-target = int(os.environ.get("REEL_TARGET", "50"))
-out_dir = "reels_screenshots"
-os.makedirs(out_dir, exist_ok=True)
-FLAGGED_DIR = os.environ.get("INSTA_FLAGGED_DIR", os.path.join(out_dir, "flagged"))
-os.makedirs(FLAGGED_DIR, exist_ok=True)
-META_PATH = os.path.join(out_dir, "metadata.jsonl")
-FLAGGED_META_PATH = os.path.join(FLAGGED_DIR, "flagged_metadata.jsonl")
 
 USE_GEM_VISION = os.environ.get("USE_GEMINI_VISION", "1").lower() in {"1","true","yes"}
 ONLY_FLAGGED = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
@@ -180,6 +233,10 @@ try:
     from gemini_vision import classify_image as gemini_vision_classify  # type: ignore
 except Exception:
     gemini_vision_classify = None  # type: ignore
+try:
+    from detection_model import detect_hate_or_anti_india  # type: ignore
+except Exception:
+    detect_hate_or_anti_india = None  # type: ignore
 print(f"[INFO] Saving up to {target} reel screenshots in {out_dir}")
 if FILTER_TERMS:
     print(f"[INFO] Filtering reels containing any of: {FILTER_TERMS}")
@@ -187,12 +244,21 @@ if HASHTAG:
     print(f"[INFO] Hashtag mode active: #{HASHTAG}")
 
 seen_ids = set()
+# Reel shortcodes processed in earlier runs (see seen_index.py)
+SEEN_INDEX = SeenIndex("instagram")
+# Post-scroll waits end as soon as new reels / grid tiles render, but never before this floor
+WAIT_FLOOR = float(os.environ.get("INSTA_WAIT_FLOOR", "1.0"))
 saved = 0
 stagnant_scrolls = 0
 max_stagnant = 8
 last_new_time = time.time()
+REEL_ST = loop_state(CKPT.states.setdefault("REELS", SimpleNamespace()), saved=0, seen_ids=seen_ids)
+seen_ids, saved = REEL_ST.seen_ids, REEL_ST.saved
 
-def reel_identity(video_el):
+def reel_identity(video_el, api_meta=None):
+    """Reel shortcode when known (stable across sessions), else a hash of the src / link."""
+    if api_meta and api_meta.get('shortcode'):
+        return api_meta['shortcode']
     src = (video_el.get_attribute("src") or "").strip()
     if not src:
         # fall back to parent link
@@ -203,84 +269,239 @@ def reel_identity(video_el):
             src = str(id(video_el))
     return hashlib.sha1(src.encode("utf-8")).hexdigest()
 
-def center_and_capture(video_el, idx):
+# Link / page path / src for a <video>, used to resolve it against captured API media.
+REEL_INFO_JS = r"""
+const v = arguments[0];
+let href = '';
+for (let el = v, depth = 0; el && depth < 10 && !href; el = el.parentElement, depth++) {
+  const a = el.querySelector('a[href*="/reel/"], a[href*="/p/"]');
+  if (a) href = a.href;
+}
+return {href: href, path: location.pathname, src: v.currentSrc || v.src || ''};
+"""
+
+def drain_api_responses():
+    if not api_capture:
+        return
+    for _url, payload in api_capture.poll():
+        n = reel_index.add_payload(payload)
+        if _DEBUG_DETECT and n:
+            print(f"[API] +{n} media ({len(reel_index.by_code)} known)")
+
+def reel_api_meta(video_el, centered=False):
+    """Captured caption/author/hashtags for a video element, or None if unresolved.
+    The /reels/<code>/ page path only identifies the video once it is centered.
+    """
+    drain_api_responses()
+    try:
+        info = driver.execute_script(REEL_INFO_JS, video_el) or {}
+    except WebDriverException:
+        return None
+    code = shortcode_from_url(info.get('href', ''))
+    if not code and centered:
+        code = shortcode_from_url(info.get('path', ''))
+    meta = reel_index.lookup(code, info.get('src', ''))
+    if meta is None and code:
+        meta = {'shortcode': code, 'caption': '', 'author': '', 'hashtags': []}
+    return meta
+
+def reel_text(api_meta, video_el):
+    """Caption + hashtags from the API when known, else the (usually empty) parent text."""
+    if api_meta and api_meta.get('caption'):
+        return api_meta['caption']
+    try:
+        return video_el.find_element(By.XPATH, "ancestor::div[1]").text
+    except Exception:
+        return ''
+
+# execute_async_script; arguments: video, timeout_ms, need_new_frame, callback.
+# Resolves once the element has a decoded frame (readyState >= HAVE_CURRENT_DATA) and
+# playback has presented one (timeupdate / seeked / requestVideoFrameCallback), or on timeout.
+REEL_READY_JS = r"""
+const [v, timeout, needNew, done] = arguments;
+const t0 = performance.now();
+let finished = false;
+const finish = reason => {
+  if (finished) return;
+  finished = true;
+  v.removeEventListener('timeupdate', onFrame);
+  v.removeEventListener('seeked', onFrame);
+  v.removeEventListener('loadeddata', onData);
+  clearTimeout(timer);
+  done({reason: reason, ms: performance.now() - t0, readyState: v.readyState});
+};
+const onFrame = () => { if (v.readyState >= 2) finish('frame'); };
+const onData = () => { if (!needNew && v.currentTime > 0) finish('data'); };
+const timer = setTimeout(() => finish('timeout'), timeout);
+v.addEventListener('timeupdate', onFrame);
+v.addEventListener('seeked', onFrame);
+v.addEventListener('loadeddata', onData);
+if (v.requestVideoFrameCallback) v.requestVideoFrameCallback(() => onFrame());
+if (v.paused) { v.muted = true; const p = v.play(); if (p && p.catch) p.catch(() => {}); }
+if (!needNew && v.readyState >= 2 && v.currentTime > 0) finish('ready');
+"""
+REEL_READY_TIMEOUT = float(os.environ.get("REEL_READY_TIMEOUT", "2.5"))
+REEL_BLANK_RETRIES = int(os.environ.get("REEL_BLANK_RETRIES", "2"))
+REEL_SHOTS = BatchCapture("REELS", platform="INSTA")
+reel_stats = {'waits': 0, 'wait_ms': 0.0, 'timeouts': 0, 'blank_retries': 0, 'blank_kept': 0}
+
+def wait_reel_ready(video_el, need_new_frame=False):
+    """Wait for a presented frame instead of a fixed sleep; returns the JS result (or {})."""
+    try:
+        with script_timeout(driver, REEL_READY_TIMEOUT + 5):
+            res = driver.execute_async_script(REEL_READY_JS, video_el, int(REEL_READY_TIMEOUT * 1000),
+                                              bool(need_new_frame)) or {}
+    except WebDriverException:
+        return {}
+    reel_stats['waits'] += 1
+    reel_stats['wait_ms'] += float(res.get('ms') or 0)
+    if res.get('reason') == 'timeout':
+        reel_stats['timeouts'] += 1
+    return res
+
+def is_blank_frame(path):
+    """True for near-uniform (black / placeholder) screenshots; False when PIL is unavailable."""
+    try:
+        from PIL import Image
+        with Image.open(path) as img:
+            g = img.convert("L")
+            g.thumbnail((64, 64))
+            lo, hi = g.getextrema()
+            mean = sum(i * n for i, n in enumerate(g.histogram())) / max(1, g.width * g.height)
+    except Exception:
+        return False
+    return hi - lo < 16 or mean < 8
+
+def center_reel(video_el):
     driver.execute_script("""
         const el = arguments[0];
         el.scrollIntoView({behavior:'auto', block:'center', inline:'center'});
     """, video_el)
-    time.sleep(2.5)
-    rid = reel_identity(video_el)
+    wait_reel_ready(video_el)
+
+def center_and_capture(video_el, idx, rid=None, centered=False):
+    if not centered:
+        center_reel(video_el)
+    rid = rid or reel_identity(video_el)
     fname = os.path.join(out_dir, f"reel_{idx:03d}_{rid[:8]}.png")
-    # Element-level screenshot (preferred). Fallback to full page if fails.
-    try:
-        video_el.screenshot(fname)
-    except Exception:
-        driver.save_screenshot(fname)
+    for attempt in range(REEL_BLANK_RETRIES + 1):
+        # Element-level screenshot (preferred). Fallback to viewport if the element is gone.
+        fname = REEL_SHOTS.element(driver, video_el, fname)
+        if not is_blank_frame(fname):
+            break
+        if attempt == REEL_BLANK_RETRIES:
+            reel_stats['blank_kept'] += 1
+            break
+        reel_stats['blank_retries'] += 1
+        wait_reel_ready(video_el, need_new_frame=True)
     print(f"[CAPTURE] {fname}")
     return fname
 
+# arguments: filter groups. Marks every new post/reel tile seen and returns only those whose
+# aria-label matches (tiles without a label pass, as before) plus the rejected count.
+HASHTAG_TILES_JS = TEXT_MATCH_JS + r"""
+const groups = arguments[0] || [];
+const out = [];
+let rejected = 0;
+for (const a of document.querySelectorAll("a[href*='/p/']:not([data-seen]), a[href*='/reel/']:not([data-seen])")) {
+  a.dataset.seen = '1';
+  const label = a.getAttribute('aria-label') || '';
+  if (label && !__textMatch(label, groups)) { rejected++; continue; }
+  out.push({el: a, href: a.href});
+}
+return {tiles: out, rejected: rejected};
+"""
+
+# Hashtag pass counters live here, not in capture_hashtag_posts, so SUP.run re-running it
+# on a rebuilt driver continues the pass instead of starting it over (as REEL_ST for reels);
+# being a checkpoint state, --resume continues it too, from the saved scroll position
+HASH_ST = loop_state(CKPT.states.setdefault("HASHTAG", SimpleNamespace()),
+                     seen_posts=set(), collected=0, stagnant=0, last_height=0)
+
 def capture_hashtag_posts():
     hash_target = int(os.environ.get("INSTA_HASHTAG_TARGET", str(target)))
-    print(f"[STEP] Capturing up to {hash_target} posts for #{HASHTAG} before reels...")
-    seen_posts = set()
-    collected = 0
-    stagnant = 0
+    st = HASH_ST
+    print(f"[STEP] Capturing up to {hash_target} posts for #{HASHTAG} before reels ({st.collected} so far)...")
+    seen_posts = st.seen_posts
     max_stagnant = 10
-    last_height = 0
-    while collected < hash_target and stagnant < max_stagnant:
-        # Hashtag pages often have anchors linking to /p/ or /reel/
-        anchors = driver.find_elements(By.XPATH, "//a[contains(@href,'/p/') or contains(@href,'/reel/')]")
+    st.last_height = 0  # a fresh page after a rebuild
+    resume_scroll(driver, st)  # checkpointed grid position (after --resume or a rebuild)
+    prune = DomPruner(f"HASHTAG:{HASHTAG}", "a[data-seen]")
+    waiter = FeedWaiter(f"HASHTAG:{HASHTAG}", "a[href*='/p/']:not([data-seen]), a[href*='/reel/']:not([data-seen])",
+                        WAIT_FLOOR, 1.8)
+    # Grid tiles are small: one viewport screenshot usually yields a dozen crops
+    shots = BatchCapture(f"HASHTAG:{HASHTAG}",
+                         ready=lambda d, els: waiter.wait_ready(d, els, baseline=1.0 * len(els)),
+                         platform="INSTA")
+    groups = compile_text_filter(FILTER_TERMS)
+    filter_stats = FilterStats(f"HASHTAG:{HASHTAG}")
+    while st.collected < hash_target and st.stagnant < max_stagnant:
+        # Hashtag pages often have anchors linking to /p/ or /reel/; FILTER_TERMS are checked
+        # against each tile's aria-label in the page, so only matching tiles come back
+        try:
+            res = driver.execute_script(HASHTAG_TILES_JS, groups) or {}
+        except WebDriverException as e:
+            if is_session_failure(e):
+                raise
+            res = {}
+        tiles = res.get('tiles') or []
+        filter_stats.round(int(res.get('rejected') or 0), len(tiles))
         new_in_cycle = 0
-        for a in anchors:
+        batch = []
+        for tile in tiles:
             try:
-                href = a.get_attribute('href') or ''
+                a, href = tile.get('el'), tile.get('href') or ''
                 if not href or href in seen_posts:
                     continue
                 seen_posts.add(href)
-                # Filter terms if provided (checking aria-label/text of parent)
-                if FILTER_TERMS:
-                    context_txt = ''
-                    try:
-                        context_txt = a.get_attribute('aria-label') or ''
-                    except Exception:
-                        pass
-                    if context_txt:
-                        ctx_low = context_txt.lower()
-                        if not any(ft in ctx_low for ft in FILTER_TERMS):
-                            continue
+                code = shortcode_from_url(href)
+                if SEEN_INDEX.seen_before(code):
+                    continue
                 pid = hashlib.sha1(href.encode()).hexdigest()
-                fname = os.path.join(out_dir, f"hashtag_{collected:03d}_{pid[:8]}.png")
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView({block:'center'});", a)
-                    time.sleep(1.0)
-                    a.screenshot(fname)
-                except Exception:
-                    driver.save_screenshot(fname)
-                print(f"[HASHPOST] {collected+1}/{hash_target} -> {fname}")
-                collected += 1
-                new_in_cycle += 1
-                if collected >= hash_target:
+                fname = os.path.join(out_dir, f"hashtag_{st.collected + len(batch):03d}_{pid[:8]}.png")
+                batch.append((a, fname, code))
+                if st.collected + len(batch) >= hash_target:
                     break
             except Exception:
                 continue
-        if collected >= hash_target:
+        paths = shots.capture(driver, [(a, fname) for a, fname, _ in batch])
+        for (_a, _f, code), fname in zip(batch, paths):
+            SEEN_INDEX.add(code)
+            print(f"[HASHPOST] {st.collected+1}/{hash_target} -> {fname}")
+            st.collected += 1
+            new_in_cycle += 1
+            CKPT.tick(driver, st)
+        if st.collected >= hash_target:
             break
         # Scroll grid page
+        PACER.step(driver, new_in_cycle)
+        prune(driver)
         driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.END)
-        time.sleep(1.8)
+        waiter.wait_new(driver, 1.8)
         new_height = driver.execute_script('return document.body.scrollHeight')
         if new_in_cycle == 0:
-            stagnant += 1
+            st.stagnant += 1
         else:
-            stagnant = 0
-        if new_height == last_height:
-            stagnant += 1
-        last_height = new_height
-    print(f"[DONE] Hashtag posts captured: {collected}")
+            st.stagnant = 0
+        if new_height == st.last_height:
+            st.stagnant += 1
+        st.last_height = new_height
+    print(f"[DONE] Hashtag posts captured: {st.collected}")
+    filter_stats.report()
+    waiter.report()
+    shots.report()
 
 # If hashtag provided, capture posts first then switch to reels feed for video collection
-if HASHTAG:
-    capture_hashtag_posts()
+if HASHTAG and getattr(HASH_ST, 'done', False):
+    print(f"[STEP] #{HASHTAG} posts finished before the interruption; skipping")
+elif HASHTAG:
+    SUP.resume_url = start_url
+    try:
+        SUP.run(lambda _d: capture_hashtag_posts(), where=f"HASHTAG:{HASHTAG}")
+    except BaseException:
+        CKPT.save(driver, HASH_ST)  # interrupted: --resume continues the hashtag pass
+        raise
+    CKPT.done(HASH_ST)
     print("[STEP] Switching to Reels feed after hashtag posts...")
     try:
         driver.get("https://www.instagram.com/reels/")
@@ -288,42 +509,101 @@ if HASHTAG:
     except Exception:
         pass
 
+# Instagram reuses <video> elements for later reels, so the seen marker holds the media src
+# it was set for: a 'loadstart' with another src (a new reel in the same element) clears it,
+# along with any pruning, and the element matches video:not([data-seen]) again.
+REEL_SEEN_JS = r"""
+for (const v of arguments[0]) {
+  if (!v || !v.dataset) continue;
+  v.dataset.seen = v.currentSrc || v.src || '';
+  if (v.__seenWatch) continue;
+  v.__seenWatch = true;
+  v.addEventListener('loadstart', () => {
+    const src = v.currentSrc || v.src || '';
+    if (v.dataset.seen === undefined || v.dataset.seen === src) return;
+    if (!v.dataset.seen) { v.dataset.seen = src; return; }  // first load of a video seen before it had a src
+    delete v.dataset.seen;
+    if (v.dataset.pruned) {
+      delete v.dataset.pruned;
+      v.style.height = ''; v.style.contentVisibility = '';
+    }
+  });
+}
+"""
+
+def mark_reels_seen(videos):
+    if not videos:
+        return
+    try:
+        driver.execute_script(REEL_SEEN_JS, videos)
+    except WebDriverException:
+        pass
+
 print("[STEP] Starting scroll & capture loop for reels...")
+prune_reels = DomPruner("REELS", "video[data-seen]")
+reel_waiter = FeedWaiter("REELS", "video:not([data-seen])", WAIT_FLOOR, 3.5)
+REEL_FILTER = compile_text_filter(FILTER_TERMS)
 
-while saved < target:
+def reel_round(_driver) -> bool:
+    """One collect / capture / scroll round of the reels feed; False once the loop should stop.
+    Helpers use the module-level driver, which reattach() rebinds after a crash."""
+    global saved, stagnant_scrolls, last_new_time
     # Collect candidate video elements
-    videos = driver.find_elements(By.XPATH, "//video")
+    videos = driver.find_elements(By.CSS_SELECTOR, "video:not([data-seen])")
+    mark_reels_seen(videos)
     new_in_cycle = 0
     for v in videos:
         try:
-            rid = reel_identity(v)
-            if rid in seen_ids:
+            src_id = reel_identity(v)
+            if src_id in seen_ids:
                 continue
-            seen_ids.add(rid)
-            if FILTER_TERMS:
-                context_txt = ""
-                try:
-                    # Try parent containers for text/captions
-                    parent = v.find_element(By.XPATH, "ancestor::div[1]")  # keep minimal; adjust if needed
-                    context_txt = parent.text.lower()
-                except Exception:
-                    pass
-                if context_txt and not any(ft in context_txt for ft in FILTER_TERMS):
+            seen_ids.add(src_id)
+            api_meta = reel_api_meta(v)
+            centered = False
+            if not api_meta:
+                # Feed reels are usually only identifiable via the page path once centered
+                center_reel(v)
+                centered = True
+                api_meta = reel_api_meta(v, centered=True)
+            rid = reel_identity(v, api_meta)
+            if rid != src_id:
+                if rid in seen_ids:
+                    continue
+                seen_ids.add(rid)
+            if CKPT.written(rid):
+                saved += 1  # stored by the interrupted run after its last checkpoint
+                continue
+            if SEEN_INDEX.seen_before(rid):
+                continue
+            # Captions arrive through the API capture, so this check never crosses WebDriver
+            if FILTER_TERMS and api_meta and api_meta.get('caption'):
+                if not text_matches(api_meta['caption'], REEL_FILTER):
                     continue
-            shot_path = center_and_capture(v, saved)
-            # Optional Gemini Vision classification
+            shot_path = center_and_capture(v, saved, rid, centered)
+            if not api_meta or not api_meta.get('caption'):
+                api_meta = reel_api_meta(v, centered=True) or api_meta
+            context_txt = reel_text(api_meta, v)
+            if FILTER_TERMS and context_txt and not text_matches(context_txt, REEL_FILTER):
+                try: os.remove(shot_path)
+                except Exception: pass
+                continue
             flagged = False
             gem_reason = ''
             gem_result = None
-            if USE_GEM_VISION and gemini_vision_classify:
-                # Basic context attempt: parent text
-                context_txt = ''
-                try:
-                    parent = v.find_element(By.XPATH, "ancestor::div[1]")
-                    context_txt = parent.text[:800]
-                except Exception:
-                    pass
-                gem_result = gemini_vision_classify(shot_path, context_txt)
+            # Cheap local text detector on the caption first; vision only if text is clean / ambiguous
+            text_flag, text_reason = False, 'empty'
+            if detect_hate_or_anti_india and context_txt.strip():
+                text_flag, text_reason = detect_hate_or_anti_india(context_txt)
+            if text_flag:
+                flagged = True
+                gem_reason = f"caption:{text_reason}"
+                if _DEBUG_DETECT:
+                    print(f"[TEXT_FLAG] {gem_reason}")
+            elif USE_GEM_VISION and gemini_vision_classify:
+                vision_ctx = context_txt[:800]
+                if api_meta and api_meta.get('author'):
+                    vision_ctx = f"@{api_meta['author']}: {vision_ctx}"
+                gem_result = gemini_vision_classify(shot_path, vision_ctx)
                 if gem_result:
                     # Decide flag
                     if any(gem_result.get(k) for k in GEM_FLAGS):
@@ -341,8 +621,18 @@ while saved < target:
                 'captured_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
                 'context_terms': FILTER_TERMS,
             }
+            if api_meta:
+                meta.update({
+                    'shortcode': api_meta.get('shortcode', ''),
+                    'url': f"https://www.instagram.com/reel/{api_meta.get('shortcode', '')}/",
+                    'caption': api_meta.get('caption', ''),
+                    'author': api_meta.get('author', ''),
+                    'hashtags': api_meta.get('hashtags', []),
+                })
             if gem_result:
                 meta.update(gem_result)
+            if api_meta and api_meta.get('shortcode'):
+                SEEN_INDEX.add(api_meta['shortcode'])
             if flagged:
                 meta['flag_reason'] = gem_reason
                 try:
@@ -370,29 +660,59 @@ while saved < target:
             saved += 1
             new_in_cycle += 1
             last_new_time = time.time()
+            REEL_ST.saved = saved
+            CKPT.tick()
             if saved >= target:
                 break
         except Exception as e:
+            if is_session_failure(e):
+                raise
             print(f"[WARN] Capture error: {e}")
     if saved >= target:
-        break
+        return False
     if new_in_cycle == 0:
         stagnant_scrolls += 1
     else:
         stagnant_scrolls = 0
     if stagnant_scrolls >= max_stagnant:
         print("[INFO] No new reels after several scrolls; stopping.")
-        break
+        return False
 
-    # Scroll down
+    # Scroll down (paced sleeps are not feed stagnation)
+    slept = PACER.stats["slept"]
+    PACER.step(driver, new_in_cycle)
+    last_new_time += PACER.stats["slept"] - slept
+    prune_reels(driver)
     driver.find_element(By.TAG_NAME, "body").send_keys(Keys.END)
-    time.sleep(3.5)
+    reel_waiter.wait_new(driver, 3.5)
 
 
     # If feed stuck >60s without new reel break
     if time.time() - last_new_time > 60:
         print("[INFO] Stagnation timeout reached.")
-        break
+        return False
+    return True
+
+SUP.resume_url = "https://www.instagram.com/reels/"
+try:
+    while saved < target and SUP.run(reel_round, where="REELS"):
+        pass
+except BaseException:
+    REEL_ST.saved = saved
+    CKPT.save()  # interrupted: keep the output offsets current for --resume
+    raise
+CKPT.complete()
 
+reel_waiter.report()
+PACER.report()
+REEL_SHOTS.report()
+if reel_stats['waits']:
+    print(f"[REEL] frame waits={reel_stats['waits']} avg={reel_stats['wait_ms'] / reel_stats['waits']:.0f}ms "
+          f"timeouts={reel_stats['timeouts']} blank_retries={reel_stats['blank_retries']} "
+          f"blank_kept={reel_stats['blank_kept']}")
+SEEN_INDEX.save()
+if SEEN_INDEX.skipped:
+    print(f"[SEEN] Skipped {SEEN_INDEX.skipped} reel(s)/post(s) already processed in earlier runs")
 print(f"[DONE] Captured {saved} reel(s). Quitting.")
-driver.quit()
\ No newline at end of file
+SUP.report()
+SUP.quit()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os, sys, subprocess, threading, queue, time
+import browser_service
 import tkinter as tk
 from tkinter import ttk, messagebox
 
@@ -28,6 +29,7 @@ class ScrapeLauncher:
         self.root = root
         self.root.title('Social Media Scraper Launcher')
         self.proc = None
+        self.lease = None
         self.stop_requested = False
         self.queue = queue.Queue()
 
@@ -45,6 +47,10 @@ class ScrapeLauncher:
         self.attach_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(glob, text='Headless', variable=self.headless_var).pack(side='left', padx=4)
         ttk.Checkbutton(glob, text='Attach Existing Chrome', variable=self.attach_var).pack(side='left', padx=4)
+        self.service_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(glob, text='Use Browser Service', variable=self.service_var).pack(side='left', padx=4)
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(glob, text='Resume Last Run', variable=self.resume_var).pack(side='left', padx=4)
 
         # Detection / Filtering options
         detect = ttk.LabelFrame(root, text='Detection / Filtering')
@@ -120,6 +126,9 @@ class ScrapeLauncher:
             self.tw_search_via = tk.StringVar(value='AUTO')
             ttk.Label(modes, text='Search Via:').pack(side='left')
             ttk.Combobox(modes, textvariable=self.tw_search_via, values=['AUTO','EXPLORE','DIRECT'], width=10, state='readonly').pack(side='left', padx=4)
+            self.tw_capture = tk.StringVar(value='DOM')
+            ttk.Label(modes, text='Capture:').pack(side='left')
+            ttk.Combobox(modes, textvariable=self.tw_capture, values=['DOM','NETWORK'], width=10, state='readonly').pack(side='left', padx=4)
             self.tw_search = self._labeled_entry(self.platform_frame, 'Search Terms (,):', 40)
             self.tw_filter = self._labeled_entry(self.platform_frame, 'Filter Terms (,):', 40)
             self.tw_target = self._labeled_entry(self.platform_frame, 'Target Count:', 8)
@@ -157,6 +166,7 @@ class ScrapeLauncher:
         # Global flags
         env['HEADLESS'] = '1' if self.headless_var.get() else '0'
         env['ATTACH_EXISTING'] = '1' if self.attach_var.get() else '0'
+        env['RESUME'] = '1' if self.resume_var.get() else '0'
         # Credentials
         if self.tw_user.get(): env['TWITTER_USERNAME'] = self.tw_user.get()
         if self.tw_pass.get(): env['TWITTER_PASSWORD'] = self.tw_pass.get()
@@ -179,8 +189,9 @@ class ScrapeLauncher:
             if self.tw_target.get().isdigit():
                 env['TW_POST_TARGET'] = self.tw_target.get().strip()
             env['TW_SEARCH_VIA'] = self.tw_search_via.get().upper()
+            env['TW_CAPTURE'] = self.tw_capture.get().upper()
             # Quick diagnostic dump for Twitter
-            diag_keys = ['TW_MODE','TW_SEARCH_TERMS','TW_FILTER_TERMS','TW_POST_TARGET','TW_SEARCH_VIA','ONLY_FLAGGED','DEBUG_DETECT','USE_GEMINI','USE_GEMINI_VISION']
+            diag_keys = ['TW_MODE','TW_SEARCH_TERMS','TW_FILTER_TERMS','TW_POST_TARGET','TW_SEARCH_VIA','TW_CAPTURE','TW_SCREENSHOTS','TW_RESOURCE_POLICY','ONLY_FLAGGED','DEBUG_DETECT','USE_GEMINI','USE_GEMINI_VISION']
             self.append_log('[ENV] Twitter launch vars:\n')
             for k in diag_keys:
                 if k in env:
@@ -209,6 +220,17 @@ class ScrapeLauncher:
         if self.tag_filters_var.get().strip():
             env['TAG_FILTERS'] = self.tag_filters_var.get().strip()
 
+        # Warm browser from browser_service.py (Instagram always launches its own Chrome)
+        if self.service_var.get() and plat != 'Instagram':
+            self.lease = browser_service.lease(owner=plat)
+            if self.lease:
+                env['ATTACH_EXISTING'] = '1'
+                env['DEBUG_ADDRESS'] = self.lease['debug_address']
+                env['BROWSER_LEASE'] = self.lease['lease']
+                self.append_log(f"[SERVICE] Leased {self.lease['instance']} at {self.lease['debug_address']}\n")
+            else:
+                self.append_log('[WARN] Browser service unreachable or busy; launching a new Chrome.\n')
+
         self.append_log(f"\n[LAUNCH] {plat} scraper starting...\n")
         try:
             # Use unbuffered mode for immediate stdout visibility
@@ -216,6 +238,7 @@ class ScrapeLauncher:
         except Exception as e:
             self.append_log(f"[ERROR] Failed to start process: {e}\n")
             self.proc = None
+            self._release_lease()
             return
 
         self.append_log('[INFO] Environment overrides applied.\n')
@@ -234,8 +257,14 @@ class ScrapeLauncher:
         except Exception as e:
             self.queue.put(f"[ERROR] Reader thread: {e}\n")
         finally:
+            self._release_lease()
             self.queue.put('__PROC_DONE__')
 
+    def _release_lease(self):
+        if self.lease:
+            browser_service.release(self.lease['lease'])
+            self.lease = None
+
     def _poll_queue(self):
         try:
             while True:
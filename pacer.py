@@ -0,0 +1,212 @@
+"""Adaptive (AIMD) pacing of scrolls and navigations, shared by all workers of a platform.
+
+Pacing used to be a fixed uniform jitter per script (TW_JITTER_*, YT_JITTER_*,
+3.5s per reels scroll): too slow while the site is happy, too fast once it
+starts rate limiting. A Pacer keeps one action rate per platform (scrolls /
+navigations per second) and adjusts it like TCP congestion control:
+
+  additive increase         a round that brought new items with no warning
+                            signs raises the rate by PACE_STEP actions/s
+  multiplicative decrease   HTTP 429 / 503 responses or a challenge / captcha
+                            page halve it and pause everyone for a cool-down;
+                            PACE_EMPTY_ROUNDS empty rounds in a row or a
+                            resource slower than PACE_SLOW_MS cut it by 20%
+
+Signals come from the page after each round: resource timing entries
+(responseStatus, duration; one execute_script for all of them) and the page
+URL / title. pace() is called before each scroll or navigation and sleeps
+until 1/rate has passed since the previous action; the event-driven feed
+waits (dom_utils.FeedWaiter) still decide when new content is ready.
+
+The rate and cool-down live in PACE_DIR/<platform>.json, read before and
+updated (under a lock file) after each round, so concurrent workers
+(driver_pool.py, parallel GUI runs) slow down together when one of them is
+throttled. A state file older than PACE_STATE_TTL restarts from the
+platform's starting delay.
+
+Env Vars:
+  PACE=1                 Set to 0 to disable adaptive pacing
+  PACE_DIR=.pacer
+  PACE_MIN_DELAY=0.8     Fastest pace (seconds between actions)
+  PACE_MAX_DELAY=60      Slowest pace
+  PACE_STEP=0.05         Additive rate increase per good round (actions/s)
+  PACE_COOLDOWN=30       Pause (seconds) for every worker after a 429 / challenge
+  PACE_EMPTY_ROUNDS=3    Consecutive empty rounds treated as soft throttling
+  PACE_SLOW_MS=8000      A resource slower than this counts as soft throttling
+  PACE_STATE_TTL=3600    Seconds after which a shared state file is ignored
+"""
+from __future__ import annotations
+import os, json, time, random
+from typing import Any, Dict
+from seen_index import lock_file
+
+ENABLED = os.getenv("PACE", "1").lower() in {"1","true","yes"}
+PACE_DIR = os.getenv("PACE_DIR", ".pacer")
+MIN_DELAY = float(os.getenv("PACE_MIN_DELAY", "0.8"))
+MAX_DELAY = float(os.getenv("PACE_MAX_DELAY", "60"))
+STEP = float(os.getenv("PACE_STEP", "0.05"))
+COOLDOWN = float(os.getenv("PACE_COOLDOWN", "30"))
+EMPTY_ROUNDS = int(os.getenv("PACE_EMPTY_ROUNDS", "3"))
+SLOW_MS = float(os.getenv("PACE_SLOW_MS", "8000"))
+STATE_TTL = float(os.getenv("PACE_STATE_TTL", "3600"))
+
+# arguments: index of the first resource entry not inspected yet
+PACE_SIGNALS_JS = r"""
+let since = arguments[0] || 0;
+const res = performance.getEntriesByType('resource');
+if (since > res.length) since = 0;  // buffer was cleared
+let throttled = 0, slow = 0;
+for (let i = since; i < res.length; i++) {
+  const e = res[i];
+  if (e.responseStatus === 429 || e.responseStatus === 503) throttled++;
+  if (e.duration > slow) slow = e.duration;
+}
+// Paths / titles only: search URLs and titles carry the user's term ("challenge", ...)
+const challenge = /^\/(challenge|sorry|captcha|account\/access)(\/|$)/.test(location.pathname)
+  || /^(too many requests|429\b|unusual traffic)/i.test(document.title.trim());
+return {next: res.length, throttled: throttled, slow: Math.round(slow), challenge: challenge};
+"""
+
+
+class Pacer:
+    """AIMD controller for one platform's action rate; state shared through a small JSON file."""
+
+    def __init__(self, platform: str, start_delay: float, enabled: bool = ENABLED, directory: str = PACE_DIR):
+        self.platform = platform
+        self.enabled = enabled
+        self.path = os.path.join(directory, f"{platform}.json")
+        self.start_rate = 1.0 / min(MAX_DELAY, max(MIN_DELAY, start_delay))
+        self.rate = self.start_rate
+        self.cooldown_until = 0.0
+        self.last_action = 0.0
+        self.empty = 0
+        self._since = 0
+        self.stats = {"rounds": 0, "increases": 0, "backoffs": 0, "throttled": 0, "slept": 0.0}
+        if enabled:
+            self._load()
+
+    def _clamp(self, rate: float) -> float:
+        return min(1.0 / MIN_DELAY, max(1.0 / MAX_DELAY, rate))
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if time.time() - float(data.get("updated_at", 0)) > STATE_TTL:
+            return
+        self.rate = self._clamp(float(data.get("rate", self.rate)))
+        self.cooldown_until = float(data.get("cooldown_until", 0))
+
+    def _update(self, factor: float = 1.0, add: float = 0.0, cooldown: float = 0.0):
+        """Apply one AIMD step to the shared state (read-modify-write under the lock).
+        With the lock busy the step only applies to this worker; the shared file is left alone."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not lock_file(self.path + ".lock", timeout=2.0):
+            self.rate = self._clamp(self.rate * factor + add)
+            if cooldown:
+                self.cooldown_until = max(self.cooldown_until, time.time() + cooldown)
+            return
+        try:
+            self._load()
+            self.rate = self._clamp(self.rate * factor + add)
+            if cooldown:
+                self.cooldown_until = max(self.cooldown_until, time.time() + cooldown)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"rate": self.rate, "delay": round(1.0 / self.rate, 2),
+                           "cooldown_until": self.cooldown_until, "updated_at": time.time()}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[PACE] Could not update {self.path}: {e}")
+        finally:
+            try: os.remove(self.path + ".lock")
+            except OSError: pass
+
+    @property
+    def delay(self) -> float:
+        return 1.0 / self.rate
+
+    def pace(self, navigation: bool = False):
+        """Sleep until the shared pace allows the next scroll / navigation."""
+        if not self.enabled:
+            return
+        if navigation:
+            self._since = 0  # the next document starts a fresh resource timeline
+        self._load()
+        now = time.time()
+        wait = max(self.cooldown_until - now, self.last_action + self.delay * random.uniform(0.85, 1.15) - now)
+        if wait > 0:
+            if self.cooldown_until > now:
+                print(f"[PACE] {self.platform}: cooling down {wait:.0f}s after throttling")
+            time.sleep(wait)
+            self.stats["slept"] += wait
+        self.last_action = time.time()
+
+    def signals(self, driver) -> Dict[str, Any]:
+        try:
+            sig = driver.execute_script(PACE_SIGNALS_JS, self._since) or {}
+        except Exception:
+            return {}
+        self._since = int(sig.get("next", self._since) or 0)
+        return sig
+
+    def feedback(self, driver, new_items: int, sig: Dict[str, Any] | None = None):
+        """Adjust the rate after a round from its yield and the page's throttling signals
+        (`sig`: PACE_SIGNALS_JS output read by the caller, for pages not driven through `driver`)."""
+        if not self.enabled:
+            return
+        self.stats["rounds"] += 1
+        if sig is None:
+            sig = self.signals(driver)
+        self.empty = 0 if new_items else self.empty + 1
+        if sig.get("throttled") or sig.get("challenge"):
+            self.stats["throttled"] += 1
+            self.stats["backoffs"] += 1
+            self._update(factor=0.5, cooldown=COOLDOWN)
+            print(f"[PACE] {self.platform}: throttled ({sig.get('throttled', 0)} x 429/503"
+                  f"{', challenge page' if sig.get('challenge') else ''}); delay now {self.delay:.1f}s")
+        elif self.empty >= EMPTY_ROUNDS or float(sig.get("slow") or 0) > SLOW_MS:
+            self.stats["backoffs"] += 1
+            self.empty = 0
+            self._update(factor=0.8)
+        elif new_items:
+            self.stats["increases"] += 1
+            self._update(add=STEP)
+
+    def step(self, driver, new_items: int):
+        """End of a scroll round: feedback on it, then wait for the next action slot."""
+        self.feedback(driver, new_items)
+        self.pace()
+
+    def report(self):
+        if not self.enabled or not self.stats["rounds"]:
+            return
+        s = self.stats
+        print(f"[PACE] {self.platform}: rounds={s['rounds']} delay={self.delay:.1f}s increases={s['increases']} "
+              f"backoffs={s['backoffs']} throttled={s['throttled']} paced_sleep={s['slept']:.1f}s")
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Show or reset the shared pacing state")
+    ap.add_argument("platform", choices=["twitter", "youtube", "instagram"])
+    ap.add_argument("--reset", action="store_true", help="Forget the learned pace")
+    args = ap.parse_args()
+    path = os.path.join(PACE_DIR, f"{args.platform}.json")
+    if args.reset:
+        try:
+            os.remove(path)
+            print(f"Removed {path}")
+        except OSError:
+            print(f"No pacing state at {path}")
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            left = data.get("cooldown_until", 0) - time.time()
+            print(f"delay={data.get('delay')}s updated {time.ctime(data.get('updated_at', 0))}"
+                  + (f", cooling down {left:.0f}s more" if left > 0 else ""))
+        except (OSError, ValueError):
+            print(f"No pacing state at {path}")
@@ -0,0 +1,250 @@
+"""Lean, disposable Chrome profiles cloned per run from a minimal template.
+
+chrome_automation_profile has accumulated Cache, Code Cache, GPU caches,
+IndexedDB, Service Worker and leveldb state that every launch loads and
+locks, and two runs cannot share it. With LEAN_PROFILE=1 the scrapers instead
+run on a throwaway copy of a minimal template:
+
+  template   PROFILE_TEMPLATE_DIR, built once from the shared profile with only
+             what a logged-in session needs: Local State (holds the cookie
+             encryption key), First Run, and Default's Preferences, Secure
+             Preferences and Cookies databases (old and Network/ location)
+  run copy   cloned into RUN_PROFILE_ROOT (tmpfs /dev/shm when available) with
+             `cp --reflink=auto`, so copy-on-write filesystems share blocks and
+             tmpfs keeps it in RAM; removed when the process exits
+  sync       at exit (after the driver quit, so Chrome has flushed its stores)
+             the run copy's cookie databases and Local State are written back
+             to the template, so the next run starts with the latest session
+
+Template files are replaced atomically; with concurrent runs the last one to
+exit wins, which is fine for cookies that all come from the same login.
+session_store.py (cookies + localStorage through CDP) keeps working on top.
+
+Usage:
+  python profile_manager.py build     (re)build the template from the shared profile
+  python profile_manager.py report    disk use and launch time: shared vs lean
+
+Env Vars:
+  LEAN_PROFILE=0                  Set to 1 to run scrapers on disposable lean profiles
+  PROFILE_TEMPLATE_DIR=.profile_template
+  RUN_PROFILE_ROOT=               Parent of per-run copies (default /dev/shm, else the temp dir)
+  CHROME_AUTOMATION_DIR           Shared profile (template source / non-lean profile)
+  CHROME_PROFILE_DIR=Default      Profile sub-directory inside the user data dir
+"""
+from __future__ import annotations
+import os, time, atexit, shutil, tempfile, subprocess
+from typing import Dict, List, Optional
+
+LEAN = os.getenv("LEAN_PROFILE", "0").lower() in {"1","true","yes"}
+TEMPLATE_DIR = os.getenv("PROFILE_TEMPLATE_DIR", ".profile_template")
+PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", "Default")
+BASE_PROFILE = os.getenv("CHROME_AUTOMATION_DIR", os.path.join(os.getcwd(), "chrome_automation_profile"))
+# One disposable profile per label and process, reused by driver rebuilds (supervisor.py)
+_ACTIVE: Dict[str, "DisposableProfile"] = {}
+
+
+def _run_root() -> str:
+    root = os.getenv("RUN_PROFILE_ROOT", "")
+    if root:
+        return root
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def essential_files(profile_dir: str = PROFILE_DIR) -> List[str]:
+    """Paths (relative to the user data dir) copied into the template."""
+    p = profile_dir
+    return ["Local State", "First Run",
+            f"{p}/Preferences", f"{p}/Secure Preferences",
+            f"{p}/Cookies", f"{p}/Cookies-journal",
+            f"{p}/Network/Cookies", f"{p}/Network/Cookies-journal"]
+
+
+def session_files(profile_dir: str = PROFILE_DIR) -> List[str]:
+    """Files written back from a run copy to the template at exit."""
+    p = profile_dir
+    return ["Local State", f"{p}/Cookies", f"{p}/Cookies-journal", f"{p}/Network/Cookies", f"{p}/Network/Cookies-journal"]
+
+
+def disk_usage(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.lstat(os.path.join(root, f)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _copy_file(src: str, dest: str):
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dest)
+
+
+def build_template(source: str = BASE_PROFILE, template: str = TEMPLATE_DIR) -> int:
+    """Copy only the essential files of `source` into `template`; returns the number copied."""
+    copied = 0
+    for rel in essential_files():
+        src = os.path.join(source, rel)
+        if os.path.isfile(src):
+            _copy_file(src, os.path.join(template, rel))
+            copied += 1
+    os.makedirs(os.path.join(template, PROFILE_DIR), exist_ok=True)
+    print(f"[PROFILE] Template {template}: {copied} file(s), {disk_usage(template) / 1e6:.2f}MB "
+          f"(from {source}, {disk_usage(source) / 1e6:.1f}MB)")
+    return copied
+
+
+def clone_template(template: str = TEMPLATE_DIR, prefix: str = "run") -> str:
+    """Copy-on-write clone of the template into a fresh directory under RUN_PROFILE_ROOT."""
+    dest = tempfile.mkdtemp(prefix=f"chrome_{prefix}_", dir=_run_root())
+    try:
+        subprocess.run(["cp", "-a", "--reflink=auto", os.path.join(template, "."), dest],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        shutil.copytree(template, dest, dirs_exist_ok=True)
+    return dest
+
+
+def sync_back(run_dir: str, template: str = TEMPLATE_DIR) -> int:
+    synced = 0
+    for rel in session_files():
+        src = os.path.join(run_dir, rel)
+        if os.path.isfile(src):
+            try:
+                _copy_file(src, os.path.join(template, rel))
+                synced += 1
+            except OSError as e:
+                print(f"[PROFILE] Could not sync {rel}: {e}")
+    return synced
+
+
+class DisposableProfile:
+    """A per-run lean profile: cloned on creation, synced back and removed by close()."""
+
+    def __init__(self, label: str = "run", template: str = TEMPLATE_DIR, source: str = BASE_PROFILE):
+        self.template = template
+        if not os.path.isfile(os.path.join(template, "Local State")):
+            build_template(source, template)
+        started = time.time()
+        self.path = clone_template(template, label)
+        self.closed = False
+        print(f"[PROFILE] Lean profile {self.path} ({disk_usage(self.path) / 1e6:.2f}MB, "
+              f"cloned in {(time.time() - started) * 1000:.0f}ms)")
+
+    def close(self, sync: bool = True):
+        if self.closed:
+            return
+        self.closed = True
+        n = sync_back(self.path, self.template) if sync else 0
+        shutil.rmtree(self.path, ignore_errors=True)
+        print(f"[PROFILE] Lean profile removed ({n} session file(s) synced to {self.template})")
+
+    def __enter__(self) -> str:
+        return self.path
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _clear_singleton(path: str):
+    """Remove the lock files a crashed Chrome leaves in its user data dir."""
+    for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+        try:
+            os.remove(os.path.join(path, name))
+        except OSError:
+            pass
+
+
+def automation_profile(label: str = "run") -> str:
+    """User data dir for a scraper's Chrome: a disposable lean copy with LEAN_PROFILE=1,
+    otherwise CHROME_AUTOMATION_DIR / ./chrome_automation_profile as before.
+
+    Calls with the same label in one process (driver rebuilds after a crash) get the
+    same copy, so exactly one copy per label is synced back to the template at exit."""
+    if not LEAN:
+        os.makedirs(BASE_PROFILE, exist_ok=True)
+        return BASE_PROFILE
+    prof = _ACTIVE.get(label)
+    if prof is not None and not prof.closed and os.path.isdir(prof.path):
+        _clear_singleton(prof.path)
+        print(f"[PROFILE] Reusing lean profile {prof.path}")
+        return prof.path
+    prof = DisposableProfile(label)
+    _ACTIVE[label] = prof
+    atexit.register(prof.close)
+    return prof.path
+
+
+def keep_profiles():
+    """Leave this process's lean profiles on disk (the browser outlives the script)."""
+    for prof in _ACTIVE.values():
+        prof.closed = True
+        print(f"[PROFILE] Keeping {prof.path} (browser left running)")
+
+
+def _launch_ms(user_data_dir: str) -> Optional[float]:
+    """Time from process start until DevTools answers (headless Chrome, about:blank)."""
+    from cdp_engine import chrome_binary, LAUNCH_ARGS, _free_port, _browser_ws_url, CDPError
+    port = _free_port()
+    started = time.time()
+    proc = subprocess.Popen([chrome_binary(), "--headless=new", f"--remote-debugging-port={port}",
+                             f"--user-data-dir={user_data_dir}", f"--profile-directory={PROFILE_DIR}",
+                             *LAUNCH_ARGS, "about:blank"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _browser_ws_url(f"127.0.0.1:{port}", timeout=60)
+        return (time.time() - started) * 1000
+    except CDPError:
+        return None
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def report(launches: int = 3):
+    shared_mb = disk_usage(BASE_PROFILE) / 1e6
+    if not os.path.isfile(os.path.join(TEMPLATE_DIR, "Local State")):
+        build_template()
+    lean_mb = disk_usage(TEMPLATE_DIR) / 1e6
+    print(f"[PROFILE] Disk: shared={shared_mb:.1f}MB lean={lean_mb:.2f}MB "
+          f"({(1 - lean_mb / shared_mb) * 100 if shared_mb else 0:.0f}% smaller)")
+    try:
+        from cdp_engine import chrome_binary
+        chrome_binary()
+    except Exception as e:
+        print(f"[PROFILE] Launch timing skipped: {e}")
+        return
+    shared, lean = [], []
+    for _ in range(launches):
+        ms = _launch_ms(BASE_PROFILE)
+        if ms is not None:
+            shared.append(ms)
+        t0 = time.time()
+        run_dir = clone_template()
+        clone_ms = (time.time() - t0) * 1000
+        ms = _launch_ms(run_dir)
+        if ms is not None:
+            lean.append(ms + clone_ms)
+        shutil.rmtree(run_dir, ignore_errors=True)
+    avg = lambda xs: sum(xs) / len(xs) if xs else float("nan")
+    print(f"[PROFILE] Launch (to DevTools ready, {launches} run(s)): shared={avg(shared):.0f}ms "
+          f"lean={avg(lean):.0f}ms including clone")
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Lean disposable Chrome profiles")
+    ap.add_argument("cmd", choices=["build", "report"])
+    ap.add_argument("--launches", type=int, default=3, help="Launches per profile for the report")
+    args = ap.parse_args()
+    if args.cmd == "build":
+        build_template()
+    else:
+        report(args.launches)
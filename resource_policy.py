@@ -0,0 +1,144 @@
+"""Per-mode resource blocking and bandwidth / page-load reporting for Chrome drivers.
+
+Modes that never look at pixels (Twitter TRENDING, searches with screenshots
+off, YouTube metadata-only runs) still downloaded every avatar, thumbnail,
+font and autoplay video. A policy picks what to drop:
+
+  none   block nothing
+  lean   third-party trackers / ad scripts only (screenshots unaffected)
+  text   trackers + images + media + fonts, autoplay off
+
+Blocking happens at two levels: Chrome content settings / switches set on the
+ChromeOptions before launch (images, autoplay; skipped when attaching to an
+existing browser) and Network.setBlockedURLs through execute_cdp_cmd after
+launch (URL patterns for media, fonts, trackers). CDP Fetch-domain request
+interception needs an event loop to continue paused requests, which
+Selenium's synchronous execute_cdp_cmd does not provide, so URL blocking is
+pattern based.
+
+PageStats reads the Performance API (navigation + resource timing) and
+prints a per-run [NET] summary: pages, average load time, resources and
+bytes transferred. Cross-origin resources without Timing-Allow-Origin report
+a transfer size of 0, so byte totals are a lower bound.
+
+Env Vars:
+  RESOURCE_POLICY=        Force a policy for every scraper (none | lean | text);
+                          per platform: TW_RESOURCE_POLICY, YT_RESOURCE_POLICY
+"""
+from __future__ import annotations
+import os
+from typing import Dict, Any, List
+
+POLICIES = ("none", "lean", "text")
+
+TRACKER_PATTERNS = [
+    "*doubleclick.net*", "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*googleadservices.com*", "*ads-twitter.com*", "*ads-api.x.com*", "*static.ads-twitter.com*",
+    "*connect.facebook.net*", "*scorecardresearch.com*", "*adservice.google.*",
+]
+MEDIA_PATTERNS = [
+    "*.mp4*", "*.m4s*", "*.webm*", "*.m3u8*", "*video.twimg.com*", "*googlevideo.com/videoplayback*",
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*",
+    "*pbs.twimg.com/media*", "*pbs.twimg.com/profile_images*", "*pbs.twimg.com/card_img*",
+    "*i.ytimg.com*", "*yt3.ggpht.com*", "*yt3.googleusercontent.com*",
+]
+FONT_PATTERNS = ["*.woff2*", "*.woff*", "*.ttf*", "*.otf*", "*fonts.gstatic.com*"]
+
+# Registered for every new document so long feeds do not overflow the default 250-entry buffer
+BUFFER_JS = "try { performance.setResourceTimingBufferSize(10000); } catch (e) {}"
+
+PAGE_STATS_JS = r"""
+const out = {origin: performance.timeOrigin, url: location.href, nav: null, res: 0, bytes: 0, encoded: 0};
+const nav = performance.getEntriesByType('navigation')[0];
+if (nav) {
+  out.nav = {transfer: nav.transferSize || 0,
+             load: nav.loadEventEnd > 0 ? nav.loadEventEnd : nav.domContentLoadedEventEnd,
+             dcl: nav.domContentLoadedEventEnd};
+}
+for (const r of performance.getEntriesByType('resource')) {
+  out.res++; out.bytes += r.transferSize || 0; out.encoded += r.encodedBodySize || 0;
+}
+performance.clearResourceTimings();
+try { performance.setResourceTimingBufferSize(10000); } catch (e) {}
+return out;
+"""
+
+
+def resolve_policy(default: str, prefix: str = "") -> str:
+    """RESOURCE_POLICY / <PREFIX>_RESOURCE_POLICY override the mode's default."""
+    policy = (os.getenv(f"{prefix}_RESOURCE_POLICY", "") if prefix else "") or os.getenv("RESOURCE_POLICY", "") or default
+    policy = policy.lower()
+    if policy not in POLICIES:
+        print(f"[NET] Unknown resource policy {policy!r}; using none")
+        policy = "none"
+    return policy
+
+
+def blocked_patterns(policy: str) -> List[str]:
+    if policy == "text":
+        return TRACKER_PATTERNS + MEDIA_PATTERNS + FONT_PATTERNS
+    if policy == "lean":
+        return list(TRACKER_PATTERNS)
+    return []
+
+
+def configure_options(options, policy: str, attach: bool = False) -> None:
+    """Launch-time part of a policy (ignored by an already running browser when attaching)."""
+    if policy != "text" or attach:
+        return
+    options.add_argument("--autoplay-policy=user-gesture-required")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    try:
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    except Exception:
+        pass
+
+
+def apply_policy(driver, policy: str) -> List[str]:
+    """Runtime part: Network.setBlockedURLs plus the resource-timing buffer hook. Returns the patterns."""
+    patterns = blocked_patterns(policy)
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": BUFFER_JS})
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        print(f"[NET] Could not apply resource policy {policy}: {e}")
+        return []
+    print(f"[NET] Resource policy {policy}: {len(patterns)} blocked URL pattern(s)")
+    return patterns
+
+
+class PageStats:
+    """Accumulates Performance API transfer / load numbers across samples of one driver."""
+
+    def __init__(self, label: str, policy: str):
+        self.label = label
+        self.policy = policy
+        self.pages: Dict[float, Dict[str, Any]] = {}
+        self.resources = 0
+        self.bytes = 0
+        self.encoded = 0
+
+    def sample(self, driver) -> None:
+        """Read and clear the page's resource timings; call before navigating away and at the end."""
+        try:
+            s = driver.execute_script(PAGE_STATS_JS) or {}
+        except Exception:
+            return
+        if s.get("nav"):
+            self.pages[s.get("origin") or len(self.pages)] = s["nav"]
+        self.resources += int(s.get("res") or 0)
+        self.bytes += int(s.get("bytes") or 0)
+        self.encoded += int(s.get("encoded") or 0)
+
+    def report(self) -> None:
+        if not self.pages and not self.resources:
+            return
+        navs = list(self.pages.values())
+        loads = [n.get("load") or 0 for n in navs if n.get("load")]
+        nav_bytes = sum(int(n.get("transfer") or 0) for n in navs)
+        avg_load = sum(loads) / len(loads) if loads else 0.0
+        total_mb = (self.bytes + nav_bytes) / 1e6
+        print(f"[NET] {self.label} policy={self.policy} pages={len(navs)} avg_load={avg_load:.0f}ms "
+              f"resources={self.resources} transferred={total_mb:.1f}MB body={self.encoded / 1e6:.1f}MB")
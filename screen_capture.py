@@ -0,0 +1,299 @@
+"""Batch card screenshots: as few scroll positions as possible, encoded the cheap way.
+
+The scrapers used to scroll each card into view, sleep and call
+element.screenshot(), i.e. one full render + PNG encode + base64 transfer per
+card. BatchCapture instead scrolls to the first pending card, reads the
+bounding rects of all pending cards in one JS call and captures every card
+that is fully visible at that scroll position:
+
+  CDP backend       one Page.captureScreenshot per card with a clip rectangle,
+                    encoded by Chrome as jpeg/webp (quality, optimizeForSpeed);
+                    nothing is decoded or re-encoded in Python
+  SELENIUM backend  one PNG viewport screenshot, cards cropped out with Pillow
+                    and saved in the configured format
+
+Cards cut off at the viewport edge (or taller than the viewport) fall back to
+per-element capture; the rest are picked up at the next scroll position.
+Without Pillow the SELENIUM backend captures every card as its own PNG.
+
+Capture time and encoded size are recorded per image; each run prints a
+[SHOT] summary and CAPTURE_LOG appends one JSON line per image so formats and
+qualities can be compared.
+
+Env Vars:
+  CAPTURE_BACKEND=CDP     CDP | SELENIUM (CDP falls back to SELENIUM on error)
+  SHOT_FORMAT=jpeg        png | jpeg | webp; per platform: TW_SHOT_FORMAT,
+                          YT_SHOT_FORMAT, INSTA_SHOT_FORMAT
+  SHOT_QUALITY=80         jpeg/webp quality; per platform: <PREFIX>_SHOT_QUALITY
+  BATCH_CAPTURE=1         Set to 0 to always use per-element screenshots
+  CAPTURE_TOP_MARGIN=0.1  Fraction of the viewport left above the first card
+                          (keeps it clear of sticky headers)
+  CAPTURE_LOG=            Optional JSONL path for per-image ms / bytes records
+"""
+from __future__ import annotations
+import io, os, json, time, base64
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover
+    Image = None  # type: ignore
+
+BACKEND = os.getenv("CAPTURE_BACKEND", "CDP").upper()
+DEFAULT_FORMAT = os.getenv("SHOT_FORMAT", "jpeg").lower()
+DEFAULT_QUALITY = int(os.getenv("SHOT_QUALITY", "80"))
+BATCH_ENABLED = os.getenv("BATCH_CAPTURE", "1").lower() in {"1","true","yes"}
+TOP_MARGIN = float(os.getenv("CAPTURE_TOP_MARGIN", "0.1"))
+CAPTURE_LOG = os.getenv("CAPTURE_LOG", "")
+
+_EXT = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+_PIL_FORMAT = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+
+# Viewport-relative rects plus the scroll offset (CDP clips are in document coordinates)
+RECTS_JS = r"""
+const els = arguments[0];
+return {
+  vw: document.documentElement.clientWidth || window.innerWidth,
+  vh: window.innerHeight,
+  sx: window.scrollX, sy: window.scrollY,
+  rects: els.map(e => {
+    if (!e || !e.isConnected) return null;
+    const r = e.getBoundingClientRect();
+    return [r.left, r.top, r.width, r.height];
+  })
+};
+"""
+
+SCROLL_TO_JS = r"""
+const r = arguments[0].getBoundingClientRect();
+window.scrollBy(0, r.top - window.innerHeight * arguments[1]);
+"""
+
+
+def shot_format(prefix: str = "") -> Tuple[str, int]:
+    """(format, quality) for a platform prefix such as "TW", falling back to SHOT_FORMAT / SHOT_QUALITY."""
+    fmt = (os.getenv(f"{prefix}_SHOT_FORMAT", "") if prefix else "").lower() or DEFAULT_FORMAT
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in _EXT:
+        print(f"[SHOT] Unknown format {fmt!r}; using png")
+        fmt = "png"
+    quality = int(os.getenv(f"{prefix}_SHOT_QUALITY", "") or DEFAULT_QUALITY) if prefix else DEFAULT_QUALITY
+    return fmt, max(1, min(100, quality))
+
+
+def with_ext(path: str, fmt: str) -> str:
+    return os.path.splitext(path)[0] + _EXT.get(fmt, ".png")
+
+
+class BatchCapture:
+    """Captures many cards from as few scroll positions as possible.
+
+    `ready(driver, elements)` is called before capturing at each scroll position
+    (e.g. a FeedWaiter.wait_ready over the visible cards) so lazy images have painted.
+    `platform` selects the <PREFIX>_SHOT_FORMAT / _SHOT_QUALITY settings.
+    Paths passed in are rewritten to the extension of the configured format.
+    """
+
+    def __init__(self, label: str, ready: Optional[Callable[[Any, List[Any]], None]] = None,
+                 platform: str = ""):
+        self.label = label
+        self.ready = ready
+        self.fmt, self.quality = shot_format(platform)
+        self.backend = BACKEND
+        self.positions = 0
+        self.batched = 0
+        self.fallbacks = 0
+        self.seconds = 0.0
+        self.images = 0
+        self.bytes = 0
+        self.capture_ms = 0.0
+
+    # ---- encoding backends ----
+    def _record(self, path: str, mode: str, started: float, size: int):
+        ms = (time.perf_counter() - started) * 1000
+        self.images += 1
+        self.bytes += size
+        self.capture_ms += ms
+        if CAPTURE_LOG:
+            try:
+                with open(CAPTURE_LOG, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"label": self.label, "backend": self.backend, "format": self.fmt,
+                                        "quality": self.quality, "mode": mode, "ms": round(ms, 1),
+                                        "bytes": size, "path": path}) + "\n")
+            except Exception:
+                pass
+
+    def _cdp(self, driver, path: str, clip: Optional[Dict[str, float]] = None, beyond: bool = False) -> int:
+        params: Dict[str, Any] = {"format": self.fmt, "optimizeForSpeed": True}
+        if self.fmt != "png":
+            params["quality"] = self.quality
+        if clip:
+            params["clip"] = dict(clip, scale=1)
+            params["captureBeyondViewport"] = beyond
+        data = base64.b64decode(driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"])
+        with open(path, "wb") as f:
+            f.write(data)
+        return len(data)
+
+    def _save_image(self, img, path: str) -> int:
+        if self.fmt == "jpeg":
+            img = img.convert("RGB")
+        img.save(path, _PIL_FORMAT[self.fmt], **({"quality": self.quality} if self.fmt != "png" else {}))
+        return os.path.getsize(path)
+
+    def _save_png(self, png: bytes, path: str) -> int:
+        """Write Selenium PNG bytes, re-encoded to the configured format when Pillow is available."""
+        if self.fmt == "png" or Image is None:
+            with open(path, "wb") as f:
+                f.write(png)
+            return len(png)
+        return self._save_image(Image.open(io.BytesIO(png)), path)
+
+    def _use_cdp(self, driver) -> bool:
+        return self.backend == "CDP" and hasattr(driver, "execute_cdp_cmd")
+
+    def _cdp_failed(self, e: Exception):
+        print(f"[SHOT] CDP capture failed ({e}); switching {self.label} to Selenium screenshots")
+        self.backend = "SELENIUM"
+
+    def page(self, driver, path: str) -> str:
+        """Viewport screenshot in the configured format."""
+        started = time.perf_counter()
+        if self._use_cdp(driver):
+            path = with_ext(path, self.fmt)
+            try:
+                self._record(path, "page", started, self._cdp(driver, path))
+                return path
+            except Exception as e:
+                self._cdp_failed(e)
+        if Image is None:
+            path = with_ext(path, "png")
+        else:
+            path = with_ext(path, self.fmt)
+        self._record(path, "page", started, self._save_png(driver.get_screenshot_as_png(), path))
+        return path
+
+    def element(self, driver, element, path: str) -> str:
+        """Single-element capture in the configured format; viewport screenshot if the element is gone."""
+        if element is None:
+            return self.page(driver, path)
+        started = time.perf_counter()
+        if self._use_cdp(driver):
+            try:
+                info = driver.execute_script(RECTS_JS, [element]) or {}
+                rect = (info.get("rects") or [None])[0]
+                if rect and rect[2] > 0 and rect[3] > 0:
+                    clip = {"x": rect[0] + info.get("sx", 0), "y": rect[1] + info.get("sy", 0),
+                            "width": rect[2], "height": rect[3]}
+                    path = with_ext(path, self.fmt)
+                    self._record(path, "element", started, self._cdp(driver, path, clip, beyond=True))
+                    return path
+            except Exception as e:
+                self._cdp_failed(e)
+        try:
+            png = element.screenshot_as_png
+        except Exception:
+            return self.page(driver, path)
+        path = with_ext(path, self.fmt if Image is not None else "png")
+        self._record(path, "element", started, self._save_png(png, path))
+        return path
+
+    # ---- batching ----
+    def _fallback(self, driver, element, path: str) -> str:
+        self.fallbacks += 1
+        if element is not None:
+            try:
+                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", element)
+                if self.ready:
+                    self.ready(driver, [element])
+            except Exception:
+                pass
+        return self.element(driver, element, path)
+
+    def capture(self, driver, jobs: Sequence[Tuple[Any, str]]) -> List[str]:
+        """Screenshot each (element, path) job; returns the written paths in job order."""
+        started = time.time()
+        out = [p for _, p in jobs]
+        pending = [i for i, (el, _) in enumerate(jobs) if el is not None]
+        for i, (el, p) in enumerate(jobs):
+            if el is None:
+                self.fallbacks += 1
+                out[i] = self.page(driver, p)
+        if not BATCH_ENABLED or (Image is None and not self._use_cdp(driver)):
+            for i in pending:
+                out[i] = self._fallback(driver, jobs[i][0], jobs[i][1])
+            self.seconds += time.time() - started
+            return out
+        while pending:
+            first = jobs[pending[0]][0]
+            shot = None
+            try:
+                driver.execute_script(SCROLL_TO_JS, first, TOP_MARGIN)
+                els = [jobs[i][0] for i in pending]
+                if self.ready:
+                    self.ready(driver, els)
+                info = driver.execute_script(RECTS_JS, els) or {}
+                if not self._use_cdp(driver):
+                    t0 = time.perf_counter()
+                    png = driver.get_screenshot_as_png()
+                    shot = Image.open(io.BytesIO(png))
+                    shot.load()
+                    grab_ms = (time.perf_counter() - t0) * 1000
+            except Exception:
+                for i in pending:
+                    out[i] = self._fallback(driver, jobs[i][0], jobs[i][1])
+                break
+            self.positions += 1
+            vw = float(info.get("vw") or (shot.width if shot else 0))
+            vh = float(info.get("vh") or (shot.height if shot else 0))
+            scale = shot.width / vw if shot is not None and vw else 1.0
+            rects = info.get("rects") or [None] * len(pending)
+            visible = []
+            remaining = []
+            for n, i in enumerate(pending):
+                rect = rects[n]
+                if not rect or rect[2] <= 0 or rect[3] <= 0:
+                    out[i] = self._fallback(driver, jobs[i][0], jobs[i][1])
+                    continue
+                left, top, w, h = rect
+                if left >= 0 and top >= 0 and left + w <= vw + 0.5 and top + h <= vh + 0.5:
+                    visible.append((i, rect))
+                elif n == 0 or h > vh * (1 - TOP_MARGIN):
+                    # Cut off although scrolled to, or will never fit: capture it on its own
+                    out[i] = self._fallback(driver, jobs[i][0], jobs[i][1])
+                else:
+                    remaining.append(i)
+            for k, (i, (left, top, w, h)) in enumerate(visible):
+                t0 = time.perf_counter()
+                if shot is None:
+                    path = with_ext(jobs[i][1], self.fmt)
+                    clip = {"x": left + info.get("sx", 0), "y": top + info.get("sy", 0), "width": w, "height": h}
+                    try:
+                        size = self._cdp(driver, path, clip)
+                    except Exception as e:
+                        self._cdp_failed(e)
+                        out[i] = self._fallback(driver, jobs[i][0], jobs[i][1])
+                        continue
+                else:
+                    path = with_ext(jobs[i][1], self.fmt)
+                    box = tuple(int(round(v * scale)) for v in (left, top, left + w, top + h))
+                    size = self._save_image(shot.crop(box), path)
+                    if k == 0:
+                        t0 -= grab_ms / 1000  # attribute the viewport grab to the first crop
+                self._record(path, "batch", t0, size)
+                self.batched += 1
+                out[i] = path
+            pending = remaining
+        self.seconds += time.time() - started
+        return out
+
+    def report(self):
+        cards = self.batched + self.fallbacks
+        if not cards:
+            return
+        per_img = self.capture_ms / self.images if self.images else 0.0
+        kb = self.bytes / self.images / 1024 if self.images else 0.0
+        print(f"[SHOT] {self.label} backend={self.backend} format={self.fmt} q={self.quality} cards={cards} "
+              f"scroll_positions={self.positions} batched={self.batched} per_element={self.fallbacks} "
+              f"ms/card={self.seconds * 1000 / cards:.0f} capture_ms/img={per_img:.1f} KB/img={kb:.1f}")
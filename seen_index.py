@@ -0,0 +1,403 @@
+"""Persistent cross-run "already processed" index per platform.
+
+Each scraper keeps its in-run `seen` set, but that starts empty on every run,
+so the same content was screenshotted and classified again and again. This
+module keeps a compact scalable Bloom filter per platform on disk, keyed by
+canonical content ids (tweet status id, YouTube video id, reel shortcode),
+so content handled in an earlier run is skipped before any screenshot or
+detection work.
+
+A false positive means an unseen item is skipped, with probability of about
+SEEN_ERROR_RATE. The filter never returns a false negative.
+
+Several processes may share one index (driver_pool.py workers): save() takes
+a lock file and ORs in whatever another process wrote since we loaded, so
+concurrent runs do not drop each other's additions. Nothing is written without
+the lock: a busy lock defers an autosave to a later one, and the final save
+waits until the lock is released or old enough to be broken as stale.
+
+SinceIndex is the per-search-term counterpart for Twitter's incremental
+search: it keeps the newest status id (and its snowflake timestamp) seen per
+term in <platform>_since.json, so the next run can ask only for newer posts
+(since_id: / since: operators) and stop once it reaches known content.
+
+Env Vars:
+  SEEN_INDEX=1                 Set to 0 to disable cross-run skipping
+  SEEN_INDEX_DIR=.seen_index   Directory holding <platform>.bloom files
+  SEEN_CAPACITY=20000          Items in the first filter stage (stages double)
+  SEEN_ERROR_RATE=0.001        Target false-positive rate
+  RESET_SEEN=1                 Ignore (and overwrite) the stored index this run
+  SINCE_INDEX=1                Set to 0 to search every term from scratch (no since_id:)
+"""
+from __future__ import annotations
+import os, io, json, math, time, atexit, hashlib, struct
+from typing import Dict, List, Optional, Sequence
+
+ENABLED = os.getenv("SEEN_INDEX", "1").lower() in {"1","true","yes"}
+INDEX_DIR = os.getenv("SEEN_INDEX_DIR", ".seen_index")
+INITIAL_CAPACITY = int(os.getenv("SEEN_CAPACITY", "20000"))
+ERROR_RATE = float(os.getenv("SEEN_ERROR_RATE", "0.001"))
+RESET = os.getenv("RESET_SEEN", "0").lower() in {"1","true","yes"}
+SINCE_ENABLED = os.getenv("SINCE_INDEX", "1").lower() in {"1","true","yes"}
+_AUTOSAVE_EVERY = 25
+_AUTOSAVE_LOCK_TIMEOUT = 0.5  # autosaves never stall a scrape; a busy lock defers them
+_FINAL_LOCK_TIMEOUT = 65.0    # longer than the 60s after which lock_file breaks a stale lock
+# Twitter snowflake ids carry their creation time: (id >> 22) + epoch, in ms
+_TWITTER_EPOCH_MS = 1288834974657
+
+
+def lock_file(lock: str, timeout: float = 10.0) -> bool:
+    """Create `lock` exclusively (waiting up to `timeout`); stale locks older than 60s are broken.
+    False means the lock is held elsewhere: callers must not do their read-modify-write then."""
+    deadline = time.time() + timeout
+    while True:
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > 60:  # left behind by a killed process
+                    os.remove(lock)
+                    continue
+            except OSError:
+                pass
+            if time.time() > deadline:
+                return False
+            time.sleep(0.05)
+
+
+def _hashes(key: str):
+    d = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", d)
+    return h1, h2 | 1
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, count: int = 0, bits: Optional[bytearray] = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bits if bits is not None else bytearray((self.num_bits + 7) // 8)
+        self.count = count
+
+    def _positions(self, key: str):
+        h1, h2 = _hashes(key)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key: str):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+
+class ScalableBloomFilter:
+    """Chain of Bloom filters; a new, larger and tighter stage opens when the last one is full."""
+
+    GROWTH = 2
+    TIGHTENING = 0.5
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY, error_rate: float = ERROR_RATE):
+        self.initial_capacity = capacity
+        self.error_rate = error_rate
+        self.stages: List[BloomFilter] = []
+
+    def __contains__(self, key: str) -> bool:
+        return any(key in s for s in self.stages)
+
+    def __len__(self) -> int:
+        return sum(s.count for s in self.stages)
+
+    def add(self, key: str) -> bool:
+        """Add key; returns False if it was (probably) already present."""
+        if key in self:
+            return False
+        if not self.stages or self.stages[-1].count >= self.stages[-1].capacity:
+            n = len(self.stages)
+            self.stages.append(BloomFilter(self.initial_capacity * (self.GROWTH ** n),
+                                           self.error_rate * (1 - self.TIGHTENING) * (self.TIGHTENING ** n)))
+        self.stages[-1].add(key)
+        return True
+
+    def merge(self, other: "ScalableBloomFilter", base_counts: Optional[List[int]] = None) -> None:
+        """OR in another filter grown from the same parameters (e.g. a concurrent run's copy).
+        `base_counts` are our stage counts when both copies were last identical; with them the
+        merged counts are exact (other's items + our additions), otherwise the larger one is kept.
+        """
+        for i, st in enumerate(other.stages):
+            if i < len(self.stages):
+                mine = self.stages[i]
+                if (mine.capacity, mine.num_bits) != (st.capacity, st.num_bits):
+                    raise ValueError("incompatible bloom filter stages")
+                mine.bits = bytearray(a | b for a, b in zip(mine.bits, st.bits))
+                if base_counts is not None:
+                    base = base_counts[i] if i < len(base_counts) else 0
+                    mine.count = st.count + max(0, mine.count - base)
+                else:
+                    mine.count = max(mine.count, st.count)
+            else:
+                self.stages.append(BloomFilter(st.capacity, st.error_rate, st.count, bytearray(st.bits)))
+
+    def dump(self, fh: io.BufferedWriter):
+        header = {"version": 1, "initial_capacity": self.initial_capacity, "error_rate": self.error_rate,
+                  "stages": [{"capacity": s.capacity, "error_rate": s.error_rate, "count": s.count} for s in self.stages]}
+        fh.write(json.dumps(header).encode("utf-8") + b"\n")
+        for s in self.stages:
+            fh.write(bytes(s.bits))
+
+    @classmethod
+    def load(cls, fh: io.BufferedReader) -> "ScalableBloomFilter":
+        header = json.loads(fh.readline().decode("utf-8"))
+        sbf = cls(header["initial_capacity"], header["error_rate"])
+        for st in header["stages"]:
+            stage = BloomFilter(st["capacity"], st["error_rate"], st["count"])
+            raw = fh.read(len(stage.bits))
+            if len(raw) != len(stage.bits):
+                raise ValueError("truncated bloom filter file")
+            stage.bits = bytearray(raw)
+            sbf.stages.append(stage)
+        return sbf
+
+
+class SeenIndex:
+    """File-backed ScalableBloomFilter for one platform (no-op when SEEN_INDEX=0)."""
+
+    def __init__(self, platform: str, path: Optional[str] = None, enabled: bool = ENABLED):
+        self.platform = platform
+        self.enabled = enabled
+        self.path = path or os.path.join(INDEX_DIR, f"{platform}.bloom")
+        self.filter = ScalableBloomFilter()
+        self._dirty = 0
+        self._next_autosave = _AUTOSAVE_EVERY
+        self._mtime: Optional[float] = None  # on-disk version we are based on (None = merge it on save)
+        self._base_counts: List[int] = []
+        self.skipped = 0
+        if not enabled:
+            return
+        if RESET and os.path.exists(self.path):
+            self._mtime = os.path.getmtime(self.path)  # overwrite rather than merge the old index
+        if os.path.exists(self.path) and not RESET:
+            try:
+                with open(self.path, "rb") as f:
+                    self.filter = ScalableBloomFilter.load(f)
+                self._mtime = os.path.getmtime(self.path)
+                self._base_counts = [s.count for s in self.filter.stages]
+            except Exception as e:
+                print(f"[SEEN] Could not read {self.path} ({e}); starting empty")
+        self.known_at_start = len(self.filter)
+        print(f"[SEEN] {platform}: {self.known_at_start} item(s) from previous runs ({self.path})")
+        atexit.register(self.save)
+
+    def __contains__(self, key: str) -> bool:
+        if not self.enabled or not key:
+            return False
+        return key in self.filter
+
+    def seen_before(self, key: str) -> bool:
+        """Membership test that also counts skips for the end-of-run summary."""
+        hit = key in self
+        if hit:
+            self.skipped += 1
+        return hit
+
+    def add(self, key: str):
+        if not self.enabled or not key:
+            return
+        if self.filter.add(key):
+            self._dirty += 1
+            if self._dirty >= self._next_autosave and not self.save(_AUTOSAVE_LOCK_TIMEOUT):
+                self._next_autosave = self._dirty + _AUTOSAVE_EVERY  # lock busy: retry later
+
+    def _lock(self, timeout: float = 10.0) -> bool:
+        return lock_file(self.path + ".lock", timeout)
+
+    def save(self, timeout: float = _FINAL_LOCK_TIMEOUT) -> bool:
+        """Merge and write the filter under the lock; False (nothing written, additions kept
+        in memory for the next save) when the lock stays busy for `timeout` seconds."""
+        if not self.enabled or not self._dirty:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not self._lock(timeout):
+            print(f"[SEEN] {self.path} is locked by another process; save deferred ({self._dirty} new item(s))")
+            return False
+        try:
+            if os.path.exists(self.path) and os.path.getmtime(self.path) != self._mtime:
+                try:
+                    with open(self.path, "rb") as f:
+                        self.filter.merge(ScalableBloomFilter.load(f), self._base_counts)
+                except Exception as e:
+                    print(f"[SEEN] Could not merge concurrent changes from {self.path} ({e})")
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                self.filter.dump(f)
+            os.replace(tmp, self.path)
+            self._mtime = os.path.getmtime(self.path)
+            self._base_counts = [s.count for s in self.filter.stages]
+            self._dirty = 0
+            self._next_autosave = _AUTOSAVE_EVERY
+            return True
+        finally:
+            try: os.remove(self.path + ".lock")
+            except OSError: pass
+
+
+def snowflake_time(status_id: str) -> Optional[float]:
+    """Creation time (epoch seconds) encoded in a Twitter status id; None for non-numeric ids."""
+    if not str(status_id).isdigit():
+        return None
+    return ((int(status_id) >> 22) + _TWITTER_EPOCH_MS) / 1000.0
+
+
+class SinceIndex:
+    """Newest status id seen per search term, persisted between runs (no-op when SINCE_INDEX=0).
+
+    observe() tracks the newest id of the running scan; commit() stores it once the
+    scan reached the old boundary or ran out of results. A scan that stopped earlier
+    (interrupted, or at its target) is discard()ed, so the boundary never moves past
+    posts no run has fetched.
+    """
+
+    def __init__(self, platform: str, path: Optional[str] = None, enabled: bool = SINCE_ENABLED):
+        self.platform = platform
+        self.enabled = enabled and not RESET
+        self.path = path or os.path.join(INDEX_DIR, f"{platform}_since.json")
+        self.terms: Dict[str, Dict[str, object]] = {}
+        self._newest: Dict[str, int] = {}
+        self._deferred: Dict[str, int] = {}  # committed boundaries not written yet (lock busy)
+        if enabled and not RESET:
+            self.terms = self._read()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _key(term: str) -> str:
+        return " ".join(term.lower().split())
+
+    def _read(self) -> Dict[str, Dict[str, object]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[SINCE] Could not read {self.path} ({e}); searching all terms from scratch")
+            return {}
+
+    def since_id(self, term: str) -> Optional[int]:
+        entry = self.terms.get(self._key(term)) if self.enabled else None
+        return int(entry["since_id"]) if entry else None
+
+    def operators(self, term: str) -> str:
+        """' since_id:<id> since:<YYYY-MM-DD>' for a term searched before, else ''."""
+        sid = self.since_id(term)
+        if sid is None:
+            return ""
+        ts = snowflake_time(str(sid)) or time.time()
+        return f" since_id:{sid} since:{time.strftime('%Y-%m-%d', time.gmtime(ts))}"
+
+    def is_known(self, term: str, status_id: str) -> bool:
+        """True once a (newest-first) scan reaches a post at or before the stored boundary."""
+        sid = self.since_id(term)
+        return sid is not None and str(status_id).isdigit() and int(status_id) <= sid
+
+    def observe(self, term: str, status_id: str):
+        if self.enabled and str(status_id).isdigit():
+            k = self._key(term)
+            self._newest[k] = max(self._newest.get(k, 0), int(status_id))
+
+    def scan_round(self, term: str, ids: Sequence[str], st) -> int:
+        """Boundary bookkeeping for one newest-first round of a scan.
+
+        `ids` are the status ids that arrived this round, in feed order, with ads left
+        out but cards rejected by the page / text filters included. Ids before the
+        first known one are observed and added to `st.observed`; a known id sets
+        `st.reached_known`. A round without a single new id counts toward `st.empty`
+        (the feed has run dry), whatever was stored from it. Returns how many leading
+        ids belong to this scan (the index of the first known id, else len(ids)).
+        """
+        new, stop = 0, len(ids)
+        for i, pid in enumerate(ids):
+            if term and self.is_known(term, pid):
+                st.reached_known = True
+                stop = i
+                break
+            if term:
+                self.observe(term, pid)
+            if pid and pid not in st.observed:
+                st.observed.add(pid)
+                new += 1
+        st.empty = 0 if new else st.empty + 1
+        return stop
+
+    def finish(self, term: str, st) -> bool:
+        """End of a term's scan: move the boundary only if everything newer than it was
+        scanned (reached_known, or the feed ran out of new ids) and the scan did not stop at
+        its target first (`st.at_target`: later ids of that round went unprocessed);
+        returns whether it moved."""
+        complete = getattr(st, "reached_known", False) or getattr(st, "exhausted", False)
+        if complete and not getattr(st, "at_target", False):
+            self.commit(term)
+            return True
+        # Stopped at the target above the old boundary: moving it would skip the posts in between
+        self.discard(term)
+        return False
+
+    def discard(self, term: str):
+        """Forget the running scan of `term` without moving its boundary (the scan stopped early)."""
+        if self._newest.pop(self._key(term), 0) and self.since_id(term) is not None:
+            print(f"[SINCE] '{term}': target reached before the previous run's posts; keeping the boundary")
+
+    def commit(self, term: str):
+        """Store the newest id observed for `term` (merged with concurrent writers)."""
+        k = self._key(term)
+        newest = self._newest.pop(k, 0)
+        if not self.enabled or not newest:
+            return
+        self._deferred[k] = max(self._deferred.get(k, 0), newest)
+        self.flush(timeout=10.0)
+
+    def flush(self, timeout: float = _FINAL_LOCK_TIMEOUT) -> bool:
+        """Write committed boundaries under the lock; kept for the next flush when it stays busy."""
+        if not self._deferred:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if not lock_file(self.path + ".lock", timeout):
+            print(f"[SINCE] {self.path} is locked by another process; {len(self._deferred)} boundary update(s) deferred")
+            return False
+        try:
+            self.terms = self._read()
+            changed = False
+            for k, newest in self._deferred.items():
+                if newest <= int(self.terms.get(k, {}).get("since_id", 0)):
+                    continue
+                ts = snowflake_time(str(newest))
+                self.terms[k] = {"since_id": str(newest),
+                                 "since_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts)) if ts else None,
+                                 "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+                changed = True
+                print(f"[SINCE] '{k}': next run starts after status {newest}")
+            if changed:
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self.terms, f, indent=1)
+                os.replace(tmp, self.path)
+            self._deferred = {}
+            return True
+        finally:
+            try: os.remove(self.path + ".lock")
+            except OSError: pass
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Inspect / query a platform seen index")
+    ap.add_argument("platform", choices=["twitter", "youtube", "instagram"])
+    ap.add_argument("ids", nargs="*", help="Ids to test for membership")
+    args = ap.parse_args()
+    idx = SeenIndex(args.platform)
+    print(f"stages={len(idx.filter.stages)} items={len(idx.filter)} "
+          f"bytes={sum(len(s.bits) for s in idx.filter.stages)}")
+    for i in args.ids:
+        print(f"{i}: {'seen' if i in idx else 'new'}")
@@ -0,0 +1,200 @@
+"""Saved login sessions (cookies + localStorage) so scrapers can skip the login flow.
+
+twitter_scrape.login and insta_final.ensure_logged_in walk through the login
+form on every run (page load, jittered sleeps, up to 15s / 60-120s of
+polling). After a confirmed login the session is written to
+SESSION_DIR/<platform>.json: all cookies of the platform's domains (read
+through CDP Network.getAllCookies, so HttpOnly ones such as auth_token /
+sessionid are included) and the origin's localStorage. On the next start:
+
+  1. cookies go in with Network.setCookies before any navigation,
+  2. a tiny same-origin document (robots.txt) is opened and localStorage restored,
+  3. one cheap probe validates the session:
+       twitter    x.com/home must render the primary column (not the login flow)
+       instagram  /api/v1/accounts/current_user/ must return a user
+
+Only when the probe fails (or nothing is stored) does the caller run its full
+login, then save() the fresh session. Session files hold credentials-equivalent
+tokens: they are written with mode 0600 and .sessions/ is git-ignored.
+
+Env Vars:
+  SESSION_STORE=1          Set to 0 to always run the full login
+  SESSION_DIR=.sessions    Where <platform>.json session files live
+  SESSION_MAX_AGE_DAYS=14  Older session files are ignored
+  INSTA_APP_ID=936619743392459   X-IG-App-ID header for the Instagram probe
+"""
+from __future__ import annotations
+import os, json, time
+from typing import Any, Dict, List, Optional
+from dom_utils import script_timeout
+
+ENABLED = os.getenv("SESSION_STORE", "1").lower() in {"1","true","yes"}
+SESSION_DIR = os.getenv("SESSION_DIR", ".sessions")
+MAX_AGE_DAYS = float(os.getenv("SESSION_MAX_AGE_DAYS", "14"))
+INSTA_APP_ID = os.getenv("INSTA_APP_ID", "936619743392459")
+
+PLATFORMS: Dict[str, Dict[str, Any]] = {
+    "twitter": {"origin": "https://x.com", "domains": ["x.com", "twitter.com"], "probe": "page",
+                "probe_url": "https://x.com/home"},
+    "instagram": {"origin": "https://www.instagram.com", "domains": ["instagram.com"], "probe": "fetch",
+                  "probe_url": "/api/v1/accounts/current_user/?edit=true"},
+}
+
+_LOCAL_STORAGE_GET_JS = r"""
+const out = {};
+for (let i = 0; i < localStorage.length; i++) { const k = localStorage.key(i); out[k] = localStorage.getItem(k); }
+return out;
+"""
+_LOCAL_STORAGE_SET_JS = r"""
+const items = arguments[0] || {};
+for (const k of Object.keys(items)) { try { localStorage.setItem(k, items[k]); } catch (e) {} }
+return Object.keys(items).length;
+"""
+# 'in' once the logged-in shell rendered, 'out' on the login flow, '' while undecided
+_TWITTER_STATE_JS = r"""
+const onLogin = /\/(login|i\/flow)/.test(location.pathname);
+if (!onLogin && document.querySelector("div[data-testid='primaryColumn']")) return 'in';
+if (onLogin || location.pathname === '/' || document.querySelector("input[name='password']")) return 'out';
+return '';
+"""
+# execute_async_script; arguments: probe url, X-IG-App-ID, callback
+_INSTA_PROBE_JS = r"""
+const [url, appId, done] = arguments;
+fetch(url, {credentials: 'include', headers: {'X-IG-App-ID': appId, 'X-Requested-With': 'XMLHttpRequest'}})
+  .then(r => r.ok ? r.json() : null)
+  .then(j => done(!!(j && j.user)))
+  .catch(() => done(false));
+"""
+
+
+def _domain_match(cookie_domain: str, domains: List[str]) -> bool:
+    d = cookie_domain.lstrip(".").lower()
+    return any(d == x or d.endswith("." + x) for x in domains)
+
+
+class SessionStore:
+    """Save / restore / validate one platform's login session on a Selenium Chrome driver."""
+
+    def __init__(self, platform: str, directory: str = SESSION_DIR, enabled: bool = ENABLED):
+        self.platform = platform
+        self.cfg = PLATFORMS[platform]
+        self.path = os.path.join(directory, f"{platform}.json")
+        self.enabled = enabled
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[SESSION] Could not read {self.path} ({e})")
+            return None
+        age_days = (time.time() - float(data.get("saved_at", 0))) / 86400
+        if age_days > MAX_AGE_DAYS:
+            print(f"[SESSION] {self.platform}: stored session is {age_days:.0f} days old; ignoring")
+            return None
+        now = time.time()
+        data["cookies"] = [c for c in data.get("cookies", []) if not c.get("expires") or c["expires"] <= 0
+                           or c["expires"] > now]
+        return data
+
+    def _open_origin(self, driver):
+        driver.get(self.cfg["origin"] + "/robots.txt")
+
+    def validate(self, driver, timeout: float = 10.0) -> bool:
+        """One cheap probe: is the browser logged in right now?"""
+        try:
+            if self.cfg["probe"] == "fetch":
+                if not driver.current_url.startswith(self.cfg["origin"]):
+                    self._open_origin(driver)
+                with script_timeout(driver, timeout + 5):
+                    return bool(driver.execute_async_script(_INSTA_PROBE_JS, self.cfg["probe_url"], INSTA_APP_ID))
+            driver.get(self.cfg["probe_url"])
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                state = driver.execute_script(_TWITTER_STATE_JS)
+                if state:
+                    return state == "in"
+                time.sleep(0.25)
+        except Exception as e:
+            print(f"[SESSION] {self.platform}: probe failed ({e})")
+        return False
+
+    def restore(self, driver) -> bool:
+        """Restore the stored session and validate it; False means the caller must log in."""
+        if not self.enabled:
+            return False
+        data = self._load()
+        if not data:
+            return False
+        started = time.time()
+        try:
+            if data["cookies"]:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setCookies", {"cookies": data["cookies"]})
+            if data.get("local_storage"):
+                self._open_origin(driver)
+                driver.execute_script(_LOCAL_STORAGE_SET_JS, data["local_storage"])
+        except Exception as e:
+            print(f"[SESSION] {self.platform}: restore failed ({e})")
+            return False
+        ok = self.validate(driver)
+        print(f"[SESSION] {self.platform}: restored {len(data['cookies'])} cookie(s), "
+              f"{len(data.get('local_storage') or {})} localStorage key(s) -> {'valid' if ok else 'invalid'} "
+              f"in {time.time() - started:.1f}s")
+        return ok
+
+    def save(self, driver) -> bool:
+        """Store the current session (call only after a confirmed login)."""
+        if not self.enabled:
+            return False
+        try:
+            cookies = [c for c in driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+                       if _domain_match(c.get("domain", ""), self.cfg["domains"])]
+            if not driver.current_url.startswith(self.cfg["origin"]):
+                self._open_origin(driver)
+            local = driver.execute_script(_LOCAL_STORAGE_GET_JS) or {}
+        except Exception as e:
+            print(f"[SESSION] {self.platform}: could not read session ({e})")
+            return False
+        # Network.setCookies accepts CookieParam; drop the read-only fields of Network.Cookie
+        keep = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires", "priority",
+                "sourceScheme", "sourcePort", "partitionKey")
+        cookies = [{k: c[k] for k in keep if k in c} for c in cookies]
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "cookies": cookies, "local_storage": local}, f)
+        os.replace(tmp, self.path)
+        print(f"[SESSION] {self.platform}: saved {len(cookies)} cookie(s), {len(local)} localStorage key(s)")
+        return True
+
+    def save_if_valid(self, driver) -> bool:
+        return self.validate(driver) and self.save(driver)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Inspect or clear a stored login session")
+    ap.add_argument("platform", choices=sorted(PLATFORMS))
+    ap.add_argument("--clear", action="store_true", help="Delete the stored session")
+    args = ap.parse_args()
+    store = SessionStore(args.platform)
+    if args.clear:
+        store.clear()
+        print(f"Removed {store.path}")
+    else:
+        data = store._load()
+        if not data:
+            print("No usable stored session")
+        else:
+            print(f"saved {time.ctime(data['saved_at'])}: {len(data['cookies'])} cookie(s), "
+                  f"{len(data.get('local_storage') or {})} localStorage key(s)")
@@ -0,0 +1,149 @@
+"""Recover from a dead WebDriver session and resume the interrupted scraping step.
+
+When Chrome or chromedriver dies mid-run (renderer OOM / "tab crashed",
+"disconnected", invalid session id, connection refused to chromedriver) the
+exception used to escape and the whole run was lost. DriverSupervisor owns
+the driver and runs the scraping loops as steps:
+
+  sup = DriverSupervisor("TW", build_driver, prepare=restore_login)
+  st = sup.state("SEARCH:" + term)
+  sup.run(collect_step, term, st, where=term)   # calls collect_step(sup.driver, term, st)
+
+On a session-level failure it quits what is left of the old driver, builds a
+new one, calls `prepare(driver)` (session restore / login, per-driver helpers
+such as NetworkCapture), navigates to `resume_url` if the caller set one and
+calls the step again. Steps start by navigating to their mode / term / URL and
+keep their counters and seen sets in the `state()` namespace, which survives
+the rebuild, so collection continues where it stopped. Other exceptions
+propagate unchanged. Recoveries are bounded (MAX_RECOVERIES per run, with
+backoff) and each one is logged, optionally as JSONL.
+
+Env Vars:
+  MAX_RECOVERIES=3      Driver rebuilds allowed per run (0 disables recovery)
+  RECOVERY_BACKOFF=2    Seconds before the first rebuild (doubles, max 30s)
+  RECOVERY_LOG=         Optional JSONL path, one record per recovery
+"""
+from __future__ import annotations
+import os, json, time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+MAX_RECOVERIES = int(os.getenv("MAX_RECOVERIES", "3"))
+BACKOFF = float(os.getenv("RECOVERY_BACKOFF", "2"))
+RECOVERY_LOG = os.getenv("RECOVERY_LOG", "")
+
+# Substrings of WebDriver / transport errors that mean the session itself is gone
+_SESSION_MARKERS = (
+    "invalid session id", "no such session", "session deleted", "disconnected", "not connected to devtools",
+    "chrome not reachable", "tab crashed", "target crashed", "target window already closed",
+    "no such window", "unable to receive message from renderer", "connection refused",
+    "max retries exceeded", "remotedisconnected", "connection aborted", "broken pipe",
+)
+
+
+def is_session_failure(exc: BaseException) -> bool:
+    """True for errors after which the WebDriver session cannot be used any more."""
+    name = type(exc).__name__
+    if name in {"InvalidSessionIdException", "NoSuchWindowException", "MaxRetryError", "NewConnectionError",
+                "ProtocolError", "RemoteDisconnected", "ConnectionRefusedError", "ConnectionResetError",
+                "BrokenPipeError"}:
+        return True
+    text = str(exc).lower()
+    return any(m in text for m in _SESSION_MARKERS)
+
+
+class DriverSupervisor:
+    """Owns a WebDriver; rebuilds it and re-runs the current step after a session crash."""
+
+    def __init__(self, label: str, build: Callable[[], Any], prepare: Optional[Callable[[Any], Any]] = None,
+                 max_recoveries: int = MAX_RECOVERIES, states: Optional[Dict[str, SimpleNamespace]] = None):
+        self.label = label
+        self.build = build
+        self.prepare = prepare
+        self.max_recoveries = max_recoveries
+        self.recoveries = 0
+        self.resume_url = ""
+        self.context: Any = None
+        # shared with a checkpoint.Checkpoint when the caller passes its `states`
+        self._states: Dict[str, SimpleNamespace] = states if states is not None else {}
+        self.driver = build()
+        if prepare:
+            self.context = prepare(self.driver)
+
+    def state(self, key: str, **defaults: Any) -> SimpleNamespace:
+        """Per-step state that outlives driver rebuilds (created from `defaults` on first use)."""
+        if key not in self._states:
+            self._states[key] = SimpleNamespace(**defaults)
+        return self._states[key]
+
+    def run(self, step: Callable[..., Any], *args: Any, where: str = "", **kwargs: Any) -> Any:
+        """step(driver, *args, **kwargs), re-run on a fresh driver after a session-level failure.
+        `where` names the step in recovery logs (mode / term)."""
+        while True:
+            try:
+                return step(self.driver, *args, **kwargs)
+            except Exception as e:
+                if not is_session_failure(e) or self.recoveries >= self.max_recoveries:
+                    raise
+                self.recover(e, where or getattr(step, "__name__", "step"))
+
+    def recover(self, exc: BaseException, where: str = ""):
+        """Replace the dead driver; raises the last error once the recovery budget is spent."""
+        while True:
+            if self.recoveries >= self.max_recoveries:
+                raise exc
+            self.recoveries += 1
+            started = time.time()
+            print(f"[RECOVER] {self.label}: session lost in {where or 'step'} "
+                  f"({type(exc).__name__}: {str(exc).splitlines()[0][:160] if str(exc) else ''}); "
+                  f"rebuilding driver (attempt {self.recoveries}/{self.max_recoveries})")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            time.sleep(min(BACKOFF * (2 ** (self.recoveries - 1)), 30.0))
+            try:
+                self.driver = self.build()
+                if self.prepare:
+                    self.context = self.prepare(self.driver)
+                if self.resume_url:
+                    self.driver.get(self.resume_url)
+            except Exception as e:
+                print(f"[RECOVER] {self.label}: rebuild failed: {e}")
+                self._log(where, exc, started, ok=False)
+                exc = e
+                continue
+            print(f"[RECOVER] {self.label}: driver rebuilt in {time.time() - started:.1f}s; resuming {where or 'step'}")
+            self._log(where, exc, started, ok=True)
+            return
+
+    def _log(self, where: str, exc: BaseException, started: float, ok: bool):
+        if not RECOVERY_LOG:
+            return
+        try:
+            with open(RECOVERY_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"label": self.label, "where": where, "error": type(exc).__name__,
+                                    "message": str(exc)[:300], "attempt": self.recoveries, "ok": ok,
+                                    "seconds": round(time.time() - started, 1),
+                                    "at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}) + "\n")
+        except Exception:
+            pass
+
+    def report(self):
+        if self.recoveries:
+            print(f"[RECOVER] {self.label}: {self.recoveries} driver recovery(ies) this run")
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+def loop_state(st: Optional[SimpleNamespace] = None, **defaults: Any) -> SimpleNamespace:
+    """Fill in a collection loop's counters on `st` (from DriverSupervisor.state) without resetting them."""
+    st = st if st is not None else SimpleNamespace()
+    for k, v in defaults.items():
+        if not hasattr(st, k):
+            setattr(st, k, v)
+    return st
@@ -0,0 +1,212 @@
+"""Adaptive per-term item budgets: spend a run's budget where flagged content is.
+
+TW_POST_TARGET / YT_PER_TERM give every search term the same quota, yet a few
+terms yield nearly all flagged items. With TERM_BUDGET=1 the run's total budget
+(per-term quota x number of terms) is handed out by a Thompson-sampling bandit
+before each term:
+
+  yield      each term's flagged items per browser-second, with a
+             Gamma(flagged + 1, seconds + PRIOR_SECONDS) posterior built from
+             earlier runs' stats (plus the finished terms of this run)
+  quota      remaining budget x (TERM_EXPLORE / remaining terms
+                                 + (1 - TERM_EXPLORE) x sampled yield share)
+
+so productive terms get most of the budget, every term keeps an exploration
+share, and budget a term leaves unused (results ran out) flows to the terms
+after it. Terms without history sample from the optimistic prior, which makes
+sure they get tried.
+
+Per-term stats (runs, collected, scanned, flagged, browser seconds) are kept in
+SEEN_INDEX_DIR/<platform>_terms.json for every run, adaptive or not. On first
+use they are seeded from the flagged / metadata JSONL files ("search_term"
+field). Those carry no timing, so each seeded item is charged
+TERM_SEED_SECONDS browser-seconds; with zero seconds a seeded term's posterior
+would look far faster than any timed term. At the end of a run report() prints flagged items per
+browser-minute next to an estimate for the uniform split, which uses the same
+per-term yields and collection speeds.
+
+Env Vars:
+  TERM_BUDGET=0          Set to 1 for adaptive per-term quotas (0 = fixed quota per term)
+  TERM_EXPLORE=0.2       Share of the budget spread evenly over the remaining terms
+  TERM_MIN_QUOTA=2       Smallest quota a term gets
+  TERM_PRIOR_SECONDS=120 Pseudo-seconds of the prior (one flagged item per this many seconds)
+  TERM_SEED_SECONDS=6    Estimated browser-seconds per item for stats seeded from output files
+"""
+from __future__ import annotations
+import os, json, random
+from typing import Dict, List, Optional, Tuple
+
+ENABLED = os.getenv("TERM_BUDGET", "0").lower() in {"1","true","yes"}
+EXPLORE = min(1.0, max(0.0, float(os.getenv("TERM_EXPLORE", "0.2"))))
+MIN_QUOTA = int(os.getenv("TERM_MIN_QUOTA", "2"))
+PRIOR_SECONDS = float(os.getenv("TERM_PRIOR_SECONDS", "120"))
+SEED_SECONDS = float(os.getenv("TERM_SEED_SECONDS", "6"))
+STATS_DIR = os.getenv("SEEN_INDEX_DIR", ".seen_index")
+_FIELDS = ("runs", "collected", "scanned", "flagged", "seconds")
+
+
+def _key(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def seed_stats(meta_paths: List[Tuple[str, bool]]) -> Dict[str, Dict[str, float]]:
+    """Per-term collected / flagged counts from existing output files, timed at SEED_SECONDS per item.
+    `meta_paths` pairs each JSONL path with whether its records are flagged ones."""
+    stats: Dict[str, Dict[str, float]] = {}
+    for path, flagged in meta_paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        term = json.loads(line).get("search_term")
+                    except ValueError:
+                        continue
+                    if not term:
+                        continue
+                    s = stats.setdefault(_key(term), {k: 0.0 for k in _FIELDS})
+                    s["collected"] += 1
+                    s["scanned"] += 1
+                    s["flagged"] += 1 if flagged else 0
+                    s["seconds"] += SEED_SECONDS
+        except OSError:
+            continue
+    return stats
+
+
+class TermBudget:
+    """Hands out per-term quotas from a run's total budget and records what each term yielded."""
+
+    def __init__(self, platform: str, terms: List[str], per_term: int, enabled: bool = ENABLED,
+                 seed_from: Optional[List[Tuple[str, bool]]] = None, path: Optional[str] = None):
+        self.platform = platform
+        self.terms = list(terms)
+        self.per_term = per_term
+        self.total = per_term * len(self.terms)
+        self.enabled = enabled
+        self.path = path or os.path.join(STATS_DIR, f"{platform}_terms.json")
+        self.history = self._read()
+        if not self.history and seed_from:
+            self.history = seed_stats(seed_from)
+            if self.history:
+                print(f"[BUDGET] Seeded term stats for {len(self.history)} term(s) from earlier output files")
+        self.run: Dict[str, Dict[str, float]] = {}
+        self.quotas: Dict[str, int] = {}
+
+    def _read(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                history = json.load(f)
+            # Terms seeded before seeding charged time: give their untimed items the same estimate
+            for s in history.values():
+                if s.get("collected") and not s.get("seconds"):
+                    s["seconds"] = float(s["collected"]) * SEED_SECONDS
+            return history
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[BUDGET] Could not read {self.path} ({e}); no term history")
+            return {}
+
+    def _stats(self, term: str) -> Dict[str, float]:
+        """History plus this run's finished terms."""
+        h = self.history.get(_key(term), {})
+        r = self.run.get(_key(term), {})
+        return {k: float(h.get(k, 0)) + float(r.get(k, 0)) for k in _FIELDS}
+
+    def _sample_yield(self, term: str) -> float:
+        s = self._stats(term)
+        return random.gammavariate(s["flagged"] + 1.0, 1.0 / (s["seconds"] + PRIOR_SECONDS))
+
+    def mean_yield(self, term: str) -> float:
+        """Posterior mean flagged items per browser-second."""
+        s = self._stats(term)
+        return (s["flagged"] + 1.0) / (s["seconds"] + PRIOR_SECONDS)
+
+    def quota(self, term: str) -> int:
+        """Items for `term`: the fixed per-term quota, or its sampled share of the remaining budget."""
+        if term in self.quotas:
+            return self.quotas[term]
+        if not self.enabled:
+            q = self.per_term
+        else:
+            remaining = [t for t in self.terms if t not in self.quotas]
+            used = sum(self.run.get(_key(t), {}).get("collected", 0) for t in self.quotas)
+            budget = max(0, self.total - used)
+            samples = {t: self._sample_yield(t) for t in remaining}
+            norm = sum(samples.values()) or 1.0
+            n = max(1, len(remaining))
+            share = EXPLORE / n + (1 - EXPLORE) * samples.get(term, 0) / norm
+            q = max(MIN_QUOTA, int(round(budget * share)))
+            print(f"[BUDGET] '{term}': quota {q} of {budget} remaining "
+                  f"(est. {self.mean_yield(term) * 60:.2f} flagged/min)")
+        self.quotas[term] = q
+        return q
+
+    def record(self, term: str, collected: int, scanned: int, flagged: int, seconds: float):
+        """Totals of one finished term this run."""
+        self.quotas.setdefault(term, self.per_term)
+        self.run[_key(term)] = {"runs": 1, "collected": collected, "scanned": scanned,
+                                "flagged": flagged, "seconds": seconds}
+
+    def save(self):
+        """Add this run's term stats to the on-disk history."""
+        if not self.run:
+            return
+        current = self._read() or self.history
+        for k, r in self.run.items():
+            s = current.setdefault(k, {f: 0 for f in _FIELDS})
+            for f in _FIELDS:
+                s[f] = round(float(s.get(f, 0)) + float(r.get(f, 0)), 1)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+        os.replace(tmp, self.path)
+        self.history, self.run = current, {}
+
+    def report(self):
+        """Flagged items per browser-minute this run vs. an estimate for the uniform split."""
+        if not self.run:
+            return
+        for t in self.terms:
+            r = self.run.get(_key(t))
+            if r:
+                print(f"[BUDGET] {t!r}: quota={self.quotas.get(t)} collected={int(r['collected'])} "
+                      f"flagged={int(r['flagged'])} minutes={r['seconds'] / 60:.1f}")
+        flagged = sum(r["flagged"] for r in self.run.values())
+        minutes = sum(r["seconds"] for r in self.run.values()) / 60
+        # Uniform split: every term collects per_term items at its observed speed and yield
+        u_flagged = u_minutes = 0.0
+        for t in self.terms:
+            s = self._stats(t)
+            spc = s["seconds"] / s["collected"] if s["collected"] and s["seconds"] else None
+            if spc is None:
+                continue
+            secs = self.per_term * spc
+            u_minutes += secs / 60
+            u_flagged += self.mean_yield(t) * secs
+        actual = flagged / minutes if minutes else 0.0
+        line = (f"[BUDGET] {'adaptive' if self.enabled else 'uniform'}: {int(flagged)} flagged in "
+                f"{minutes:.1f} browser-min = {actual:.2f}/min")
+        if u_minutes:
+            uniform = u_flagged / u_minutes
+            line += f"; uniform split est. {uniform:.2f}/min ({actual / uniform if uniform else 0:.2f}x)"
+        print(line)
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Show per-term yield history and a sample allocation")
+    ap.add_argument("platform", choices=["twitter", "youtube"])
+    ap.add_argument("--terms", default="", help="Comma separated terms to allocate a budget over")
+    ap.add_argument("--per-term", type=int, default=40)
+    args = ap.parse_args()
+    terms = [t.strip() for t in args.terms.split(",") if t.strip()]
+    tb = TermBudget(args.platform, terms, args.per_term, enabled=True)
+    for k, s in sorted(tb.history.items(), key=lambda kv: -kv[1].get("flagged", 0)):
+        print(f"{k!r}: runs={int(s.get('runs', 0))} collected={int(s.get('collected', 0))} "
+              f"flagged={int(s.get('flagged', 0))} minutes={s.get('seconds', 0) / 60:.1f} "
+              f"yield={tb.mean_yield(k) * 60:.2f}/min")
+    for t in terms:
+        tb.quota(t)
+        tb.record(t, tb.quotas[t], tb.quotas[t], 0, 0)
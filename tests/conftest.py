@@ -0,0 +1,4 @@
+import os, sys
+
+# The scraper modules are flat top-level files in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+"""SinceIndex round bookkeeping: when an incremental Twitter search may move its since_id boundary."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from seen_index import SinceIndex
+
+BOUNDARY = 1829900000000000000
+SINCE_SCROLL_LIMIT = 4
+
+
+@pytest.fixture
+def since(tmp_path):
+    path = tmp_path / "twitter_since.json"
+    path.write_text(json.dumps({"foo": {"since_id": str(BOUNDARY)}}))
+    return SinceIndex("twitter", path=str(path), enabled=True)
+
+
+def scan_state():
+    return SimpleNamespace(observed=set(), empty=0, reached_known=False, exhausted=False, at_target=False)
+
+
+def stored_boundary(since):
+    with open(since.path, "r", encoding="utf-8") as f:
+        return int(json.load(f)["foo"]["since_id"])
+
+
+def test_round_with_everything_filtered_out_is_not_empty(since):
+    st = scan_state()
+    # Three new posts arrive and all of them are rejected by the text filters: nothing is stored
+    ids = [str(BOUNDARY + 30), str(BOUNDARY + 20), str(BOUNDARY + 10)]
+    for _ in range(SINCE_SCROLL_LIMIT):
+        assert since.scan_round("foo", ids, st) == len(ids)
+        ids = [str(int(i) - 1) for i in ids]  # the next scroll brings further (also filtered) posts
+        assert st.empty == 0
+    st.exhausted = st.empty >= SINCE_SCROLL_LIMIT
+    assert not st.exhausted and not st.reached_known
+    assert since.finish("foo", st) is False
+    assert stored_boundary(since) == BOUNDARY
+
+
+def test_feed_without_new_ids_exhausts_and_commits(since):
+    st = scan_state()
+    ids = [str(BOUNDARY + 7), str(BOUNDARY + 5)]
+    since.scan_round("foo", ids, st)
+    for _ in range(SINCE_SCROLL_LIMIT):
+        since.scan_round("foo", ids, st)  # the same posts again: the feed ran dry
+    assert st.empty == SINCE_SCROLL_LIMIT
+    st.exhausted = st.empty >= SINCE_SCROLL_LIMIT
+    assert since.finish("foo", st) is True
+    assert stored_boundary(since) == BOUNDARY + 7
+
+
+def test_known_id_cuts_the_round_and_commits(since):
+    st = scan_state()
+    ids = [str(BOUNDARY + 2), str(BOUNDARY + 1), str(BOUNDARY), str(BOUNDARY - 1)]
+    assert since.scan_round("foo", ids, st) == 2
+    assert st.reached_known
+    assert st.observed == {str(BOUNDARY + 2), str(BOUNDARY + 1)}
+    assert since.finish("foo", st) is True
+    assert stored_boundary(since) == BOUNDARY + 2
+
+
+def test_scan_that_stopped_at_its_target_keeps_the_boundary(since):
+    st = scan_state()
+    since.scan_round("foo", [str(BOUNDARY + 9), str(BOUNDARY)], st)
+    st.at_target = True  # the round's remaining posts were never processed
+    assert since.finish("foo", st) is False
+    assert stored_boundary(since) == BOUNDARY
+
+
+def test_scan_without_term_only_tracks_new_ids(since):
+    st = scan_state()
+    assert since.scan_round("", [str(BOUNDARY - 5)], st) == 1
+    assert not st.reached_known and st.empty == 0
+    assert since.scan_round("", [str(BOUNDARY - 5)], st) == 1
+    assert st.empty == 1
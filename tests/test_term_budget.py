@@ -0,0 +1,29 @@
+"""TermBudget seeding: terms known only from output files must not look faster than timed ones."""
+import json
+
+import term_budget
+from term_budget import TermBudget
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def test_seeded_terms_are_charged_estimated_time(tmp_path):
+    meta, flagged = tmp_path / "metadata.jsonl", tmp_path / "flagged.jsonl"
+    write_jsonl(meta, [{"id": str(i), "search_term": "foo"} for i in range(8)])
+    write_jsonl(flagged, [{"id": str(i), "search_term": "foo"} for i in range(2)])
+    tb = TermBudget("twitter", ["foo"], 10, enabled=True, path=str(tmp_path / "terms.json"),
+                    seed_from=[(str(meta), False), (str(flagged), True)])
+    assert tb.history["foo"]["seconds"] == 10 * term_budget.SEED_SECONDS
+    # 2 flagged in 10 items: the same yield as a timed term collecting at SEED_SECONDS per item
+    timed = (2 + 1.0) / (10 * term_budget.SEED_SECONDS + term_budget.PRIOR_SECONDS)
+    assert tb.mean_yield("foo") == timed
+
+
+def test_untimed_history_from_older_seeding_gets_the_estimate(tmp_path):
+    path = tmp_path / "terms.json"
+    path.write_text(json.dumps({"foo": {"runs": 0, "collected": 5, "scanned": 5, "flagged": 5, "seconds": 0}}))
+    tb = TermBudget("twitter", ["foo"], 10, enabled=True, path=str(path))
+    assert tb.history["foo"]["seconds"] == 5 * term_budget.SEED_SECONDS
+    assert tb.mean_yield("foo") == (5 + 1.0) / (5 * term_budget.SEED_SECONDS + term_budget.PRIOR_SECONDS)
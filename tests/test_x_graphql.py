@@ -0,0 +1,100 @@
+"""x_graphql against the recorded SearchTimeline / HomeTimeline responses in fixtures/x_graphql."""
+import copy, json, os
+
+import pytest
+
+from x_graphql import bottom_cursor, iter_timeline_tweets
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "x_graphql")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def search():
+    return load("search_timeline.json")
+
+
+@pytest.fixture
+def home():
+    return load("home_timeline.json")
+
+
+def test_search_timeline_ids_in_order(search):
+    ids = [t["id"] for t in iter_timeline_tweets(search)]
+    assert ids == ["1829990000000000001", "1829980000000000002", "1829970000000000003", "1829960000000000004"]
+
+
+def test_search_timeline_fields(search):
+    first = next(iter_timeline_tweets(search))
+    assert first["text"] == "Budget session highlights #india #economy"
+    assert first["user"] == "News Desk"
+    assert first["screen_name"] == "newsdesk_in"
+    assert first["author_id"] == "111"
+    assert first["url"] == "https://x.com/newsdesk_in/status/1829990000000000001"
+    assert first["timestamp"] == "2025-08-29T13:40:52.000Z"
+    assert first["lang"] == "en"
+    assert first["hashtags"] == ["india", "economy"]
+    assert first["metrics"]["likes"] == 120
+    assert first["metrics"]["retweets"] == 14
+    assert first["metrics"]["views"] == 1024
+    assert first["media"] == [{"type": "photo", "url": "https://pbs.twimg.com/media/GWxAbCdXcAAexample.jpg",
+                               "video_url": ""}]
+
+
+def test_visibility_wrapper_and_best_video_variant(search):
+    tweets = {t["id"]: t for t in iter_timeline_tweets(search)}
+    clip = tweets["1829980000000000002"]  # TweetWithVisibilityResults
+    assert clip["screen_name"] == "citywatch"
+    assert clip["text"] == "Clip from the rally earlier today"
+    assert clip["media"][0]["type"] == "video"
+    assert clip["media"][0]["video_url"].endswith("/1280x720/high.mp4")
+
+
+def test_note_tweet_text_replaces_truncated_full_text(search):
+    tweets = {t["id"]: t for t in iter_timeline_tweets(search)}
+    assert tweets["1829960000000000004"]["text"] == (
+        "Long thread start... this is the full note tweet text that the legacy full_text "
+        "truncates after 280 characters.")
+
+
+def test_promoted_entries_are_flagged_and_excludable(search):
+    tweets = list(iter_timeline_tweets(search))
+    assert [t["id"] for t in tweets if t["promoted"]] == ["1829970000000000003"]
+    # collect_network drops promoted tweets before the since-boundary check and storage
+    assert "1829970000000000003" not in [t["id"] for t in tweets if not t["promoted"]]
+
+
+def test_promoted_metadata_alone_marks_promoted(search):
+    payload = copy.deepcopy(search)
+    instructions = payload["data"]["search_by_raw_query"]["search_timeline"]["timeline"]["instructions"]
+    entries = [e for ins in instructions for e in ins.get("entries", [])]
+    ad = next(e for e in entries if e["entryId"].startswith("promoted"))
+    ad["entryId"] = "tweet-1829970000000000003"
+    promoted = [t["id"] for t in iter_timeline_tweets(payload) if t["promoted"]]
+    assert promoted == ["1829970000000000003"]
+
+
+def test_search_timeline_bottom_cursor(search):
+    assert bottom_cursor(search) == "DAADDAABCgABGWhIGBAAAQoAAhlnBBBBBBBB"
+
+
+def test_home_timeline_conversation_module(home):
+    tweets = list(iter_timeline_tweets(home))
+    assert [t["id"] for t in tweets] == ["1829950000000000005", "1829940000000000006", "1829940000000000007"]
+    assert [t["screen_name"] for t in tweets] == ["nizzy", "someuser", "replier"]
+    assert tweets[1]["metrics"]["views"] == 15000000
+    assert tweets[2]["text"] == "Replying in thread"
+    assert not any(t["promoted"] for t in tweets)
+
+
+def test_home_timeline_bottom_cursor(home):
+    assert bottom_cursor(home) == "DAABCgABGWgAAAAAAAA"
+
+
+def test_empty_payload():
+    assert list(iter_timeline_tweets({"data": {}})) == []
+    assert bottom_cursor({"data": {}}) == ""
@@ -0,0 +1,232 @@
+"""Download YouTube thumbnails directly instead of screenshotting search results.
+
+A screenshot of each ytd-video-renderer only exists to get a picture of its
+thumbnail, and costs a scroll, a ready wait and a render per video (plus the
+browser loading every thumbnail image). The thumbnail URL follows from the
+video id alone, so with YT_THUMBNAILS=1 youtube_scrape.py hands each scroll
+round's matched videos to a ThumbnailFetcher instead:
+
+  pooled       one requests.Session whose connection pool holds THUMB_WORKERS
+               keep-alive connections; a round's downloads run concurrently
+               on the same number of threads
+  quality      THUMB_QUALITY names are tried in order (a 404, e.g. no
+               maxresdefault for older videos, falls through to the next)
+  cache        THUMB_CACHE_DIR/<id>.jpg plus a <id>.json sidecar (quality,
+               ETag, Last-Modified, fresh-until); both replaced atomically,
+               so concurrent driver_pool workers can share the directory
+  conditional  a cached thumbnail within its Cache-Control max-age (or
+               THUMB_MAX_AGE) is used without a request; an older one is
+               revalidated with If-None-Match / If-Modified-Since and a 304
+               keeps the cached bytes
+
+Each result is hard-linked (copied where links are not supported) to the
+path the screenshot would have had, with a .jpg extension, and that path is
+passed to detect_content(image_path=...). The cache copy is never moved or
+removed by ONLY_FLAGGED handling. THUMB_HOST points the fetcher at another
+server with the same /vi/<id>/<quality>.jpg layout, e.g. a local static
+server for tests and benchmarks (python -m http.server over such a tree).
+
+Env Vars:
+  THUMB_HOST=https://i.ytimg.com  Base URL of the thumbnail server
+  THUMB_QUALITY=hqdefault         Comma separated names tried in order
+  THUMB_WORKERS=8                 Concurrent downloads / pooled connections
+  THUMB_TIMEOUT=10                Seconds per request
+  THUMB_CACHE_DIR=.thumb_cache
+  THUMB_MAX_AGE=                  Seconds a cached thumbnail is used without revalidating
+                                  (default: the response's Cache-Control max-age)
+"""
+from __future__ import annotations
+import os, re, json, time, shutil, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+except Exception:  # pragma: no cover
+    requests = None  # type: ignore
+
+AVAILABLE = requests is not None
+HOST = os.getenv("THUMB_HOST", "https://i.ytimg.com").rstrip("/")
+QUALITIES = [q.strip() for q in os.getenv("THUMB_QUALITY", "hqdefault").split(",") if q.strip()] or ["hqdefault"]
+WORKERS = max(1, int(os.getenv("THUMB_WORKERS", "8")))
+TIMEOUT = float(os.getenv("THUMB_TIMEOUT", "10"))
+CACHE_DIR = os.getenv("THUMB_CACHE_DIR", ".thumb_cache")
+MAX_AGE = os.getenv("THUMB_MAX_AGE", "")
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{6,20}$")
+
+
+def _max_age(headers) -> float:
+    if MAX_AGE:
+        return float(MAX_AGE)
+    m = re.search(r"max-age=(\d+)", headers.get("Cache-Control", "") or "")
+    return float(m.group(1)) if m else 0.0
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _place(src: str, dest: str) -> str:
+    """Hard link (or copy) a cached file to `dest`."""
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    try:
+        os.remove(dest)
+    except OSError:
+        pass
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+    return dest
+
+
+class ThumbnailFetcher:
+    """Concurrent, cached, conditional thumbnail downloads over one pooled HTTP session."""
+
+    def __init__(self, label: str = "YT", host: str = HOST, qualities: Sequence[str] = QUALITIES,
+                 workers: int = WORKERS, cache_dir: str = CACHE_DIR):
+        self.label = label
+        self.host = host.rstrip("/")
+        self.qualities = list(qualities)
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self._session = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {"thumbs": 0, "fresh": 0, "not_modified": 0, "downloaded": 0, "failed": 0,
+                      "requests": 0, "bytes": 0, "seconds": 0.0}
+
+    def url(self, video_id: str, quality: str) -> str:
+        return f"{self.host}/vi/{video_id}/{quality}.jpg"
+
+    def _http(self):
+        if self._session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.workers, max_retries=1)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers["User-Agent"] = USER_AGENT
+            self._session = s
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"thumb-{self.label}")
+        return self._session
+
+    def _count(self, key: str, n: float = 1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _read_meta(self, meta_path: str) -> Dict[str, Any]:
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def fetch(self, video_id: str) -> Optional[str]:
+        """Cached path of the video's thumbnail (downloaded or revalidated as needed), None on failure."""
+        if not _VIDEO_ID.match(video_id or ""):
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        img_path = os.path.join(self.cache_dir, f"{video_id}.jpg")
+        meta_path = os.path.join(self.cache_dir, f"{video_id}.json")
+        meta = self._read_meta(meta_path) if os.path.exists(img_path) else {}
+        if meta and meta.get("host") == self.host and float(meta.get("fresh_until", 0)) > time.time():
+            self._count("fresh")
+            return img_path
+        session = self._http()
+        # A cached quality is revalidated first; the others only when it has gone away
+        order = [meta["quality"]] if meta.get("quality") in self.qualities else []
+        order += [q for q in self.qualities if q not in order]
+        for quality in order:
+            headers = {}
+            if meta and quality == meta.get("quality") and meta.get("host") == self.host:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+            self._count("requests")
+            try:
+                resp = session.get(self.url(video_id, quality), headers=headers, timeout=TIMEOUT)
+            except requests.RequestException as e:
+                print(f"[THUMB] {video_id}: {type(e).__name__}: {e}")
+                break
+            if resp.status_code == 304:
+                meta["fresh_until"] = time.time() + _max_age(resp.headers)
+                _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+                self._count("not_modified")
+                return img_path
+            if resp.status_code == 404:
+                continue
+            if resp.status_code != 200 or not resp.content:
+                print(f"[THUMB] {video_id}: HTTP {resp.status_code} from {self.host}")
+                break
+            _write_atomic(img_path, resp.content)
+            _write_atomic(meta_path, json.dumps({
+                "host": self.host, "quality": quality, "etag": resp.headers.get("ETag", ""),
+                "last_modified": resp.headers.get("Last-Modified", ""),
+                "fresh_until": time.time() + _max_age(resp.headers)}).encode("utf-8"))
+            self._count("downloaded")
+            self._count("bytes", len(resp.content))
+            return img_path
+        self._count("failed")
+        return None
+
+    def _job(self, video_id: str, dest: str) -> Optional[str]:
+        cached = self.fetch(video_id)
+        if cached is None:
+            return None
+        try:
+            return _place(cached, os.path.splitext(dest)[0] + ".jpg")
+        except OSError as e:
+            print(f"[THUMB] Could not write {dest}: {e}")
+            return None
+
+    def fetch_many(self, jobs: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        """Thumbnail for each (video_id, dest) job, placed at dest (.jpg); paths in job order, None on failure."""
+        if not jobs:
+            return []
+        started = time.time()
+        self._http()
+        results = list(self._pool.map(lambda job: self._job(*job), jobs))
+        with self._lock:
+            self.stats["thumbs"] += len(jobs)
+            self.stats["seconds"] += time.time() - started
+        return results
+
+    def report(self):
+        s = self.stats
+        if not s["thumbs"]:
+            return
+        print(f"[THUMB] {self.label} host={self.host} thumbs={s['thumbs']} fresh={s['fresh']} "
+              f"not_modified={s['not_modified']} downloaded={s['downloaded']} failed={s['failed']} "
+              f"requests={s['requests']} KB={s['bytes'] / 1024:.0f} ms/thumb={s['seconds'] * 1000 / s['thumbs']:.0f}")
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Fetch YouTube thumbnails through the cache")
+    ap.add_argument("video_ids", nargs="+")
+    ap.add_argument("--out", default=".", help="Directory the thumbnails are placed in")
+    ap.add_argument("--host", default=HOST)
+    args = ap.parse_args()
+    if not AVAILABLE:
+        raise SystemExit("requests is not installed (pip install requests)")
+    fetcher = ThumbnailFetcher("CLI", host=args.host)
+    for vid, path in zip(args.video_ids, fetcher.fetch_many([(v, os.path.join(args.out, f"{v}.jpg"))
+                                                            for v in args.video_ids])):
+        print(f"{vid}: {path or 'failed'}")
+    fetcher.report()
+    fetcher.close()
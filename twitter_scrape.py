@@ -14,12 +14,37 @@ Environment variables:
   TAG_FILTERS="india,hate" (pre-detection tag filter)
   DEBUG_DETECT=1 enables verbose detection_model prints
   USE_GEMINI=1 enables Gemini fallback (requires GEMINI_API_KEY)
+  TW_CAPTURE=DOM|NETWORK  NETWORK reads SearchTimeline/HomeTimeline GraphQL responses
+                          through CDP instead of rendered tweet cards
+  TW_SHOT_FORMAT=jpeg / TW_SHOT_QUALITY=80  screenshot encoding (see screen_capture.py)
+  TW_SCREENSHOTS=0  store text/metadata only (no card screenshots)
+  TW_RESOURCE_POLICY=none|lean|text  default: text for TRENDING and screenshot-less runs
+                     (no images/media/fonts/trackers), lean (trackers only) otherwise
+  TW_WAIT_FLOOR=0.8  minimum seconds after each scroll; the wait then ends as soon as
+                     new cards render (EVENT_WAIT=0 restores the fixed jitter sleeps)
+  LEAN_PROFILE=1     run on a throwaway copy of a minimal profile template in tmpfs
+                     (see profile_manager.py)
+  SESSION_STORE=1    restore the saved login session (.sessions/twitter.json) and only run
+                     the login form when it no longer validates (see session_store.py)
+  MAX_RECOVERIES=3   rebuild the driver and resume the current term/mode after a Chrome or
+                     chromedriver crash (see supervisor.py)
+  SINCE_INDEX=1      SEARCH remembers the newest status id per term (.seen_index/twitter_since.json)
+                     and later runs add since_id:/since: to the query, stopping at known posts;
+                     TW_SINCE_SCROLL_LIMIT=4 scrolls without any new post (filtered out or
+                     not) end such an incremental search
+  TERM_BUDGET=1      spread TW_POST_TARGET x terms over the terms by flag yield instead of a
+                     fixed quota each (see term_budget.py)
+  PACE=1             adapt the scroll / navigation rate (AIMD on 429s, challenge pages, empty
+                     rounds, slow loads), shared by concurrent runs (see pacer.py)
+  CHECKPOINT_EVERY=25  write .checkpoints/twitter.json every N stored tweets; run with
+                     --resume (or RESUME=1) to continue an interrupted run (see checkpoint.py)
 """
 
 from __future__ import annotations
 import os, sys, time, json, random, hashlib
 from datetime import datetime
-from typing import Dict, Any
+from types import SimpleNamespace
+from typing import Callable, Dict, Any, List, Sequence, Tuple
 from detection_model import detect_content
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -28,6 +53,19 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
+from cdp_capture import NetworkCapture, enable_network_logging
+from x_graphql import TIMELINE_OPERATIONS, iter_timeline_tweets
+from seen_index import SeenIndex, SinceIndex
+from dom_utils import DomPruner, FeedWaiter, TEXT_MATCH_JS, FilterStats, compile_text_filter, text_matches
+from screen_capture import BatchCapture
+from resource_policy import resolve_policy, configure_options, apply_policy, PageStats
+from browser_service import note_pages
+from session_store import SessionStore
+from profile_manager import automation_profile
+from supervisor import DriverSupervisor, loop_state
+from checkpoint import Checkpoint, resume_scroll
+from term_budget import TermBudget
+from pacer import Pacer
 
 # === Config ===
 OUT_DIR = os.environ.get("TW_OUT_DIR", "twitter_posts")
@@ -35,6 +73,7 @@ TARGET_COUNT = int(os.environ.get("TW_POST_TARGET", "30"))
 SCROLL_PAUSE = float(os.environ.get("TW_SCROLL_PAUSE", "1.4"))
 JITTER_MIN = float(os.environ.get("TW_JITTER_MIN", "1.8"))
 JITTER_MAX = float(os.environ.get("TW_JITTER_MAX", "3.8"))
+WAIT_FLOOR = float(os.environ.get("TW_WAIT_FLOOR", "0.8"))
 HEADLESS = os.environ.get("HEADLESS", "").lower() in {"1","true","yes"}
 ATTACH = os.environ.get("ATTACH_EXISTING", "").lower() in {"1","true","yes"}
 ENV_USER = "TWITTER_USERNAME"
@@ -51,8 +90,12 @@ TAG_FILTERS = [t.strip().lower() for t in os.environ.get("TAG_FILTERS", "").spli
 FLAGGED_DIR = os.environ.get("FLAGGED_DIR", os.path.join(OUT_DIR, "flagged"))
 FLAGGED_META_PATH = os.environ.get("FLAGGED_META_PATH", os.path.join(FLAGGED_DIR, "flagged_metadata.jsonl"))
 SEARCH_SCROLL_LIMIT = int(os.environ.get("TW_SEARCH_SCROLL_LIMIT", "45"))
+# A since_id: search only holds posts newer than the last run, so its end comes quickly
+SINCE_SCROLL_LIMIT = int(os.environ.get("TW_SINCE_SCROLL_LIMIT", "4"))
 SEARCH_VIA = os.environ.get("TW_SEARCH_VIA", "AUTO").upper()  # EXPLORE | DIRECT | AUTO
 RELAX_AFTER_EMPTY = int(os.environ.get("TW_RELAX_AFTER_EMPTY", "6"))  # scroll rounds with no new before relaxing term match
+CAPTURE_MODE = os.environ.get("TW_CAPTURE", "DOM").upper()  # DOM | NETWORK
+SCREENSHOTS = os.environ.get("TW_SCREENSHOTS", "1").lower() in {"1","true","yes"}
 
 # Escalate to SEARCH if search terms provided but user MODE not SEARCH
 if SEARCH_TERMS and MODE != "SEARCH":
@@ -62,6 +105,15 @@ if SEARCH_TERMS and MODE != "SEARCH":
 os.makedirs(OUT_DIR, exist_ok=True)
 os.makedirs(FLAGGED_DIR, exist_ok=True)
 META_PATH = os.path.join(OUT_DIR, "metadata.jsonl")
+# Status ids processed in earlier runs (see seen_index.py); TRENDING topics are not recorded.
+SEEN_INDEX = SeenIndex("twitter")
+# Newest status id per search term from earlier runs: incremental search (see seen_index.py)
+SINCE = SinceIndex("twitter")
+# Progress of this run, for --resume after an interruption (see checkpoint.py)
+CKPT = Checkpoint("twitter", [META_PATH, FLAGGED_META_PATH])
+SESSION = SessionStore("twitter")
+NEW_CARD_SELECTOR = 'article[data-testid="tweet"]:not([data-seen])'
+SHOT_WAIT = FeedWaiter("TW:screenshots", "", WAIT_FLOOR, 0.8)
 
 def _print_config_summary():
     try:
@@ -71,6 +123,7 @@ def _print_config_summary():
               "FILTER_TERMS=", FILTER_TERMS,
               "TAG_FILTERS=", TAG_FILTERS,
               "SEARCH_VIA=", SEARCH_VIA,
+              "CAPTURE=", CAPTURE_MODE,
               "HEADLESS=", HEADLESS,
               "ATTACH=", ATTACH)
     except Exception as e:
@@ -104,13 +157,18 @@ def interactive_setup():
     except (EOFError, KeyboardInterrupt):
         pass
 
+def mode_resource_policy() -> str:
+    """Nothing visual is needed for trending topics or screenshot-less runs."""
+    default = "text" if MODE == "TRENDING" or not SCREENSHOTS else "lean"
+    return resolve_policy(default, "TW")
+
 def build_driver():
+    policy = mode_resource_policy()
     options = Options()
     if ATTACH:
         options.debugger_address = os.environ.get("DEBUG_ADDRESS", "127.0.0.1:9222")
     else:
-        automation_dir = os.environ.get("CHROME_AUTOMATION_DIR", os.path.join(os.getcwd(), "chrome_automation_profile"))
-        os.makedirs(automation_dir, exist_ok=True)
+        automation_dir = automation_profile("twitter")
         options.add_argument(f"--user-data-dir={automation_dir}")
         options.add_argument("--profile-directory=Default")
         options.add_argument("--disable-blink-features=AutomationControlled")
@@ -119,9 +177,14 @@ def build_driver():
         options.add_experimental_option('excludeSwitches', ['enable-logging'])
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
+    if CAPTURE_MODE == "NETWORK":
+        enable_network_logging(options)
+    configure_options(options, policy, attach=ATTACH)
     driver = webdriver.Chrome(options=options)
     try: driver.maximize_window()
     except Exception: pass
+    apply_policy(driver, policy)
+    NET_STATS.policy = policy
     return driver
 
 def login(driver):
@@ -149,52 +212,128 @@ def login(driver):
     except TimeoutException:
         print("[LOGIN] Primary column not confirmed")
 
-def post_identity(card):
-    try:
-        tid = card.get_attribute('data-testid') or ''
-        outer = card.get_attribute('outerHTML') or ''
-        return hashlib.sha1((tid[:40] + outer[:400]).encode()).hexdigest()
-    except WebDriverException:
-        return str(id(card))
+# One execute_script per scroll round: every new tweet card's identity, text, user,
+# timestamp, status URL and bounding rect as a JSON array. Cards are stamped with
+# data-scrape-key so the WebElement can be re-found only when a screenshot is needed,
+# and with data-seen so later rounds only look at cards not returned before.
+# arguments: filter groups (compile_text_filter), search term required in the text ('' = none).
+# Only matching cards cross the WebDriver boundary; rejected ones are just counted.
+CARD_EXTRACT_JS = TEXT_MATCH_JS + r"""
+const groups = arguments[0] || [], term = (arguments[1] || '').toLowerCase();
+const out = [], ids = [];
+let rejected = 0, termRejected = 0;
+let seq = Number(document.body.dataset.scrapeSeq || 0);
+for (const card of document.querySelectorAll('article[data-testid="tweet"]:not([data-seen])')) {
+  if (!card.dataset.scrapeKey) card.dataset.scrapeKey = String(++seq);
+  card.dataset.seen = '1';
+  const timeEl = card.querySelector('time');
+  const link = (timeEl && timeEl.closest('a[href*="/status/"]')) || card.querySelector('a[href*="/status/"]');
+  const href = link ? link.href.split('?')[0] : '';
+  const m = href.match(/\/status\/(\d+)/);
+  // Ads carry old status ids: flagged so incremental searches do not stop on them
+  const promoted = !!card.closest('[data-testid="placementTracking"]')
+    || [...card.querySelectorAll('span')].some(s => s.childElementCount === 0 && /^(Ad|Promoted)$/.test(s.textContent.trim()));
+  // Every organic card's id, rejected below or not: a round of filtered-out posts is not an empty feed
+  if (m && !promoted) ids.push(m[1]);
+  const textEl = card.querySelector('div[data-testid="tweetText"]');
+  const text = textEl ? textEl.innerText.trim() : '';
+  if (term && !text.toLowerCase().includes(term)) { termRejected++; continue; }
+  if (!__textMatch(text, groups)) { rejected++; continue; }
+  const userEl = card.querySelector('div[data-testid="User-Name"] span');
+  const r = card.getBoundingClientRect();
+  out.push({
+    key: card.dataset.scrapeKey,
+    status_id: m ? m[1] : '',
+    text: text,
+    user: userEl ? userEl.innerText : '',
+    timestamp: timeEl ? (timeEl.getAttribute('datetime') || '') : '',
+    url: href,
+    promoted: promoted,
+    rect: {x: r.x, y: r.y, width: r.width, height: r.height}
+  });
+}
+document.body.dataset.scrapeSeq = String(seq);
+return JSON.stringify({cards: out, rejected: rejected, term_rejected: termRejected, ids: ids});
+"""
 
-def extract_post(card) -> Dict[str, Any]:
-    data: Dict[str, Any] = {}
-    # text
+def read_cards(driver, groups: List[List[str]], term: str = '') -> Dict[str, Any]:
+    """CARD_EXTRACT_JS result for the cards not returned in an earlier round, in a single WebDriver
+    round trip: matching `cards`, `rejected` / `term_rejected` counts and the status `ids` of every
+    organic card (rejected ones included), in feed order."""
     try:
-        parts = card.find_elements(By.XPATH, ".//div[@data-testid='tweetText']//span")
-        data['text'] = " ".join(p.text for p in parts).strip()
-    except Exception:
-        data['text'] = ''
-    # user
-    try:
-        data['user'] = card.find_element(By.XPATH, ".//div[@data-testid='User-Name']//span").text
-    except Exception:
-        data['user'] = ''
-    # time
-    try:
-        data['timestamp'] = card.find_element(By.XPATH, ".//time").get_attribute("datetime")
-    except Exception:
-        data['timestamp'] = ''
-    return data
+        return json.loads(driver.execute_script(CARD_EXTRACT_JS, groups, term) or '{}')
+    except (WebDriverException, ValueError) as e:
+        print(f"[EXTRACT] Card script failed: {e}")
+        return {}
+
+def visible_cards(driver, groups: List[List[str]], term: str = '') -> Tuple[List[Dict[str, Any]], int, int]:
+    """Matching tweet cards not returned in an earlier round, extracted in a single WebDriver round trip.
+    The filter groups (and `term`, if given) are evaluated in the page; returns
+    (cards, rejected_by_filters, rejected_by_term).
+    """
+    res = read_cards(driver, groups, term)
+    return res.get('cards', []), int(res.get('rejected', 0)), int(res.get('term_rejected', 0))
 
-def save_post_screenshot(driver, card, idx, pid):
-    path = os.path.join(OUT_DIR, f"post_{idx:03d}_{pid[:8]}.png")
+def card_elements(driver, infos: List[Dict[str, Any]]) -> List[Any]:
+    """WebElements of cards returned by visible_cards, in one round trip (None if virtualized away)."""
+    if not infos:
+        return []
     try:
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", card)
-        time.sleep(random.uniform(0.3,0.8))
-        card.screenshot(path)
-    except Exception:
-        driver.save_screenshot(path)
-    return path
-
-def tagged_match(text: str) -> bool:
-    if not TAG_FILTERS:
-        return True
-    low = (text or '').lower()
-    return any(tag in low or f"#{tag}" in low for tag in TAG_FILTERS)
+        return driver.execute_script(
+            "return arguments[0].map(k => document.querySelector(`article[data-scrape-key=\"${k}\"]`));",
+            [i.get('key', '') for i in infos]) or [None] * len(infos)
+    except WebDriverException:
+        return [None] * len(infos)
+
+def post_identity(info: Dict[str, Any]) -> str:
+    if info.get('status_id'):
+        return info['status_id']
+    basis = f"{info.get('user','')}|{info.get('timestamp','')}|{info.get('text','')}"
+    return hashlib.sha1(basis.encode()).hexdigest()
+
+def extract_post(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'text': info.get('text', ''),
+        'user': info.get('user', ''),
+        'timestamp': info.get('timestamp', ''),
+        'url': info.get('url', ''),
+    }
+
+def post_shot_path(idx: int, pid: str) -> str:
+    return os.path.join(OUT_DIR, f"post_{idx:03d}_{pid[-8:]}.png")
+
+def _shots_ready(driver, elements):
+    SHOT_WAIT.wait_ready(driver, elements, baseline=sum(random.uniform(0.3,0.8) for _ in elements), timeout=0.8)
 
-def jitter_sleep():
-    time.sleep(SCROLL_PAUSE + random.uniform(JITTER_MIN, JITTER_MAX))
+# One viewport screenshot per scroll position, cards cropped from it (see screen_capture.py)
+SHOTS = BatchCapture("TW", ready=_shots_ready, platform="TW")
+# Bandwidth / page-load totals from the Performance API (see resource_policy.py)
+NET_STATS = PageStats("TW", "none")
+
+def capture_posts(driver, pending: List[Dict[str, Any]], elements: List[Any]) -> List[str | None]:
+    """Screenshot the cards of a round's pending posts (meta dicts carrying 'id' and 'index')."""
+    if not SCREENSHOTS:
+        return [None] * len(pending)
+    return SHOTS.capture(driver, [(el, post_shot_path(m['index'], m['id'])) for m, el in zip(pending, elements)])
+
+def card_filter() -> List[List[str]]:
+    """FILTER_TERMS (any) AND TAG_FILTERS (any); compiled once per collection loop."""
+    return compile_text_filter(FILTER_TERMS, TAG_FILTERS)
+
+# Shared AIMD pace of scrolls / navigations across concurrent Twitter runs (see pacer.py)
+PACER = Pacer("twitter", SCROLL_PAUSE + JITTER_MIN)
+
+def jitter_baseline() -> float:
+    return SCROLL_PAUSE + random.uniform(JITTER_MIN, JITTER_MAX)
+
+def feed_waiter(label: str, selector: str = NEW_CARD_SELECTOR) -> FeedWaiter:
+    """Post-scroll wait: at least WAIT_FLOOR, done once new cards render, at most the old worst-case jitter."""
+    return FeedWaiter(label, selector, WAIT_FLOOR, SCROLL_PAUSE + JITTER_MAX)
+
+def report_rate(label: str, stored: int, parsed: int, started: float):
+    elapsed = max(time.time() - started, 1e-6)
+    print(f"[RATE] {label} path={CAPTURE_MODE} stored={stored} parsed={parsed} elapsed={elapsed:.1f}s "
+          f"tweets/s={parsed / elapsed:.2f} stored/s={stored / elapsed:.2f}")
 
 def save_tweet(meta: Dict[str, Any], shot_path: str | None, flagged: bool):
     only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
@@ -227,9 +366,13 @@ def save_tweet(meta: Dict[str, Any], shot_path: str | None, flagged: bool):
             except Exception: pass
         return False
 
+def search_query(term: str) -> str:
+    """The term plus since_id:/since: operators when an earlier run already covered it."""
+    return term + SINCE.operators(term)
+
 def _direct_search_url(term: str) -> str:
     from urllib.parse import quote
-    enc = quote(term)
+    enc = quote(search_query(term))
     # live (latest) results; change &f=live to remove for Top
     return f"https://x.com/search?q={enc}&src=typed_query&f=live"
 
@@ -271,7 +414,7 @@ def open_explore_and_search(driver, wait, term: str) -> bool:
             # After initial enter, optionally refine URL to include src=recent_search_click
             time.sleep(1.2)
             from urllib.parse import quote
-            enc = quote(term)
+            enc = quote(search_query(term))
             # Preserve whether we want live or top: use f=live if current page didn't redirect automatically
             suffix = '&f=live' if 'f=live' in driver.current_url or os.environ.get('TW_FORCE_LIVE','1') in {'1','true','yes'} else ''
             target_url = f"https://x.com/search?q={enc}&src=recent_search_click{suffix}"
@@ -310,73 +453,263 @@ def open_explore_and_search(driver, wait, term: str) -> bool:
     print("[SEARCH] Falling back to direct URL...")
     return do_direct()
 
-def collect_search_results(driver, term: str, target: int):
-    seen = set(); collected = 0; empty = 0; skipped_due_to_term = 0; relaxed = False
+def search_scroll_limit(term: str) -> int:
+    """Rounds without new status ids before a term is given up: short when resuming from a since_id."""
+    return SINCE_SCROLL_LIMIT if term and SINCE.since_id(term) is not None else SEARCH_SCROLL_LIMIT
+
+def search_state(st=None) -> SimpleNamespace:
+    """Per-term search counters (see collect_search_results), shared by the Selenium and CDP engines."""
+    return loop_state(st, seen=set(), observed=set(), collected=0, empty=0, unproductive=0, skipped_due_to_term=0,
+                      relaxed=False, reached_known=False, scanned=0, flagged=0)
+
+def search_active(st: SimpleNamespace, target: int, scroll_limit: int) -> bool:
+    return (st.collected < target and st.empty < scroll_limit and st.unproductive < SEARCH_SCROLL_LIMIT
+            and not st.reached_known)
+
+def search_round_cards(term: str, res: Dict[str, Any], st: SimpleNamespace, target: int,
+                       filter_stats: FilterStats, only_flagged: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """One round of CARD_EXTRACT_JS output -> (metas, cards) still to capture and store.
+    Applies the skip rules (ads, since boundary, seen, checkpoint, seen index) and the target cut."""
+    cards, rejected, term_rejected = res.get('cards', []), int(res.get('rejected', 0)), int(res.get('term_rejected', 0))
+    st.skipped_due_to_term += term_rejected
+    filter_stats.round(rejected + term_rejected, len(cards))
+    # Boundary and "feed ran dry" bookkeeping over every organic card, filtered out or not
+    ids = res.get('ids', [])
+    in_scan = set(ids[:SINCE.scan_round(term, ids, st)])
+    pending, infos = [], []
+    for info in cards:
+        if info.get('promoted'):
+            continue  # ads, as in the NETWORK path; their old ids would end the scan at the first one
+        pid = post_identity(info)
+        if st.reached_known and pid not in in_scan:
+            continue  # at or after the first post an earlier run already covered
+        if pid in st.seen: continue
+        st.seen.add(pid)
+        if CKPT.written(pid):
+            st.collected += 1; continue  # stored by the interrupted run after its last checkpoint
+        if SEEN_INDEX.seen_before(pid): continue
+        meta = extract_post(info)
+        meta.update({
+            'id': pid,
+            'mode': 'SEARCH',
+            'search_term': term,
+            'index': st.collected + len(pending),
+            'captured_at': datetime.utcnow().isoformat()
+        })
+        pending.append(meta); infos.append(info)
+        if not only_flagged and st.collected + len(pending) >= target: break
+    return pending, infos
+
+def store_search_round(label: str, pending: List[Dict[str, Any]], shots: Sequence[str | None],
+                       detect: Callable[[Dict[str, Any], str | None], Tuple[bool, str, float]],
+                       st: SimpleNamespace, target: int, driver=None) -> int:
+    """Detect and store a round's posts; returns how many were stored.
+    `driver` (Selenium only) lets checkpoints record the scroll position."""
+    new_round = 0
+    for meta, shot in zip(pending, shots):
+        meta['index'] = st.collected
+        meta['screenshot'] = shot
+        flag, reason, score = detect(meta, shot)
+        SEEN_INDEX.add(meta['id'])
+        st.scanned += 1
+        if flag:
+            meta['flag_reason'] = reason; meta['flag_score'] = score
+            st.flagged += 1
+        if save_tweet(meta, shot, flagged=flag):
+            st.collected += 1; new_round += 1
+            print(f"[{label}] {st.collected}/{target} {'FLAG' if flag else 'OK'} {reason if flag else ''}")
+            CKPT.tick(driver, st)
+        if st.collected >= target: break
+    return new_round
+
+def end_search_round(label: str, st: SimpleNamespace, new_round: int):
+    if new_round == 0:
+        st.unproductive += 1
+        # Relax condition if too many scrolls without collecting
+        if not st.relaxed and st.unproductive >= RELAX_AFTER_EMPTY and st.collected == 0:
+            st.relaxed = True
+            print(f"[{label}] Relaxing term presence requirement after {st.unproductive} unproductive rounds (skipped {st.skipped_due_to_term} tweets)")
+    else:
+        st.unproductive = 0
+
+def search_outcome(st: SimpleNamespace, target: int, scroll_limit: int):
+    """What SINCE.finish needs to know about how the term's loop ended."""
+    st.exhausted = st.empty >= scroll_limit  # no new status ids at all for scroll_limit rounds
+    st.at_target = st.collected >= target
+
+def collect_search_results(driver, term: str, target: int, st=None):
+    """Collect matching results for one term. Counters and the seen set live on `st`
+    (DriverSupervisor.state), so a re-run after a driver crash continues the term.
+    The round itself is search_round_cards / store_search_round, also used by cdp_engine."""
+    started = time.time()
+    label = f"SEARCH:{term}"
+    prune = DomPruner(label, 'article[data-testid="tweet"][data-seen]')
+    waiter = feed_waiter(label)
+    st = search_state(st)
+    resume_scroll(driver, st)
+    only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
+    groups = card_filter()
+    filter_stats = FilterStats(label)
+    base_term = term.lower().lstrip('#')
+    scroll_limit = search_scroll_limit(term)
+    while search_active(st, target, scroll_limit):
+        # Search term presence heuristic (relax after many unproductive scrolls), checked in the page
+        res = read_cards(driver, groups, '' if st.relaxed else base_term)
+        pending, infos = search_round_cards(term, res, st, target, filter_stats, only_flagged)
+        shots = capture_posts(driver, pending, card_elements(driver, infos))
+        new_round = store_search_round(label, pending, shots,
+                                       lambda meta, shot: detect_content(meta.get('text', ''), image_path=shot),
+                                       st, target, driver)
+        end_search_round(label, st, new_round)
+        if st.collected >= target: break
+        if st.reached_known:
+            print(f"[{label}] Reached posts from the previous run; stopping")
+            break
+        PACER.step(driver, new_round)
+        prune(driver)
+        driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
+        waiter.wait_new(driver, jitter_baseline())
+    search_outcome(st, target, scroll_limit)
+    print(f"[{label}] Done collected={st.collected} empty_scrolls={st.empty} unproductive={st.unproductive}")
+    filter_stats.report()
+    report_rate(label, st.collected, len(st.seen), started)
+    waiter.report()
+    return st.collected
+
+def status_element(driver, status_id: str):
+    """Rendered card for a status id, if React has rendered it yet."""
+    try:
+        return driver.find_element(By.CSS_SELECTOR, f'article[data-testid="tweet"]:has(a[href*="/status/{status_id}"])')
+    except WebDriverException:
+        return None
+
+def collect_network(driver, capture: NetworkCapture, mode: str, target: int, term: str = '', st=None):
+    """NETWORK capture path: complete tweets from GraphQL timeline pages as they arrive.
+    Scrolling only serves to trigger the next page request; nothing waits for rendering.
+    """
+    label = f"{mode}:{term}" if term else mode
+    started = time.time()
+    # Nothing is read from the DOM here, so every card far above the viewport can be collapsed
+    prune = DomPruner(label, 'article[data-testid="tweet"]')
+    st = loop_state(st, seen=set(), observed=set(), collected=0, empty=0, unproductive=0, reached_known=False,
+                    scanned=0, flagged=0)
+    seen = st.seen
+    resume_scroll(driver, st)  # re-requests the timeline pages up to the checkpointed position
     only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
-    while collected < target and empty < SEARCH_SCROLL_LIMIT:
-        cards = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+    groups = card_filter()  # tweets already arrive as data here, so the filter runs in Python
+    scroll_limit = search_scroll_limit(term)
+    while search_active(st, target, scroll_limit):
+        pages = capture.wait(timeout=SCROLL_PAUSE + JITTER_MAX, min_wait=SCROLL_PAUSE)
         new_round = 0
-        for c in cards:
-            pid = post_identity(c)
-            if pid in seen: continue
-            seen.add(pid)
-            meta = extract_post(c)
-            txt = meta.get('text','')
-            # Search term presence heuristic (relax after many empty scrolls)
-            base_term = term.lower().lstrip('#')
-            if not relaxed and base_term not in txt.lower():
-                skipped_due_to_term += 1
+        pending = []
+        tweets = [tw for _url, payload in pages for tw in iter_timeline_tweets(payload)]
+        # Boundary and "feed ran dry" bookkeeping over every organic tweet, filtered out or not
+        ids = [tw['id'] for tw in tweets if not tw['promoted']]
+        in_scan = set(ids[:SINCE.scan_round(term, ids, st)])
+        for tw in tweets:
+            if tw['promoted'] or tw['id'] in seen:
                 continue
-            if FILTER_TERMS and not any(ft in txt.lower() for ft in FILTER_TERMS):
+            if st.reached_known and tw['id'] not in in_scan:
+                continue  # newest-first: covered by an earlier run
+            seen.add(tw['id'])
+            if CKPT.written(tw['id']):
+                st.collected += 1  # stored by the interrupted run after its last checkpoint
                 continue
-            if not tagged_match(txt):
+            if SEEN_INDEX.seen_before(tw['id']):
                 continue
-            meta.update({
-                'id': pid,
-                'mode': 'SEARCH',
-                'search_term': term,
-                'index': collected,
-                'captured_at': datetime.utcnow().isoformat()
-            })
-            shot = save_post_screenshot(driver, c, collected, pid)
+            if not text_matches(tw['text'], groups):
+                continue
+            meta = {k: v for k, v in tw.items() if k != 'promoted'}
+            meta.update({'mode': mode, 'index': st.collected + len(pending), 'captured_at': datetime.utcnow().isoformat()})
+            if term:
+                meta['search_term'] = term
+            pending.append(meta)
+            if not only_flagged and st.collected + len(pending) >= target:
+                break
+        # Screenshot only tweets React has already rendered; the rest are stored from data alone
+        elements = [status_element(driver, m['id']) for m in pending]
+        rendered = [(m, el) for m, el in zip(pending, elements) if el is not None]
+        shots = dict(zip((m['id'] for m, _ in rendered),
+                         capture_posts(driver, [m for m, _ in rendered], [el for _, el in rendered])))
+        for meta in pending:
+            if st.collected >= target:
+                break
+            shot = shots.get(meta['id'])
+            meta['index'] = st.collected
             meta['screenshot'] = shot
-            flag, reason, score = detect_content(txt, image_path=shot)
+            flag, reason, score = detect_content(meta['text'], image_path=shot)
+            SEEN_INDEX.add(meta['id'])
+            st.scanned += 1
             if flag:
                 meta['flag_reason'] = reason; meta['flag_score'] = score
-            stored = save_tweet(meta, shot, flagged=flag)
-            if stored:
-                collected += 1; new_round += 1
-                print(f"[SEARCH:{term}] {collected}/{target} {'FLAG' if flag else 'OK'} {reason if flag else ''}")
-            if collected >= target: break
-        if new_round == 0:
-            empty += 1
-            # Relax condition if too many empty scrolls without collecting
-            if not relaxed and empty >= RELAX_AFTER_EMPTY and collected == 0:
-                relaxed = True
-                print(f"[SEARCH:{term}] Relaxing term presence requirement after {empty} empty rounds (skipped {skipped_due_to_term} tweets)")
-        else:
-            empty = 0
-        if collected >= target: break
+                st.flagged += 1
+            if save_tweet(meta, shot, flagged=flag):
+                st.collected += 1; new_round += 1
+                print(f"[{label}] {st.collected}/{target} {'FLAG' if flag else 'OK'} {reason if flag else ''}")
+                CKPT.tick(driver, st)
+        st.unproductive = 0 if new_round else st.unproductive + 1
+        if st.collected >= target:
+            break
+        if st.reached_known:
+            print(f"[{label}] Reached posts from the previous run; stopping")
+            break
+        PACER.step(driver, new_round)
+        prune(driver)
         driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-        jitter_sleep()
-    print(f"[SEARCH:{term}] Done collected={collected} empty_scrolls={empty}")
+    search_outcome(st, target, scroll_limit)
+    report_rate(label, st.collected, len(seen), started)
+    return st.collected
+
+def search_term(driver, term: str, capture: NetworkCapture | None = None, st=None, target: int = 0) -> int:
+    """Open one search term and collect it; the unit re-run by the supervisor after a crash."""
+    if capture:
+        list(capture.poll())  # drop responses belonging to the previous term
+    PACER.pace(navigation=True)
+    if not open_explore_and_search(driver, WebDriverWait(driver, 20), term):
+        print(f"[SEARCH] Navigation failed for '{term}', skipping")
+        return 0
+    target = target or TARGET_COUNT
+    st = loop_state(st, reached_known=False, exhausted=False, at_target=False)
+    if capture:
+        collected = collect_network(driver, capture, 'SEARCH', target, term, st)
+    else:
+        collected = collect_search_results(driver, term, target, st)
+    SINCE.finish(term, st)  # moves the boundary only when everything newer than it was scanned
+    NET_STATS.sample(driver)
     return collected
 
-def run_search_mode(driver):
+def run_search_mode(sup: DriverSupervisor):
     if not SEARCH_TERMS:
         print("[SEARCH] No terms provided (TW_SEARCH_TERMS)")
         return
-    wait = WebDriverWait(driver, 20)
     total = 0
+    # TARGET_COUNT per term, or the same total spread by flag yield with TERM_BUDGET=1 (see term_budget.py)
+    budget = TermBudget("twitter", SEARCH_TERMS, TARGET_COUNT,
+                        seed_from=[(META_PATH, False), (FLAGGED_META_PATH, True)])
     for term in SEARCH_TERMS:
         print(f"[SEARCH] Starting term '{term}' via {SEARCH_VIA}")
-        if not open_explore_and_search(driver, wait, term):
-            print(f"[SEARCH] Navigation failed for '{term}', skipping")
+        st = loop_state(sup.state(f"SEARCH:{term}"), collected=0, scanned=0, flagged=0, seconds=0.0)
+        if not hasattr(st, 'quota'):
+            st.quota = budget.quota(term)
+        budget.quotas[term] = st.quota  # a resumed term keeps the quota it started with
+        if getattr(st, 'done', False):
+            print(f"[SEARCH] '{term}' finished before the interruption ({st.collected} collected); skipping")
+            total += st.collected
+            budget.record(term, st.collected, st.scanned, st.flagged, st.seconds)
             continue
-        total += collect_search_results(driver, term, TARGET_COUNT)
+        started = time.time()
+        try:
+            total += sup.run(lambda d: search_term(d, term, sup.context, st, st.quota), where=f"SEARCH:{term}")
+        finally:
+            st.seconds += time.time() - started
+        budget.record(term, st.collected, st.scanned, st.flagged, st.seconds)
+        CKPT.done(st)
     print(f"[SEARCH] Total collected across terms: {total}")
+    budget.report()
+    budget.save()
 
-def run_trending(driver):
+def run_trending(driver, st=None):
+    PACER.pace(navigation=True)
     driver.get(TRENDING_URL)
     wait = WebDriverWait(driver, 20)
     try:
@@ -384,8 +717,11 @@ def run_trending(driver):
     except TimeoutException:
         print("[TRENDING] No trend container found")
         return
-    seen=set(); collected=0; rounds=0
-    while collected < TARGET_COUNT and rounds < 12:
+    waiter = feed_waiter("TRENDING", "div[data-testid='trend']")
+    st = loop_state(st, seen=set(), collected=0, rounds=0)
+    seen = st.seen
+    while st.collected < TARGET_COUNT and st.rounds < 12:
+        before = st.collected
         cards = driver.find_elements(By.CSS_SELECTOR, "div[data-testid='trend']")
         for card in cards:
             try:
@@ -395,71 +731,111 @@ def run_trending(driver):
                 if topic in seen: continue
                 seen.add(topic)
                 pid = hashlib.sha1(topic.encode()).hexdigest()
-                shot = os.path.join(OUT_DIR, f"trend_{collected:03d}_{pid[:8]}.png")
-                try: card.screenshot(shot)
-                except Exception: driver.save_screenshot(shot)
+                if CKPT.written(pid):
+                    st.collected += 1; continue
+                shot = SHOTS.element(driver, card, os.path.join(OUT_DIR, f"trend_{st.collected:03d}_{pid[:8]}.png")) if SCREENSHOTS else None
                 info={
-                    'mode':'TRENDING','topic':topic,'id':pid,'index':collected,
+                    'mode':'TRENDING','topic':topic,'id':pid,'index':st.collected,
                     'screenshot':shot,'captured_at':datetime.utcnow().isoformat()
                 }
                 save_tweet(info, shot, flagged=False)
-                collected+=1
-                print(f"[TREND] {collected}/{TARGET_COUNT} {topic}")
-                if collected>=TARGET_COUNT: break
+                st.collected+=1
+                print(f"[TREND] {st.collected}/{TARGET_COUNT} {topic}")
+                CKPT.tick(driver, st)
+                if st.collected>=TARGET_COUNT: break
             except Exception:
                 continue
-        if collected>=TARGET_COUNT: break
+        if st.collected>=TARGET_COUNT: break
+        PACER.step(driver, st.collected - before)
         driver.execute_script('window.scrollTo(0, document.body.scrollHeight);')
-        jitter_sleep(); rounds+=1
-    print(f"[TRENDING] Collected {collected}")
+        waiter.wait_new(driver, jitter_baseline()); st.rounds+=1
+    print(f"[TRENDING] Collected {st.collected}")
+    waiter.report()
 
-def run_timeline(driver):
+def run_timeline(driver, capture: NetworkCapture | None = None, st=None):
+    PACER.pace(navigation=True)
     driver.get(TIMELINE_URL)
     try:
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-testid='primaryColumn']")))
     except TimeoutException:
         print("[TIMELINE] Primary column not detected")
-    seen=set(); collected=0; stagnant=0; last_height=0
-    while collected < TARGET_COUNT and stagnant < 18:
-        cards = driver.find_elements(By.XPATH, "//article[@data-testid='tweet']")
+    if capture:
+        collected = collect_network(driver, capture, 'TIMELINE', TARGET_COUNT, st=st)
+        print(f"[TIMELINE] Collected {collected}")
+        return
+    started = time.time()
+    prune = DomPruner("TIMELINE", 'article[data-testid="tweet"][data-seen]')
+    waiter = feed_waiter("TIMELINE")
+    st = loop_state(st, seen=set(), collected=0, stagnant=0, last_height=0)
+    seen = st.seen
+    resume_scroll(driver, st)
+    only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
+    groups = card_filter()
+    filter_stats = FilterStats("TIMELINE")
+    while st.collected < TARGET_COUNT and st.stagnant < 18:
+        cards, rejected, _ = visible_cards(driver, groups)
+        filter_stats.round(rejected, len(cards))
         new_round=0
-        for c in cards:
-            pid = post_identity(c)
+        pending, infos = [], []
+        for info in cards:
+            pid = post_identity(info)
             if pid in seen: continue
             seen.add(pid)
-            meta = extract_post(c)
-            txt = meta.get('text','')
-            if FILTER_TERMS and not any(ft in txt.lower() for ft in FILTER_TERMS):
-                continue
-            if not tagged_match(txt):
-                continue
-            meta.update({'id':pid,'mode':'TIMELINE','index':collected,'captured_at':datetime.utcnow().isoformat()})
-            shot = save_post_screenshot(driver, c, collected, pid)
+            if CKPT.written(pid):
+                st.collected += 1; continue  # stored by the interrupted run after its last checkpoint
+            if SEEN_INDEX.seen_before(pid): continue
+            meta = extract_post(info)
+            meta.update({'id':pid,'mode':'TIMELINE','index':st.collected+len(pending),'captured_at':datetime.utcnow().isoformat()})
+            pending.append(meta); infos.append(info)
+            if not only_flagged and st.collected+len(pending) >= TARGET_COUNT: break
+        shots = capture_posts(driver, pending, card_elements(driver, infos))
+        for meta, shot in zip(pending, shots):
+            pid = meta['id']; txt = meta.get('text','')
+            meta['index']=st.collected
             meta['screenshot']=shot
             flag, reason, score = detect_content(txt, image_path=shot)
+            SEEN_INDEX.add(pid)
             if flag:
                 meta['flag_reason']=reason; meta['flag_score']=score
             stored = save_tweet(meta, shot, flagged=flag)
             if stored:
-                collected+=1; new_round+=1
-                print(f"[TIMELINE] {collected}/{TARGET_COUNT} {'FLAG' if flag else 'OK'} {reason if flag else ''}")
-            if collected>=TARGET_COUNT: break
-        if collected>=TARGET_COUNT: break
+                st.collected+=1; new_round+=1
+                print(f"[TIMELINE] {st.collected}/{TARGET_COUNT} {'FLAG' if flag else 'OK'} {reason if flag else ''}")
+                CKPT.tick(driver, st)
+            if st.collected>=TARGET_COUNT: break
+        if st.collected>=TARGET_COUNT: break
+        PACER.step(driver, new_round)
+        prune(driver)
         driver.find_element(By.TAG_NAME,'body').send_keys(Keys.END)
-        jitter_sleep()
+        waiter.wait_new(driver, jitter_baseline())
         new_height = driver.execute_script('return document.body.scrollHeight')
-        if new_round==0: stagnant+=1
-        else: stagnant=0
-        if new_height==last_height: stagnant+=1
-        last_height=new_height
-    print(f"[TIMELINE] Collected {collected}")
+        if new_round==0: st.stagnant+=1
+        else: st.stagnant=0
+        if new_height==st.last_height: st.stagnant+=1
+        st.last_height=new_height
+    print(f"[TIMELINE] Collected {st.collected}")
+    filter_stats.report()
+    report_rate("TIMELINE", st.collected, len(seen), started)
+    waiter.report()
+
+def prepare_driver(driver):
+    """Per-driver setup (also after a crash rebuild): NETWORK capture, then session restore / login."""
+    capture = NetworkCapture(driver, TIMELINE_OPERATIONS) if CAPTURE_MODE == 'NETWORK' else None
+    if not ATTACH and not SESSION.restore(driver):
+        login(driver)
+        SESSION.save_if_valid(driver)
+    return capture
 
 def scrape_posts():
-    interactive_setup()
+    global MODE, TARGET_COUNT
+    if not CKPT.resumed:
+        interactive_setup()
+    MODE = CKPT.setting('mode', MODE)
+    SEARCH_TERMS[:] = CKPT.setting('terms', list(SEARCH_TERMS))
+    TARGET_COUNT = CKPT.setting('target', TARGET_COUNT)
     _print_config_summary()
-    driver = build_driver()
+    sup = DriverSupervisor("TW", build_driver, prepare=prepare_driver, states=CKPT.states)
     try:
-        login(driver)
         # Safety: if search terms exist but MODE not SEARCH (should have been forced earlier)
         if SEARCH_TERMS and MODE != 'SEARCH':
             print('[SEARCH] Detected search terms with non-SEARCH mode; switching to SEARCH')
@@ -467,14 +843,30 @@ def scrape_posts():
         else:
             mode = MODE
         if mode == 'SEARCH':
-            run_search_mode(driver)
+            run_search_mode(sup)
         elif mode == 'TRENDING':
-            run_trending(driver)
+            st = sup.state('TRENDING')
+            sup.run(lambda d: run_trending(d, st), where='TRENDING')
         else:
-            run_timeline(driver)
+            st = sup.state('TIMELINE')
+            sup.run(lambda d: run_timeline(d, sup.context, st), where='TIMELINE')
+        CKPT.complete()
+    except BaseException:
+        CKPT.save()  # interrupted: keep the output offsets current for --resume
+        raise
     finally:
-        try: driver.quit()
-        except Exception: pass
+        driver = sup.driver
+        NET_STATS.sample(driver)
+        NET_STATS.report()
+        PACER.report()
+        note_pages(len(NET_STATS.pages))  # wear accounting for leased service browsers
+        SHOTS.report()
+        SHOT_WAIT.report()
+        SEEN_INDEX.save()
+        if SEEN_INDEX.skipped:
+            print(f"[SEEN] Skipped {SEEN_INDEX.skipped} tweet(s) already processed in earlier runs")
+        sup.report()
+        sup.quit()
 
 if __name__ == '__main__':
     scrape_posts()
@@ -0,0 +1,222 @@
+"""Offline video file analyzer with scene-change keyframe sampling.
+
+Streams frames from local video files (exports, evidence dumps), keeps only
+keyframes where the scene changes, and runs those through the meme detector
+(OCR + optional CLIP via `detect_hate_meme`) and, if enabled, Gemini Vision.
+Files are processed in parallel by a process pool; Gemini calls for a file's
+keyframes are issued in batches of concurrent requests.
+
+Env Vars:
+  VIDEO_OUT_DIR=video_analysis      Keyframes + metadata.jsonl / flagged/flagged_metadata.jsonl
+  VIDEO_SCENE_THRESHOLD=0.35        Histogram distance (0..1) that counts as a scene change
+  VIDEO_MIN_GAP=12                  Minimum frames between two keyframes
+  VIDEO_STRIDE=2                    Analyse every Nth decoded frame for scene changes
+  VIDEO_MAX_KEYFRAMES=40            Upper bound of keyframes per file
+  VIDEO_WORKERS                     Process pool size (default: CPU count)
+  GEMINI_VISION_BATCH=4             Concurrent Gemini Vision requests per batch
+  USE_GEMINI_VISION=1               Send keyframes to Gemini Vision (needs GEMINI_API_KEY)
+
+Dependencies: opencv-python (pip install opencv-python)
+
+CLI:
+  python video_analysis.py clip1.mp4 dump_dir/ [--workers 4] [--no-vision]
+  python detection_model.py --video clip1.mp4 --video clip2.mp4
+"""
+from __future__ import annotations
+import os, json, time, hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Iterator, Tuple, Optional
+
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover
+    cv2 = None  # type: ignore
+
+OUT_DIR = os.getenv("VIDEO_OUT_DIR", "video_analysis")
+SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", "0.35"))
+MIN_GAP = int(os.getenv("VIDEO_MIN_GAP", "12"))
+STRIDE = max(1, int(os.getenv("VIDEO_STRIDE", "2")))
+MAX_KEYFRAMES = int(os.getenv("VIDEO_MAX_KEYFRAMES", "40"))
+VISION_BATCH = max(1, int(os.getenv("GEMINI_VISION_BATCH", "4")))
+USE_GEM_VISION = os.getenv("USE_GEMINI_VISION", "1").lower() in {"1","true","yes"}
+VIDEO_EXTS = {".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v"}
+GEM_FLAGS = {"deepfake","anti_india","dangerous","not_kid_safe"}
+_DEBUG = os.getenv("DEBUG_DETECT", "0").lower() in {"1","true","yes"}
+
+
+def _signature(frame):
+    """Coarse HSV histogram of a downscaled frame, normalised for comparison."""
+    small = cv2.resize(frame, (96, 54), interpolation=cv2.INTER_AREA)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+    cv2.normalize(hist, hist)
+    return hist
+
+
+def iter_keyframes(path: str) -> Iterator[Tuple[int, float, Any, int]]:
+    """Yield (frame_index, timestamp_s, frame, frames_decoded_so_far) for each scene change.
+    The first frame is always a keyframe.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    idx = -1
+    last_sig = None
+    last_key = -MIN_GAP
+    emitted = 0
+    try:
+        while emitted < MAX_KEYFRAMES:
+            if not cap.grab():
+                break
+            idx += 1
+            if idx % STRIDE:
+                continue
+            ok, frame = cap.retrieve()
+            if not ok:
+                continue
+            sig = _signature(frame)
+            if last_sig is None:
+                changed = True
+            else:
+                dist = cv2.compareHist(last_sig, sig, cv2.HISTCMP_BHATTACHARYYA)
+                changed = dist >= SCENE_THRESHOLD and idx - last_key >= MIN_GAP
+            if changed:
+                last_sig = sig
+                last_key = idx
+                emitted += 1
+                yield idx, idx / fps, frame, idx + 1
+        # Drain the rest so decode throughput reflects the whole file.
+        while cap.grab():
+            idx += 1
+    finally:
+        cap.release()
+    yield -1, 0.0, None, idx + 1
+
+
+def _vision_batch(paths: List[str], context: str) -> List[Optional[Dict[str, Any]]]:
+    try:
+        from gemini_vision import classify_image  # type: ignore
+    except Exception:
+        return [None] * len(paths)
+    with ThreadPoolExecutor(max_workers=VISION_BATCH) as ex:
+        return list(ex.map(lambda p: classify_image(p, context), paths))
+
+
+def analyze_file(path: str, use_vision: bool = USE_GEM_VISION) -> Dict[str, Any]:
+    """Decode one file, sample keyframes on scene changes and classify them."""
+    from detection_model import detect_hate_or_anti_india, detect_hate_meme
+    stem = os.path.splitext(os.path.basename(path))[0]
+    fid = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    key_dir = os.path.join(OUT_DIR, "keyframes")
+    os.makedirs(key_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    keyframes: List[Dict[str, Any]] = []
+    decoded = 0
+    for fidx, ts, frame, decoded in iter_keyframes(path):
+        if frame is None:
+            break
+        shot = os.path.join(key_dir, f"{stem}_{fid}_{fidx:06d}.png")
+        cv2.imwrite(shot, frame)
+        keyframes.append({"frame": fidx, "t": round(ts, 3), "screenshot": shot})
+    decode_s = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    for kf in keyframes:
+        flag, reason, score = False, "meme-disabled", 0.0
+        if detect_hate_meme:
+            flag, reason, score = detect_hate_meme(kf["screenshot"], detect_hate_or_anti_india)
+        kf.update({"flagged": flag, "flag_reason": reason if flag else "", "flag_score": score})
+    if use_vision:
+        pending = [kf for kf in keyframes if not kf["flagged"]]
+        for start in range(0, len(pending), VISION_BATCH):
+            batch = pending[start:start + VISION_BATCH]
+            results = _vision_batch([kf["screenshot"] for kf in batch], f"video file {os.path.basename(path)}")
+            for kf, gem in zip(batch, results):
+                if not gem:
+                    continue
+                kf["vision"] = gem
+                reasons = [k for k in GEM_FLAGS if gem.get(k)]
+                if reasons:
+                    kf["flagged"] = True
+                    kf["flag_reason"] = "gemini_vision:" + ",".join(reasons) + (":" + gem.get("reason", "") if gem.get("reason") else "")
+    classify_s = time.perf_counter() - t1
+    return {
+        "file": path,
+        "frames_decoded": decoded,
+        "decode_seconds": round(decode_s, 3),
+        "frames_classified": len(keyframes),
+        "classify_seconds": round(classify_s, 3),
+        "keyframes": keyframes,
+        "analyzed_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def expand_paths(paths: List[str]) -> List[str]:
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, names in os.walk(p):
+                files.extend(os.path.join(root, n) for n in sorted(names) if os.path.splitext(n)[1].lower() in VIDEO_EXTS)
+        elif os.path.isfile(p):
+            files.append(p)
+        else:
+            print(f"[VIDEO][WARN] Not found: {p}")
+    return list(dict.fromkeys(files))
+
+
+def _write_results(res: Dict[str, Any]):
+    flagged_dir = os.path.join(OUT_DIR, "flagged")
+    os.makedirs(flagged_dir, exist_ok=True)
+    with open(os.path.join(OUT_DIR, "metadata.jsonl"), "a", encoding="utf-8") as meta, \
+         open(os.path.join(flagged_dir, "flagged_metadata.jsonl"), "a", encoding="utf-8") as flagged:
+        for kf in res["keyframes"]:
+            rec = {"file": res["file"], "analyzed_at": res["analyzed_at"], **kf}
+            (flagged if kf["flagged"] else meta).write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def analyze_videos(paths: List[str], workers: Optional[int] = None, use_vision: bool = USE_GEM_VISION) -> List[Dict[str, Any]]:
+    """Analyze many files in parallel; prints per-file and aggregate throughput."""
+    if cv2 is None:
+        raise RuntimeError("opencv-python is required for video analysis (pip install opencv-python)")
+    files = expand_paths(paths)
+    if not files:
+        print("[VIDEO] No video files to analyze")
+        return []
+    os.makedirs(OUT_DIR, exist_ok=True)
+    workers = workers or int(os.getenv("VIDEO_WORKERS", "0")) or os.cpu_count() or 1
+    workers = min(workers, len(files))
+    print(f"[VIDEO] Analyzing {len(files)} file(s) with {workers} worker(s) vision={'on' if use_vision else 'off'}")
+    t0 = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futs = {ex.submit(analyze_file, f, use_vision): f for f in files}
+        for fut in as_completed(futs):
+            try:
+                res = fut.result()
+            except Exception as e:
+                print(f"[VIDEO][ERROR] {futs[fut]}: {e}")
+                continue
+            _write_results(res)
+            results.append(res)
+            n_flag = sum(1 for kf in res["keyframes"] if kf["flagged"])
+            dec_rate = res["frames_decoded"] / res["decode_seconds"] if res["decode_seconds"] else 0.0
+            print(f"[VIDEO] {os.path.basename(res['file'])}: decoded={res['frames_decoded']} ({dec_rate:.0f} fps) "
+                  f"keyframes={res['frames_classified']} flagged={n_flag}")
+    wall = time.perf_counter() - t0
+    decoded = sum(r["frames_decoded"] for r in results)
+    classified = sum(r["frames_classified"] for r in results)
+    if wall > 0:
+        print(f"[VIDEO][RATE] wall={wall:.1f}s decoded={decoded} ({decoded / wall:.1f} frames/s) "
+              f"classified={classified} ({classified / wall:.2f} frames/s) ratio=1:{(decoded / classified) if classified else 0:.0f}")
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Scene-change keyframe analysis of local video files")
+    ap.add_argument("paths", nargs="+", help="Video files or directories")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--no-vision", action="store_true", help="Skip Gemini Vision even if enabled")
+    args = ap.parse_args()
+    analyze_videos(args.paths, workers=args.workers or None, use_vision=USE_GEM_VISION and not args.no_vision)
@@ -0,0 +1,163 @@
+"""Parse X (Twitter) GraphQL timeline responses into complete tweet objects.
+
+Handles the SearchTimeline and HomeTimeline (and HomeLatestTimeline) payloads
+captured through cdp_capture.NetworkCapture. Instructions are located
+generically, so both `search_by_raw_query.search_timeline.timeline` and
+`home.home_timeline_urt` shapes work.
+
+Tweet object keys:
+  id, url, text, user, screen_name, author_id, timestamp (ISO, like the DOM
+  <time datetime>), lang, metrics {likes, retweets, replies, quotes,
+  bookmarks, views}, media [{type, url, video_url}], hashtags, quoted_id,
+  promoted
+
+Tests: tests/test_x_graphql.py checks the parser against fixtures/x_graphql/*.json.
+
+CLI (replays recorded responses, e.g. fixtures/x_graphql/*.json):
+  python x_graphql.py fixtures/x_graphql/search_timeline.json [--repeat 200]
+"""
+from __future__ import annotations
+import json
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+
+TIMELINE_OPERATIONS = ["/SearchTimeline", "/HomeTimeline", "/HomeLatestTimeline"]
+
+
+def _find_instructions(obj: Any, depth: int = 0) -> List[Dict[str, Any]]:
+    if depth > 12 or not isinstance(obj, dict):
+        return []
+    if isinstance(obj.get("instructions"), list):
+        return obj["instructions"]
+    for v in obj.values():
+        found = _find_instructions(v, depth + 1)
+        if found:
+            return found
+    return []
+
+
+def _entries(instructions: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for ins in instructions:
+        if isinstance(ins.get("entries"), list):
+            yield from ins["entries"]
+        if isinstance(ins.get("entry"), dict):
+            yield ins["entry"]
+        for item in ins.get("moduleItems", []) or []:
+            yield {"entryId": item.get("entryId", ""), "content": item.get("item", {})}
+
+
+def _item_contents(entry: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    content = entry.get("content", {}) or {}
+    if "itemContent" in content:
+        yield content["itemContent"]
+    for item in content.get("items", []) or []:
+        ic = (item.get("item") or {}).get("itemContent")
+        if ic:
+            yield ic
+
+
+def _unwrap(result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not result:
+        return None
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet") or {}
+    if "legacy" not in result:
+        return None
+    return result
+
+
+def _iso(created_at: str) -> str:
+    try:
+        dt = datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y")
+        return dt.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    except Exception:
+        return created_at or ""
+
+
+def normalize_tweet(result: Dict[str, Any], promoted: bool = False) -> Optional[Dict[str, Any]]:
+    result = _unwrap(result)
+    if not result:
+        return None
+    legacy = result.get("legacy", {})
+    user_res = ((result.get("core") or {}).get("user_results") or {}).get("result") or {}
+    ulegacy = user_res.get("legacy", {}) or {}
+    ucore = user_res.get("core", {}) or {}
+    screen_name = ulegacy.get("screen_name") or ucore.get("screen_name") or ""
+    name = ulegacy.get("name") or ucore.get("name") or ""
+    tid = legacy.get("id_str") or result.get("rest_id") or ""
+    note = (((result.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {}).get("text")
+    media = []
+    for m in ((legacy.get("extended_entities") or legacy.get("entities") or {}).get("media") or []):
+        variants = [v for v in ((m.get("video_info") or {}).get("variants") or []) if v.get("content_type") == "video/mp4"]
+        best = max(variants, key=lambda v: v.get("bitrate", 0)) if variants else None
+        media.append({"type": m.get("type", ""), "url": m.get("media_url_https", ""),
+                      "video_url": best.get("url", "") if best else ""})
+    views = (result.get("views") or {}).get("count")
+    quoted = _unwrap(((result.get("quoted_status_result") or {}).get("result")) or {})
+    return {
+        "id": tid,
+        "url": f"https://x.com/{screen_name or 'i'}/status/{tid}",
+        "text": note or legacy.get("full_text", ""),
+        "user": name,
+        "screen_name": screen_name,
+        "author_id": user_res.get("rest_id", ""),
+        "timestamp": _iso(legacy.get("created_at", "")),
+        "lang": legacy.get("lang", ""),
+        "metrics": {
+            "likes": legacy.get("favorite_count", 0),
+            "retweets": legacy.get("retweet_count", 0),
+            "replies": legacy.get("reply_count", 0),
+            "quotes": legacy.get("quote_count", 0),
+            "bookmarks": legacy.get("bookmark_count", 0),
+            "views": int(views) if str(views or "").isdigit() else None,
+        },
+        "media": media,
+        "hashtags": [h.get("text", "") for h in ((legacy.get("entities") or {}).get("hashtags") or [])],
+        "quoted_id": (quoted or {}).get("rest_id", ""),
+        "promoted": promoted,
+    }
+
+
+def iter_timeline_tweets(payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield normalised tweets from one SearchTimeline / HomeTimeline response body."""
+    for entry in _entries(_find_instructions(payload.get("data", payload))):
+        eid = str(entry.get("entryId", ""))
+        if eid.startswith("cursor-"):
+            continue
+        promoted = eid.startswith("promoted")
+        for ic in _item_contents(entry):
+            tweet = normalize_tweet(((ic.get("tweet_results") or {}).get("result")) or {},
+                                    promoted=promoted or bool(ic.get("promotedMetadata")))
+            if tweet and tweet["id"]:
+                yield tweet
+
+
+def bottom_cursor(payload: Dict[str, Any]) -> str:
+    for entry in _entries(_find_instructions(payload.get("data", payload))):
+        content = entry.get("content", {}) or {}
+        if content.get("cursorType") == "Bottom":
+            return content.get("value", "")
+    return ""
+
+
+if __name__ == "__main__":
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Parse recorded X GraphQL timeline responses")
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--repeat", type=int, default=1, help="Parse N times to measure tweets/sec")
+    args = ap.parse_args()
+    payloads = []
+    for p in args.paths:
+        with open(p, "r", encoding="utf-8") as f:
+            payloads.append(json.load(f))
+    for payload in payloads:
+        for t in iter_timeline_tweets(payload):
+            print(f"{t['id']} @{t['screen_name']} {t['timestamp']} likes={t['metrics']['likes']} "
+                  f"media={len(t['media'])} {t['text'][:70]!r}")
+        print(f"[CURSOR] bottom={bottom_cursor(payload)[:40]}")
+    t0 = time.perf_counter(); n = 0
+    for _ in range(args.repeat):
+        for payload in payloads:
+            n += sum(1 for _ in iter_timeline_tweets(payload))
+    dt = time.perf_counter() - t0
+    print(f"[RATE] parsed {n} tweets in {dt*1000:.1f} ms ({n / dt if dt else 0:.0f} tweets/s)")
@@ -8,6 +8,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
+from seen_index import SeenIndex
+from dom_utils import DomPruner, FeedWaiter, mark_seen, TEXT_MATCH_JS, FilterStats, compile_text_filter, text_matches
+from screen_capture import BatchCapture
+from resource_policy import resolve_policy, configure_options, apply_policy, PageStats
+from browser_service import note_pages
+from profile_manager import automation_profile
+from supervisor import DriverSupervisor, loop_state
+from checkpoint import Checkpoint, resume_scroll
+from term_budget import TermBudget
+from pacer import Pacer
+import thumbnails
+from thumbnails import ThumbnailFetcher
 
 # ================= Config =================
 OUT_DIR = os.environ.get("YT_OUT_DIR", "youtube_videos")
@@ -16,6 +28,8 @@ PER_TERM = int(os.environ.get("YT_PER_TERM", "40"))  # videos per search term
 SCROLL_PAUSE = float(os.environ.get("YT_SCROLL_PAUSE", "1.4"))
 JITTER_MIN = float(os.environ.get("YT_JITTER_MIN", "1.2"))
 JITTER_MAX = float(os.environ.get("YT_JITTER_MAX", "2.8"))
+# Minimum pause after each scroll; the wait then ends once new renderers appear (EVENT_WAIT=0 = fixed sleeps)
+WAIT_FLOOR = float(os.environ.get("YT_WAIT_FLOOR", "0.8"))
 HEADLESS = os.environ.get("HEADLESS", "").lower() in {"1","true","yes"}
 ATTACH = os.environ.get("ATTACH_EXISTING", "").lower() in {"1","true","yes"}
 INCLUDE_SHORTS = os.environ.get("YT_INCLUDE_SHORTS", "0").lower() in {"1","true","yes"}
@@ -23,10 +37,28 @@ STOP_EMPTY_SCROLLS = int(os.environ.get("YT_STOP_EMPTY_SCROLLS", "12"))
 TAG_FILTERS = [t.strip().lower() for t in os.environ.get("TAG_FILTERS", "").split(',') if t.strip()]
 FLAGGED_DIR = os.environ.get("FLAGGED_DIR", os.path.join(OUT_DIR, "flagged"))
 FLAGGED_META_PATH = os.path.join(FLAGGED_DIR, "flagged_metadata.jsonl")
+# DATA: read renderer JSON (element .data / ytInitialData) in one call per scroll.
+# DOM: legacy per-renderer find_element scraping.
+EXTRACT_MODE = os.environ.get("YT_EXTRACT", "DATA").upper()
+# YT_SCREENSHOTS=0 classifies titles only; with DATA extraction the browser then needs no
+# thumbnails, avatars, fonts or previews (YT_RESOURCE_POLICY: none | lean | text)
+SCREENSHOTS = os.environ.get("YT_SCREENSHOTS", "1").lower() in {"1","true","yes"}
+# YT_THUMBNAILS=1 downloads each result's thumbnail by video id (THUMB_HOST, see thumbnails.py)
+# instead of screenshotting its renderer: no scroll / wait / render per video
+THUMBNAILS = os.environ.get("YT_THUMBNAILS", "0").lower() in {"1","true","yes"}
+if THUMBNAILS and not thumbnails.AVAILABLE:
+    print("[THUMB] YT_THUMBNAILS=1 needs requests (pip install requests); using screenshots")
+    THUMBNAILS = False
+RESOURCE_POLICY = resolve_policy("text" if EXTRACT_MODE == "DATA" and (THUMBNAILS or not SCREENSHOTS) else "lean", "YT")
 
 os.makedirs(OUT_DIR, exist_ok=True)
 META_PATH = os.path.join(OUT_DIR, "metadata.jsonl")
 os.makedirs(FLAGGED_DIR, exist_ok=True)
+# Video ids processed in earlier runs (see seen_index.py)
+SEEN_INDEX = SeenIndex("youtube")
+# Progress of this run, for --resume after an interruption (see checkpoint.py)
+CKPT = Checkpoint("youtube", [META_PATH, FLAGGED_META_PATH], id_field="video_id")
+SHOT_WAIT = FeedWaiter("YT:screenshots", "", WAIT_FLOOR, 0.9)
 
 # ================= Console Encoding Safety (Windows) =================
 # Prevent UnicodeEncodeError when printing emoji or non cp1252 chars.
@@ -62,11 +94,7 @@ def build_driver():
     if ATTACH:
         opts.debugger_address = os.environ.get("DEBUG_ADDRESS", "127.0.0.1:9222")
     else:
-        automation_dir = os.environ.get(
-            "CHROME_AUTOMATION_DIR",
-            os.path.join(os.getcwd(), "chrome_automation_profile")
-        )
-        os.makedirs(automation_dir, exist_ok=True)
+        automation_dir = automation_profile("youtube")
         opts.add_argument(f"--user-data-dir={automation_dir}")
         profile_dir = os.environ.get("CHROME_PROFILE_DIR", "Default")
         opts.add_argument(f"--profile-directory={profile_dir}")
@@ -76,17 +104,22 @@ def build_driver():
         opts.add_experimental_option('excludeSwitches', ['enable-logging'])
         opts.add_argument("--no-sandbox")
         opts.add_argument("--disable-dev-shm-usage")
+    configure_options(opts, RESOURCE_POLICY, attach=ATTACH)
     driver = webdriver.Chrome(options=opts)
     try:
         driver.maximize_window()
     except Exception:
         pass
+    apply_policy(driver, RESOURCE_POLICY)
     return driver
 
 # ================= Helpers =================
 
-def jitter_sleep(base: float = 0.0):
-    time.sleep(base + random.uniform(JITTER_MIN, JITTER_MAX))
+# Shared AIMD pace of scrolls / navigations across concurrent YouTube runs (see pacer.py)
+PACER = Pacer("youtube", SCROLL_PAUSE + JITTER_MIN)
+
+def jitter_baseline(base: float = 0.0) -> float:
+    return base + random.uniform(JITTER_MIN, JITTER_MAX)
 
 def prompt_search_terms():
     """Prompt user for search terms if none provided via environment.
@@ -112,6 +145,8 @@ def video_identity(renderer):
             params = urllib.parse.parse_qs(q)
             if 'v' in params:
                 vid = params['v'][0]
+        elif "/shorts/" in href:
+            vid = urllib.parse.urlparse(href).path.split('/shorts/', 1)[1].strip('/')
         if not vid and href:
             # fallback: hash entire href
             vid = hashlib.sha1(href.encode()).hexdigest()[:16]
@@ -153,140 +188,318 @@ def extract_video(renderer):
         data['thumb_alt'] = ''
     return data
 
-def tagged_match(text: str) -> bool:
-    if not TAG_FILTERS:
-        return True  # no filtering configured
-    low = (text or '').lower()
-    return any(tag in low or f"#{tag}" in low for tag in TAG_FILTERS)
+# Polymer keeps each ytd-video-renderer's source JSON (from ytInitialData or a
+# continuation response) on the element's `data` property. One script per scroll
+# round reads and normalises the renderers not returned before (data-seen);
+# ytInitialData is walked as a fallback when the elements don't expose it.
+# arguments: title filter groups (compile_text_filter). Non-matching videos are counted, not returned.
+VIDEO_DATA_JS = TEXT_MATCH_JS + r"""
+const groups = arguments[0] || [];
+let rejected = 0;
+const txt = t => !t ? '' : (t.simpleText || (t.runs || []).map(r => r.text).join(''));
+const pick = (vr, key) => {
+  const nav = vr.navigationEndpoint || {};
+  const web = ((nav.commandMetadata || {}).webCommandMetadata || {});
+  const path = web.url || ('/watch?v=' + vr.videoId);
+  const acc = ((vr.title || {}).accessibility || {}).accessibilityData || {};
+  return {
+    key: key,
+    video_id: vr.videoId,
+    title: txt(vr.title),
+    url: 'https://www.youtube.com' + path,
+    channel: txt(vr.ownerText || vr.longBylineText || vr.shortBylineText),
+    views: txt(vr.viewCountText) || txt(vr.shortViewCountText),
+    published: txt(vr.publishedTimeText),
+    thumb_alt: acc.label || '',
+    is_short: !!nav.reelWatchEndpoint || path.startsWith('/shorts/'),
+    is_live: !vr.publishedTimeText && !!(vr.badges || []).find(b => JSON.stringify(b).includes('LIVE'))
+  };
+};
+const out = [];
+let seq = Number(document.body.dataset.scrapeSeq || 0);
+let anyData = !!document.querySelector('ytd-video-renderer[data-seen]');
+for (const el of document.querySelectorAll('ytd-video-renderer:not([data-seen])')) {
+  const vr = el.data || (el.__data && el.__data.data);
+  if (!vr || !vr.videoId) continue;
+  anyData = true;
+  if (!el.dataset.scrapeKey) el.dataset.scrapeKey = String(++seq);
+  el.dataset.seen = '1';
+  const rec = pick(vr, el.dataset.scrapeKey);
+  if (__textMatch(rec.title, groups)) out.push(rec); else rejected++;
+}
+if (!anyData && window.ytInitialData) {
+  const done = window.__scrapeSeenIds = window.__scrapeSeenIds || new Set();
+  const found = [];
+  const walk = (o, depth) => {
+    if (!o || typeof o !== 'object' || depth > 60) return;
+    if (o.videoRenderer && o.videoRenderer.videoId) found.push(o.videoRenderer);
+    for (const k in o) walk(o[k], depth + 1);
+  };
+  walk(window.ytInitialData, 0);
+  for (const vr of found) {
+    if (done.has(vr.videoId)) continue;
+    done.add(vr.videoId);
+    const rec = pick(vr, '');
+    if (__textMatch(rec.title, groups)) out.push(rec); else rejected++;
+  }
+}
+document.body.dataset.scrapeSeq = String(seq);
+return JSON.stringify({videos: out, rejected: rejected});
+"""
 
-def save_screenshot(driver, renderer, term_slug, idx, vid):
-    fname = os.path.join(OUT_DIR, f"yt_{term_slug}_{idx:03d}_{vid[:8]}.png")
+def visible_videos(driver, groups):
+    """Normalised records (video_id, title, channel, views, published, is_short, ...) for every
+    result loaded since the previous call whose title passes the filter, in a single WebDriver
+    round trip. Returns (records, rejected_count)."""
     try:
-        driver.execute_script("arguments[0].scrollIntoView({block:'center'});", renderer)
-        time.sleep(random.uniform(0.4, 0.9))
-        renderer.screenshot(fname)
-    except Exception:
-        driver.save_screenshot(fname)
-    return fname
+        res = json.loads(driver.execute_script(VIDEO_DATA_JS, groups) or '{}')
+    except (WebDriverException, ValueError) as e:
+        safe_print(f"[EXTRACT] Video data script failed: {e}")
+        return [], 0
+    return res.get('videos', []), int(res.get('rejected', 0))
+
+def renderer_element(driver, rec):
+    """Locate the renderer for a data record (only needed for screenshots)."""
+    selectors = []
+    if rec.get('key'):
+        selectors.append(f'ytd-video-renderer[data-scrape-key="{rec["key"]}"]')
+    selectors.append(f'ytd-video-renderer:has(a#thumbnail[href*="{rec.get("video_id","")}"])')
+    for sel in selectors:
+        try:
+            return driver.find_element(By.CSS_SELECTOR, sel)
+        except WebDriverException:
+            continue
+    return None
+
+# TAG_FILTERS compiled once; evaluated in the page for DATA extraction
+TITLE_FILTER = compile_text_filter(TAG_FILTERS)
+
+def shot_path(term_slug, idx, vid):
+    return os.path.join(OUT_DIR, f"yt_{term_slug}_{idx:03d}_{vid[:8]}.png")
+
+def _shots_ready(driver, elements):
+    SHOT_WAIT.wait_ready(driver, elements, baseline=sum(random.uniform(0.4, 0.9) for _ in elements), timeout=0.9)
+
+# One viewport screenshot per scroll position, renderers cropped from it (see screen_capture.py)
+SHOTS = BatchCapture("YT", ready=_shots_ready, platform="YT")
+THUMBS = ThumbnailFetcher("YT")
+NET_STATS = PageStats("YT", RESOURCE_POLICY)
+
+def dom_candidates(driver, seen_ids):
+    """Legacy DOM path: (data, renderer) pairs via per-renderer find_element calls."""
+    out = []
+    renderers = driver.find_elements(By.CSS_SELECTOR, "ytd-video-renderer:not([data-seen])")
+    mark_seen(driver, renderers)
+    for r in renderers:
+        vid = video_identity(r)
+        if vid in seen_ids:
+            continue
+        href = ''
+        try:
+            href = r.find_element(By.CSS_SELECTOR, "a#thumbnail").get_attribute('href') or ''
+        except Exception:
+            pass
+        data = extract_video(r)
+        data['video_id'] = vid
+        data['is_short'] = '/shorts/' in href
+        # skip non-standard live placeholder
+        data['is_live'] = 'live' in href and 'v=' not in href
+        out.append((data, r))
+    return out
+
+def handle_video(shot, data, term, idx, meta_file, flagged_meta):
+    """Detect and persist one video that passed the tag filter (shot is the screenshot or downloaded
+    thumbnail; None when images are off or the download failed).
+    Returns whether it was flagged."""
+    vid = data['video_id']
+    fields = {k: v for k, v in data.items() if k not in {'key', 'video_id', 'is_live'}}
+    record = {
+        'mode': 'SEARCH',
+        'search_term': term,
+        'index': idx,
+        'video_id': vid,
+        'screenshot': shot,
+        'captured_at': datetime.utcnow().isoformat(),
+        **fields
+    }
+    only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
+    flag, reason, score = detect_content(data.get('title',''), image_path=shot)
+    if flag:
+        record['flag_reason'] = reason
+        record['flag_score'] = score
+        # Move/copy screenshot into flagged dir if not already there
+        try:
+            import shutil
+            base_name = os.path.basename(shot)
+            flagged_path = os.path.join(FLAGGED_DIR, base_name)
+            if os.path.abspath(os.path.dirname(shot)) != os.path.abspath(FLAGGED_DIR):
+                if only_flagged:
+                    shutil.move(shot, flagged_path)
+                    record['screenshot'] = flagged_path
+                else:
+                    shutil.copy2(shot, flagged_path)
+        except Exception:
+            pass
+        # Write to flagged metadata file
+        flagged_meta.write(json.dumps(record, ensure_ascii=False) + '\n')
+        flagged_meta.flush()
+        safe_print(f"[FLAGGED] {reason} {data['title'][:60]} -> {record['screenshot']}")
+    else:
+        if only_flagged:
+            try: os.remove(shot)
+            except Exception: pass
+            safe_print(f"[SKIP CLEAN] {data['title'][:60]}")
+        else:
+            meta_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            meta_file.flush()
+            safe_print(f"[VIDEO:{term}] {idx+1}/{PER_TERM} {data['title'][:60]} -> {shot}")
+    return bool(flag)
 
 # ================= Main scraping =================
 
+def scrape_term(driver, term, meta_file, flagged_meta, st=None):
+    """Search one term and collect up to st.quota videos (default PER_TERM). Counters live on
+    `st` (DriverSupervisor.state), so a re-run after a driver crash continues the term."""
+    encoded = urllib.parse.quote(term)
+    search_url = f"https://www.youtube.com/results?search_query={encoded}"
+    safe_print(f"[TERM] {term} -> {search_url}")
+    PACER.pace(navigation=True)
+    driver.get(search_url)
+    try:
+        WebDriverWait(driver, 25).until(EC.presence_of_element_located((By.CSS_SELECTOR, "ytd-video-renderer")))
+    except TimeoutException:
+        safe_print(f"[WARN] No video renderers visible for term {term}")
+    st = loop_state(st, collected=0, seen_ids=set(), stagnant=0, last_height=0, scanned=0, flagged=0)
+    seen_ids = st.seen_ids
+    quota = getattr(st, 'quota', PER_TERM)
+    resume_scroll(driver, st)
+    term_slug = ''.join(ch for ch in term if ch.isalnum() or ch in ('_','#')).strip('#') or 'term'
+    prune = DomPruner(f"YT:{term}", 'ytd-video-renderer[data-seen]', mode='remove')
+    filter_stats = FilterStats(f"YT:{term}")
+    waiter = FeedWaiter(f"YT:{term}", 'ytd-video-renderer:not([data-seen])',
+                        WAIT_FLOOR, SCROLL_PAUSE + JITTER_MAX)
+    while st.collected < quota and st.stagnant < STOP_EMPTY_SCROLLS:
+        if EXTRACT_MODE == 'DOM':
+            candidates = dom_candidates(driver, seen_ids)
+            rejected = 0
+        else:
+            records, rejected = visible_videos(driver, TITLE_FILTER)
+            candidates = [(rec, None) for rec in records]
+            filter_stats.round(rejected, len(records))
+        # Videos rejected in the page are feed progress, not quota: only matching videos are collected
+        new_in_cycle = rejected
+        matched = []
+        for data, r in candidates:
+            if (not INCLUDE_SHORTS) and data.get('is_short'):
+                continue
+            if data.get('is_live'):
+                continue
+            vid = data.get('video_id', '')
+            if not vid or vid in seen_ids:
+                continue
+            if not data.get('title'):  # skip empty
+                continue
+            seen_ids.add(vid)
+            if CKPT.written(vid):
+                st.collected += 1  # stored by the interrupted run after its last checkpoint
+                continue
+            if SEEN_INDEX.seen_before(vid):
+                continue
+            new_in_cycle += 1
+            # Tag filter before any screenshot work (DOM path; DATA rejects never leave the page)
+            if not text_matches(data.get('title',''), TITLE_FILTER):
+                continue
+            st.collected += 1
+            if r is None and SCREENSHOTS and not THUMBNAILS:
+                r = renderer_element(driver, data)
+            matched.append((st.collected - 1, data, r))
+            if st.collected >= quota:
+                break
+        if THUMBNAILS:
+            shots = THUMBS.fetch_many([(data['video_id'], shot_path(term_slug, idx, data['video_id']))
+                                       for idx, data, _r in matched])
+        elif SCREENSHOTS:
+            shots = SHOTS.capture(driver, [(r, shot_path(term_slug, idx, data['video_id']))
+                                           for idx, data, r in matched])
+        else:
+            shots = [None] * len(matched)
+        for (idx, data, _r), shot in zip(matched, shots):
+            st.scanned += 1
+            if handle_video(shot, data, term, idx, meta_file, flagged_meta):
+                st.flagged += 1
+            SEEN_INDEX.add(data['video_id'])
+            CKPT.tick(driver, st)
+        if st.collected >= quota:
+            break
+        # Scroll to load more
+        PACER.step(driver, new_in_cycle)
+        prune(driver)
+        driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.END)
+        waiter.wait_new(driver, jitter_baseline(SCROLL_PAUSE))
+        new_height = driver.execute_script('return document.documentElement.scrollHeight')
+        if new_in_cycle == 0:
+            st.stagnant += 1
+        else:
+            st.stagnant = 0
+        if new_height == st.last_height:
+            st.stagnant += 1
+        st.last_height = new_height
+    safe_print(f"[DONE] Term '{term}' collected {st.collected} videos.")
+    filter_stats.report()
+    NET_STATS.sample(driver)
+    waiter.report()
+    return st.collected
+
 def scrape():
+    global SEARCH_TERMS, PER_TERM
+    SEARCH_TERMS = CKPT.setting('terms', SEARCH_TERMS)
     prompt_search_terms()
+    CKPT.settings['terms'] = SEARCH_TERMS
+    PER_TERM = CKPT.setting('per_term', PER_TERM)
     if not SEARCH_TERMS:
         safe_print("[ERROR] No search terms provided. Set YT_SEARCH_TERMS env var or input interactively.")
         return
-    driver = build_driver()
+    sup = DriverSupervisor("YT", build_driver, states=CKPT.states)
+    # PER_TERM per term, or the same total spread by flag yield with TERM_BUDGET=1 (see term_budget.py)
+    budget = TermBudget("youtube", SEARCH_TERMS, PER_TERM,
+                        seed_from=[(META_PATH, False), (FLAGGED_META_PATH, True)])
     try:
-        wait = WebDriverWait(driver, 25)
         with open(META_PATH, 'a', encoding='utf-8') as meta_file, open(FLAGGED_META_PATH, 'a', encoding='utf-8') as flagged_meta:
             for term in SEARCH_TERMS:
-                encoded = urllib.parse.quote(term)
-                search_url = f"https://www.youtube.com/results?search_query={encoded}"
-                safe_print(f"[TERM] {term} -> {search_url}")
-                driver.get(search_url)
+                st = loop_state(sup.state(f"TERM:{term}"), collected=0, scanned=0, flagged=0, seconds=0.0)
+                if not hasattr(st, 'quota'):
+                    st.quota = budget.quota(term)
+                budget.quotas[term] = st.quota  # a resumed term keeps the quota it started with
+                if getattr(st, 'done', False):
+                    safe_print(f"[TERM] {term} finished before the interruption ({st.collected} collected); skipping")
+                    budget.record(term, st.collected, st.scanned, st.flagged, st.seconds)
+                    continue
+                started = time.time()
                 try:
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "ytd-video-renderer")))
-                except TimeoutException:
-                    safe_print(f"[WARN] No video renderers visible for term {term}")
-                collected = 0
-                seen_ids = set()
-                stagnant = 0
-                last_height = 0
-                term_slug = ''.join(ch for ch in term if ch.isalnum() or ch in ('_','#')).strip('#') or 'term'
-                while collected < PER_TERM and stagnant < STOP_EMPTY_SCROLLS:
-                    renderers = driver.find_elements(By.CSS_SELECTOR, "ytd-video-renderer")
-                    new_in_cycle = 0
-                    for r in renderers:
-                        # Filter shorts if disabled
-                        try:
-                            href = r.find_element(By.CSS_SELECTOR, "a#thumbnail").get_attribute('href') or ''
-                            if (not INCLUDE_SHORTS) and '/shorts/' in href:
-                                continue
-                            if 'live' in href and 'v=' not in href:
-                                # skip non-standard live placeholder
-                                continue
-                        except Exception:
-                            pass
-                        vid = video_identity(r)
-                        if vid in seen_ids:
-                            continue
-                        data = extract_video(r)
-                        if not data.get('title'):  # skip empty
-                            continue
-                        seen_ids.add(vid)
-                        shot = save_screenshot(driver, r, term_slug, collected, vid)
-                        record = {
-                            'mode': 'SEARCH',
-                            'search_term': term,
-                            'index': collected,
-                            'video_id': vid,
-                            'screenshot': shot,
-                            'captured_at': datetime.utcnow().isoformat(),
-                            **data
-                        }
-                        only_flagged = os.environ.get('ONLY_FLAGGED', os.environ.get('HATE_ONLY','0')).lower() in {'1','true','yes'}
-                        # Tag filter first
-                        if not tagged_match(data.get('title','')):
-                            if only_flagged:
-                                try: os.remove(shot)
-                                except Exception: pass
-                            collected += 1
-                            new_in_cycle += 1
-                            continue
-                        flag, reason, score = detect_content(data.get('title',''), image_path=shot)
-                        if flag:
-                            record['flag_reason'] = reason
-                            record['flag_score'] = score
-                            # Write to flagged metadata file
-                            flagged_meta.write(json.dumps(record, ensure_ascii=False) + '\n')
-                            flagged_meta.flush()
-                            # Move/copy screenshot into flagged dir if not already there
-                            try:
-                                import shutil, os as _os
-                                base_name = os.path.basename(shot)
-                                flagged_path = os.path.join(FLAGGED_DIR, base_name)
-                                if os.path.abspath(os.path.dirname(shot)) != os.path.abspath(FLAGGED_DIR):
-                                    if only_flagged:
-                                        shutil.move(shot, flagged_path)
-                                        record['screenshot'] = flagged_path
-                                    else:
-                                        shutil.copy2(shot, flagged_path)
-                            except Exception:
-                                pass
-                            safe_print(f"[FLAGGED] {reason} {data['title'][:60]} -> {shot}")
-                        else:
-                            if only_flagged:
-                                try: os.remove(shot)
-                                except Exception: pass
-                                safe_print(f"[SKIP CLEAN] {data['title'][:60]}")
-                            else:
-                                meta_file.write(json.dumps(record, ensure_ascii=False) + '\n')
-                                meta_file.flush()
-                                safe_print(f"[VIDEO:{term}] {collected+1}/{PER_TERM} {data['title'][:60]} -> {shot}")
-                        collected += 1
-                        new_in_cycle += 1
-                        if collected >= PER_TERM:
-                            break
-                    if collected >= PER_TERM:
-                        break
-                    # Scroll to load more
-                    driver.find_element(By.TAG_NAME, 'body').send_keys(Keys.END)
-                    jitter_sleep(SCROLL_PAUSE)
-                    new_height = driver.execute_script('return document.documentElement.scrollHeight')
-                    if new_in_cycle == 0:
-                        stagnant += 1
-                    else:
-                        stagnant = 0
-                    if new_height == last_height:
-                        stagnant += 1
-                    last_height = new_height
-                safe_print(f"[DONE] Term '{term}' collected {collected} videos.")
+                    sup.run(scrape_term, term, meta_file, flagged_meta, st, where=f"TERM:{term}")
+                finally:
+                    st.seconds += time.time() - started
+                budget.record(term, st.collected, st.scanned, st.flagged, st.seconds)
+                CKPT.done(st)
+        budget.report()
+        budget.save()
+        CKPT.complete()
+    except BaseException:
+        CKPT.save()  # interrupted: keep the output offsets current for --resume
+        raise
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        NET_STATS.report()
+        PACER.report()
+        note_pages(len(NET_STATS.pages))  # wear accounting for leased service browsers
+        SHOTS.report()
+        SHOT_WAIT.report()
+        THUMBS.report()
+        THUMBS.close()
+        SEEN_INDEX.save()
+        if SEEN_INDEX.skipped:
+            safe_print(f"[SEEN] Skipped {SEEN_INDEX.skipped} video(s) already processed in earlier runs")
+        sup.report()
+        sup.quit()
 
 if __name__ == '__main__':
     scrape()